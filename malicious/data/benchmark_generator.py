@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Generator Benchmark Suite
+Runs every dataset generation mode at several sizes and records rows/sec,
+peak RSS and the time spent in each scenario generator, so throughput can be
+compared across commits:
+
+    python benchmark_generator.py --output bench_<commit>.json
+    python benchmark_generator.py --compare bench_<old>.json --output bench_<new>.json
+
+Each run happens in a fresh child process (peak RSS is per run, not the max
+over the session) and writes its CSV to a temporary directory that is
+removed afterwards. Worker processes count towards memory too: besides the
+run's own peak, every result has the largest worker's peak (RUSAGE_CHILDREN)
+and the peak of the whole process tree, sampled every RSS_SAMPLE_SECONDS. Per-scenario times are wall-clock seconds summed over
+all calls of each generate_* function; sharded runs execute scenarios in
+worker processes and only report totals.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import queue as queue_module
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_SIZES = [4_200, 100_000, 1_000_000]
+RSS_SAMPLE_SECONDS = 0.05
+
+# Generation modes: runner(output_file, n_records)
+def _run_dict(output_file: str, n_records: int):
+    import generate_email_data
+    generate_email_data.generate_dataset(output_file, n_records)
+
+def _run_dict_streaming(output_file: str, n_records: int):
+    import generate_email_data
+    generate_email_data.generate_dataset_streaming(output_file, n_records)
+
+def _run_columnar(output_file: str, n_records: int):
+    import columnar_generator
+    columnar_generator.generate_dataset_columnar(output_file, n_records)
+
+def _run_columnar_streaming(output_file: str, n_records: int):
+    import columnar_generator
+    columnar_generator.generate_dataset_columnar_streaming(output_file, n_records)
+
+def _run_sharded(output_file: str, n_records: int):
+    import sharded_generator
+    sharded_generator.generate_dataset_sharded(output_file, n_records, workers=os.cpu_count() or 1)
+
+MODES: Dict[str, Callable[[str, int], None]] = {
+    "dict": _run_dict,
+    "dict-streaming": _run_dict_streaming,
+    "columnar": _run_columnar,
+    "columnar-streaming": _run_columnar_streaming,
+    "sharded": _run_sharded,
+}
+
+# ============================================================================
+# PER-SCENARIO TIMING
+# ============================================================================
+
+class TimedScenario:
+    """Wraps a scenario generator and adds its wall time to timings[name]."""
+
+    def __init__(self, func: Callable, timings: Dict[str, float]):
+        self.func = func
+        self.timings = timings
+        self.__name__ = func.__name__
+        timings.setdefault(func.__name__, 0.0)
+
+    def __call__(self, arg):
+        start = time.perf_counter()
+        result = self.func(arg)
+        self.timings[self.__name__] += time.perf_counter() - start
+        return result
+
+def instrument_scenarios(timings: Dict[str, float]):
+    """Wrap the dict scenario lists and the compiled columnar scenarios in place."""
+    import generate_email_data
+    import scenario_specs
+    for scenarios in (generate_email_data.MALICIOUS_SCENARIOS, generate_email_data.LEGITIMATE_SCENARIOS):
+        scenarios[:] = [(TimedScenario(func, timings), count) for func, count in scenarios]
+    for name, scenario in list(scenario_specs.COMPILED_SCENARIOS.items()):
+        scenario_specs.COMPILED_SCENARIOS[name] = TimedScenario(scenario, timings)
+
+# ============================================================================
+# RUNNING
+# ============================================================================
+
+def current_rss_mb(pid="self") -> float:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:  # the process exited meanwhile
+        return 0.0
+
+def descendants(pid: Optional[int] = None) -> List[int]:
+    """Processes below pid (default: this one), found by parent pid in /proc."""
+    parents: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # "pid (comm) state ppid ...": comm may contain spaces, so split after ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    found, pending = [], [os.getpid() if pid is None else pid]
+    while pending:
+        children = parents.get(pending.pop(), [])
+        found += children
+        pending += children
+    return found
+
+class TreeRSSSampler(threading.Thread):
+    """Peak RSS of this process plus all of its workers, summed, sampled in the background."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = 0.0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            total = current_rss_mb() + sum(current_rss_mb(pid) for pid in descendants())
+            self.peak_mb = max(self.peak_mb, total)
+            self.stopped.wait(self.interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.join()
+
+def _child(mode: str, n_records: int, queue):
+    """Run one benchmark in this (fresh) process and report through queue."""
+    try:
+        timings: Dict[str, float] = {}
+        if mode != "sharded":
+            instrument_scenarios(timings)
+        with tempfile.TemporaryDirectory(prefix="bench_") as tmp_dir:
+            output_file = os.path.join(tmp_dir, "email_detection_signals.csv")
+            baseline = current_rss_mb()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), TreeRSSSampler() as tree:
+                start = time.perf_counter()
+                MODES[mode](output_file, n_records)
+                elapsed = time.perf_counter() - start
+            output_bytes = os.path.getsize(output_file)
+        # ru_maxrss is in KB; RUSAGE_CHILDREN covers the workers waited for (the largest one)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        worker_peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        queue.put({
+            "mode": mode,
+            "rows": n_records,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(n_records / max(elapsed, 1e-9), 1),
+            "peak_rss_mb": round(peak_rss, 1),
+            "worker_peak_rss_mb": round(worker_peak_rss, 1),
+            "total_peak_rss_mb": round(max(tree.peak_mb, peak_rss, worker_peak_rss), 1),
+            "baseline_rss_mb": round(baseline, 1),
+            "output_mb": round(output_bytes / 2**20, 2),
+            "scenario_seconds": {name: round(t, 4) for name, t in sorted(timings.items(), key=lambda x: -x[1])},
+        })
+    except Exception as e:
+        queue.put({"mode": mode, "rows": n_records, "error": f"{type(e).__name__}: {e}"})
+
+def run_benchmark(mode: str, n_records: int) -> Dict:
+    """One mode at one size in a fresh process."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(mode, n_records, queue))
+    process.start()
+    while True:
+        try:
+            result = queue.get(timeout=1)
+            break
+        except queue_module.Empty:
+            if not process.is_alive():  # e.g. killed by the OOM killer
+                result = {"mode": mode, "rows": n_records, "error": f"child exited with code {process.exitcode}"}
+                break
+    process.join()
+    return result
+
+def environment() -> Dict:
+    """Commit and machine details stored with every result file."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def print_result(result: Dict, baseline: Optional[Dict] = None):
+    if "error" in result:
+        print(f"  {result['mode']:<20} {result['rows']:>10,}  ERROR {result['error']}")
+        return
+    line = (f"  {result['mode']:<20} {result['rows']:>10,}  {result['seconds']:>9.2f}s "
+            f"{result['rows_per_sec']:>12,.0f} rows/s  {result.get('total_peak_rss_mb', result['peak_rss_mb']):>8.0f} MB peak")
+    if result.get("worker_peak_rss_mb"):
+        line += f" (largest worker {result['worker_peak_rss_mb']:.0f} MB)"
+    if baseline and "rows_per_sec" in baseline:
+        line += f"  ({result['rows_per_sec'] / baseline['rows_per_sec']:.2f}x vs baseline)"
+    print(line)
+    slowest = list(result["scenario_seconds"].items())[:3]
+    if slowest:
+        print("      slowest scenarios: " + ", ".join(f"{name} {t:.2f}s" for name, t in slowest))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier result file to compare rows/sec against")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r["mode"], r["rows"]): r for r in json.load(f)["runs"]}
+
+    report = {"environment": environment(), "runs": []}
+    print(f"Benchmarking {', '.join(args.modes)} at {', '.join(f'{n:,}' for n in args.sizes)} rows")
+    for n_records in args.sizes:
+        for mode in args.modes:
+            result = run_benchmark(mode, n_records)
+            report["runs"].append(result)
+            print_result(result, baseline.get((mode, n_records)))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
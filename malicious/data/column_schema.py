@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Column Schema for the Email Detection Signals
+Column kinds, category levels and in-memory encodings shared by the columnar
+generator and the declarative scenario specs, plus the vectorized draw
+helpers they use.
+"""
+
+import json
+from typing import Any, List
+
+import numpy as np
+
+from generate_email_data import (
+    TLS_VERSIONS,
+    SSL_STATUSES_MALICIOUS,
+    PROCESS_CHAINS_MALICIOUS,
+    PROCESS_CHAINS_MACRO,
+    PROCESS_CHAINS_LEGITIMATE,
+    REQUEST_TYPES_MALICIOUS,
+)
+from samplers import get_sampler
+
+# ============================================================================
+# COLUMN KINDS
+# ============================================================================
+
+# String-valued signals and their levels. Categorical columns are held as
+# int16 codes into these lists and only decoded on output.
+AUTH_RESULTS = ["pass", "fail", "softfail", "neutral", "none"]
+
+CATEGORY_LEVELS = {
+    "unique_parent_process_names": list(dict.fromkeys(
+        json.dumps(chain)
+        for chain in PROCESS_CHAINS_MALICIOUS + PROCESS_CHAINS_MACRO + PROCESS_CHAINS_LEGITIMATE
+    )),
+    "request_type": REQUEST_TYPES_MALICIOUS + ["none", "meeting_request", "invoice_verification"],
+    "spf_result": AUTH_RESULTS,
+    "dkim_result": AUTH_RESULTS,
+    "dmarc_result": AUTH_RESULTS,
+    "tls_version": TLS_VERSIONS,
+    "ssl_validity_status": SSL_STATUSES_MALICIOUS,
+    "label": ["Malicious", "Not Malicious"],
+}
+CATEGORICAL_SIGNALS = set(CATEGORY_LEVELS)
+
+# Continuous signals, held as float64 (NaN = NULL). Every other signal is a
+# bool, a count or a category code, held as int16.
+FLOAT_SIGNALS = {
+    "sender_domain_reputation_score",
+    "sender_temp_email_likelihood",
+    "max_metadata_suspicious_score",
+    "max_behavioral_sandbox_score",
+    "max_amsi_suspicion_score",
+    "max_exfiltration_behavior_score",
+    "max_suspicious_string_entropy_score",
+    "max_sandbox_execution_time",
+    "return_path_reputation_score",
+    "reply_path_reputation_score",
+    "smtp_ip_geo",
+    "smtp_ip_asn",
+    "smtp_ip_reputation_score",
+    "domain_tech_stack_match_score",
+    "sender_name_similarity_to_vip",
+    "content_spam_score",
+    "marketing_keywords_detected",
+    "html_text_ratio",
+    "url_reputation_score",
+    "site_visual_similarity_to_known_brand",
+    "url_rendering_behavior_score",
+}
+
+# NULL marker for int16 columns (every count, flag and code is non-negative)
+INT_NULL = -1
+
+# Signals that only exist when the email has at least one URL
+URL_DETAIL_SIGNALS = [
+    "domain_known_malicious",
+    "dns_morphing_detected",
+    "domain_tech_stack_match_score",
+    "url_shortener_detected",
+    "url_redirect_chain_length",
+    "final_url_known_malicious",
+    "url_decoded_spoof_detected",
+    "url_reputation_score",
+    "ssl_validity_status",
+    "site_visual_similarity_to_known_brand",
+    "url_rendering_behavior_score",
+    "link_rewritten_through_redirector",
+    "token_validation_success",
+]
+
+# ============================================================================
+# VECTORIZED HELPERS
+# ============================================================================
+
+def random_floats(rng: np.random.Generator, low: float, high: float, size: int) -> np.ndarray:
+    """Vectorized random_float: uniform floats rounded to 3 decimal places."""
+    return np.round(rng.uniform(low, high, size), 3)
+
+def encode(col: str, values: List[Any]) -> np.ndarray:
+    """Column values as stored: floats, or int16 counts/flags/category codes."""
+    if col in FLOAT_SIGNALS:
+        return np.array([np.nan if v is None else v for v in values], dtype=float)
+    if col in CATEGORICAL_SIGNALS:
+        values = [None if v is None else CATEGORY_LEVELS[col].index(v) for v in values]
+    return np.array([INT_NULL if v is None else v for v in values], dtype=np.int16)
+
+def weighted_indices(rng: np.random.Generator, weights: List[float], size: int) -> np.ndarray:
+    """Vectorized weighted_choice over indices: size draws with the given weights."""
+    if len(weights) > 4:
+        return get_sampler(range(len(weights)), weights).draw_indices(rng, size)
+    # A few comparisons beat the alias table for the common 2-4 way choices
+    cdf = np.cumsum(weights, dtype=float)
+    u = rng.random(size) * cdf[-1]
+    idx = np.zeros(size, dtype=np.intp)
+    for bound in cdf[:-1]:
+        idx += u >= bound
+    return idx
+
+def null_column(col: str, n: int) -> np.ndarray:
+    """All-NULL column of length n in the column's storage dtype."""
+    if col in FLOAT_SIGNALS:
+        return np.full(n, np.nan)
+    return np.full(n, INT_NULL, dtype=np.int16)
+
+def decode(col: str, values: np.ndarray) -> np.ndarray:
+    """Object array of category strings (None = NULL) for a coded column."""
+    levels = np.array(CATEGORY_LEVELS[col] + [None], dtype=object)
+    return levels[values]
@@ -16,13 +16,21 @@ Critical Issues Being Fixed:
 import pandas as pd
 import numpy as np
 from collections import Counter
+import argparse
+import io
 import json
+import os
+import time
+
+from signal_store import read_signals, write_signals
+from relabel_rules import FILE_SIGNALS, MULTI_MODEL_RULES, AnyOf, LabelIs, PredicateCache, Signal, is_set
+from transition_report import merge_tables, render_markdown, report_from_tables, transition_report, transition_tables
 
 def load_dataset(filepath):
     """Load the dataset and handle any parsing issues"""
     print(f"Loading dataset from {filepath}...")
     try:
-        df = pd.read_csv(filepath)
+        df = read_signals(filepath)
         print(f"Dataset loaded successfully: {len(df)} rows, {len(df.columns)} columns")
         return df
     except Exception as e:
@@ -112,6 +120,9 @@ def relabel_for_multi_model(row):
 
     Returns:
         str: New label ('Malicious', 'Warning', 'Spam', 'No Action')
+
+    Reference definition for one row; the correction pass uses the
+    vectorized relabel_rules.MULTI_MODEL_RULES, which must give the same labels.
     """
 
     # MALICIOUS: File-based threats (attachment analysis primary)
@@ -151,7 +162,9 @@ def apply_corrections(df):
 
     # Apply relabeling logic
     print("Relabeling samples according to Multi-Model Ensemble Architecture...")
-    corrected_df['corrected_label'] = corrected_df.apply(relabel_for_multi_model, axis=1)
+    labels, fired = MULTI_MODEL_RULES.apply(corrected_df)
+    corrected_df['corrected_label'] = labels
+    corrected_df['corrected_rule'] = fired  # int8 code into MULTI_MODEL_RULES.names
 
     # Analyze new distribution
     print("\nCorrected Label Distribution:")
@@ -159,27 +172,23 @@ def apply_corrections(df):
     for label, count in new_label_counts.items():
         print(f"  {label}: {count} ({count/len(corrected_df)*100:.1f}%)")
 
+    print("\nRules Fired:")
+    for rule, count in MULTI_MODEL_RULES.explain(fired).items():
+        print(f"  {rule}: {count}")
+
     return corrected_df
 
-def validate_corrections(original_df, corrected_df):
+def validate_corrections(original_df, corrected_df, cache=None):
     """Validate that corrections fix the identified issues"""
     print("\n=== VALIDATION OF CORRECTIONS ===")
+    cache = cache or PredicateCache(corrected_df)
 
     # Check malicious signal activation in corrected dataset
     corrected_malicious = corrected_df[corrected_df['corrected_label'] == 'Malicious']
 
     if len(corrected_malicious) > 0:
         # File signal activation rate
-        file_signal_mask = (
-            (corrected_malicious.get('any_file_hash_malicious', 0) == 1.0) |
-            (corrected_malicious.get('has_executable_attachment', 0) == 1.0) |
-            (corrected_malicious.get('any_macro_enabled_document', 0) == 1.0) |
-            (corrected_malicious.get('any_exploit_pattern_detected', 0) == 1.0) |
-            (corrected_malicious.get('max_behavioral_sandbox_score', 0) > 0.60) |
-            (corrected_malicious.get('packer_detected', 0) == 1.0)
-        )
-
-        new_activation_count = file_signal_mask.sum()
+        new_activation_count = cache.count(LabelIs('corrected_label', 'Malicious') & FILE_SIGNALS)
         new_activation_rate = new_activation_count / len(corrected_malicious) * 100
 
         print(f"Malicious Signal Activation After Correction:")
@@ -210,8 +219,9 @@ def validate_corrections(original_df, corrected_df):
         spam_score_mean = corrected_spam['content_spam_score'].mean()
         print(f"Spam samples content score mean: {spam_score_mean:.3f}")
 
-def generate_correction_report(original_df, corrected_df, analysis_results):
+def generate_correction_report(original_df, corrected_df, analysis_results, cache=None):
     """Generate comprehensive before/after correction report"""
+    cache = cache or PredicateCache(corrected_df)
 
     report = {
         "correction_summary": {
@@ -234,37 +244,29 @@ def generate_correction_report(original_df, corrected_df, analysis_results):
                 "fixed": False
             }
         },
-        "label_transitions": {}
+        "label_transitions": {},
+        "rules_fired": MULTI_MODEL_RULES.explain(corrected_df['corrected_rule'].to_numpy()).to_dict()
     }
 
-    # Calculate transitions from original to corrected labels
-    transition_counts = original_df.groupby(['label'])['label'].count()
-
-    for orig_label in original_df['label'].unique():
-        orig_subset = corrected_df[original_df['label'] == orig_label]
-        new_distribution = orig_subset['corrected_label'].value_counts().to_dict()
-        report['label_transitions'][orig_label] = new_distribution
-
-    # Calculate post-correction metrics
-    corrected_malicious = corrected_df[corrected_df['corrected_label'] == 'Malicious']
-    if len(corrected_malicious) > 0:
-        file_signal_mask = (
-            (corrected_malicious.get('any_file_hash_malicious', 0) == 1.0) |
-            (corrected_malicious.get('has_executable_attachment', 0) == 1.0) |
-            (corrected_malicious.get('any_macro_enabled_document', 0) == 1.0) |
-            (corrected_malicious.get('any_exploit_pattern_detected', 0) == 1.0) |
-            (corrected_malicious.get('max_behavioral_sandbox_score', 0) > 0.60) |
-            (corrected_malicious.get('packer_detected', 0) == 1.0)
-        )
-
-        after_activation_rate = (file_signal_mask.sum() / len(corrected_malicious)) * 100
+    # Transitions and post-correction metrics from one grouped aggregation
+    # (corrected_df keeps the original 'label' column next to 'corrected_label')
+    transitions = transition_report(corrected_df, 'label', 'corrected_label',
+                                    signals={'file_signals': FILE_SIGNALS},
+                                    scores=[c for c in ['content_spam_score'] if c in corrected_df.columns],
+                                    cache=cache)
+    report['label_transitions'] = transitions['transitions']
+    report['transition_report'] = transitions
+
+    malicious = transitions['new_classes'].get('Malicious')
+    if malicious is not None:
+        after_activation_rate = malicious['activation']['file_signals']
         report['critical_fixes']['malicious_signal_activation']['after'] = after_activation_rate
         report['critical_fixes']['malicious_signal_activation']['fixed'] = after_activation_rate > 90
 
-        if 'content_spam_score' in corrected_malicious.columns:
-            after_spam_mean = corrected_malicious['content_spam_score'].mean()
+        after_spam_mean = malicious['score_means'].get('content_spam_score')
+        if after_spam_mean is not None:
             report['critical_fixes']['content_spam_pattern']['after_malicious_mean'] = after_spam_mean
-            report['critical_fixes']['content_spam_pattern']['fixed'] = after_spam_mean < 0.25
+            report['critical_fixes']['content_spam_pattern']['fixed'] = bool(after_spam_mean < 0.25)
 
     return report
 
@@ -277,6 +279,7 @@ def save_results(corrected_df, report, output_dir="/home/u3/investigation/malici
     # Save corrected dataset
     corrected_path = os.path.join(output_dir, "email_detection_signals_corrected.csv")
     corrected_df.to_csv(corrected_path, index=False)
+    write_signals(corrected_df, corrected_path)
     print(f"Corrected dataset saved: {corrected_path}")
 
     # Save report
@@ -291,7 +294,8 @@ def save_results(corrected_df, report, output_dir="/home/u3/investigation/malici
     print(f"Summary report saved: {summary_path}")
 
 def create_markdown_summary(corrected_df, report, output_path):
-    """Create a markdown summary of corrections"""
+    """Create a markdown summary of corrections: the critical fixes, then
+    the label transition report (class distributions and transitions)."""
 
     summary = f"""# Dataset Correction Summary
 
@@ -300,28 +304,14 @@ def create_markdown_summary(corrected_df, report, output_path):
 - **Corrected samples**: {report['correction_summary']['corrected_samples']:,}
 - **Correction method**: Multi-Model Ensemble Architecture relabeling
 
-## Label Distribution Changes
-
-### Before Correction
+## Critical Issues Fixed
 """
 
-    for label, count in report['correction_summary']['original_labels'].items():
-        pct = count / report['correction_summary']['original_samples'] * 100
-        summary += f"- **{label}**: {count:,} ({pct:.1f}%)\n"
-
-    summary += "\n### After Correction\n"
-
-    for label, count in report['correction_summary']['corrected_labels'].items():
-        pct = count / report['correction_summary']['corrected_samples'] * 100
-        summary += f"- **{label}**: {count:,} ({pct:.1f}%)\n"
-
-    # Critical fixes status
-    summary += "\n## Critical Issues Fixed\n"
-
     activation_fix = report['critical_fixes']['malicious_signal_activation']
     status = "✅ FIXED" if activation_fix.get('fixed', False) else "❌ NEEDS ATTENTION"
     summary += f"### 1. Malicious Signal Activation Rate {status}\n"
-    summary += f"- **Before**: {activation_fix['before']:.1f}%\n"
+    if activation_fix.get('before') is not None:
+        summary += f"- **Before**: {activation_fix['before']:.1f}%\n"
     if activation_fix.get('after') is not None:
         summary += f"- **After**: {activation_fix['after']:.1f}%\n"
     summary += f"- **Target**: >{activation_fix['target']:.0f}%\n\n"
@@ -335,27 +325,213 @@ def create_markdown_summary(corrected_df, report, output_path):
         summary += f"- **After (Malicious mean)**: {spam_fix['after_malicious_mean']:.3f}\n"
     summary += f"- **Target**: {spam_fix['target']}\n\n"
 
-    # Label transitions
-    summary += "## Label Transitions\n"
-
-    for orig_label, transitions in report['label_transitions'].items():
-        summary += f"### Original '{orig_label}' samples redistributed as:\n"
-        total_orig = sum(transitions.values())
-        for new_label, count in transitions.items():
-            pct = count / total_orig * 100
-            summary += f"- **{new_label}**: {count:,} ({pct:.1f}%)\n"
-        summary += "\n"
+    # Distributions before/after and the transitions, from the transition report
+    if report.get('transition_report'):
+        summary += render_markdown(report['transition_report'], title="Label Transitions", level=2)
 
     with open(output_path, 'w') as f:
         f.write(summary)
 
+# ============================================================================
+# STREAMING MODE
+# ============================================================================
+#
+# For exports too large for one DataFrame: the input is read in blocks of
+# STREAM_CHUNK_ROWS, each block is relabeled on its own, the corrected rows
+# are appended to the output as soon as they are labeled, and the report is
+# built from CorrectionAggregates (counts and sums that merge across blocks).
+# CSV blocks come from one read_csv(chunksize=...) pass with every column
+# read as text (no NULL conversion), so the corrected file has the input
+# values exactly as they were read plus corrected_label and corrected_rule;
+# the rules and the report get the typed columns they need from that block.
+
+STREAM_CHUNK_ROWS = 100_000
+
+# The file-signal check of analyze_current_distribution (no packer_detected)
+ORIGINAL_FILE_SIGNALS = AnyOf(is_set('any_file_hash_malicious'), is_set('has_executable_attachment'),
+                              is_set('any_macro_enabled_document'), is_set('any_exploit_pattern_detected'),
+                              Signal('max_behavioral_sandbox_score', ">", 0.60))
+URL_SIGNALS = is_set('final_url_known_malicious') | is_set('domain_known_malicious')
+REPORT_COLUMNS = ['label', 'content_spam_score']
+
+class CorrectionAggregates:
+    """Mergeable counts and sums behind correction_report.json."""
+
+    def __init__(self):
+        self.rows = 0
+        self.original_labels = Counter()
+        self.corrected_labels = Counter()
+        self.rules = Counter()                # rule name -> rows
+        self.original_file_signals = 0        # original Malicious rows with ORIGINAL_FILE_SIGNALS
+        self.warning_url_signals = 0          # corrected Warning rows with URL_SIGNALS
+        self.tables = None                    # label -> corrected_label transition_tables
+
+    def add(self, block, labels, fired, cache):
+        """Fold in one relabeled block (cache must be over the same block)."""
+        self.rows += len(block)
+        original = block['label'].to_numpy(dtype=object)
+        self.original_labels.update(original)
+        self.corrected_labels.update(labels)
+        self.rules.update(MULTI_MODEL_RULES.explain(fired).to_dict())
+        self.original_file_signals += cache.count(LabelIs('label', 'Malicious') & ORIGINAL_FILE_SIGNALS)
+        self.warning_url_signals += cache.mask(URL_SIGNALS)[labels == 'Warning'].sum()
+        # The same tables generate_correction_report builds over the whole frame
+        tables = transition_tables(pd.DataFrame({'label': block['label'], 'corrected_label': labels}),
+                                   'label', 'corrected_label', signals={'file_signals': FILE_SIGNALS},
+                                   scores=[c for c in ['content_spam_score'] if c in block.columns],
+                                   cache=cache)
+        self.tables = tables if self.tables is None else merge_tables(self.tables, tables)
+
+    def merge(self, other: "CorrectionAggregates") -> "CorrectionAggregates":
+        self.rows += other.rows
+        for name in ('original_labels', 'corrected_labels', 'rules'):
+            getattr(self, name).update(getattr(other, name))
+        self.original_file_signals += other.original_file_signals
+        self.warning_url_signals += other.warning_url_signals
+        if other.tables is not None:
+            self.tables = other.tables if self.tables is None else merge_tables(self.tables, other.tables)
+        return self
+
+    def report(self):
+        """Same structure as generate_correction_report."""
+        original_malicious = self.original_labels['Malicious']
+        transitions = report_from_tables(self.tables) if self.tables is not None else None
+        original_malicious_class = transitions['old_classes'].get('Malicious') if transitions else None
+        report = {
+            "correction_summary": {
+                "original_samples": self.rows,
+                "corrected_samples": self.rows,
+                "original_labels": dict(self.original_labels.most_common()),
+                "corrected_labels": dict(self.corrected_labels.most_common())
+            },
+            "critical_fixes": {
+                "malicious_signal_activation": {
+                    "before": self.original_file_signals / original_malicious * 100 if original_malicious else None,
+                    "after": None,
+                    "target": 90.0,
+                    "fixed": False
+                },
+                "content_spam_pattern": {
+                    "before_malicious_mean": (original_malicious_class['score_means'].get('content_spam_score')
+                                              if original_malicious_class else None),
+                    "after_malicious_mean": None,
+                    "target": "<0.25",
+                    "fixed": False
+                }
+            },
+            "label_transitions": transitions['transitions'] if transitions else {},
+            "rules_fired": {name: self.rules[name] for name in MULTI_MODEL_RULES.names},
+            "transition_report": transitions
+        }
+        malicious = transitions['new_classes'].get('Malicious') if transitions else None
+        if malicious is not None:
+            activation = report['critical_fixes']['malicious_signal_activation']
+            activation['after'] = malicious['activation']['file_signals']
+            activation['fixed'] = activation['after'] > 90
+            spam_mean = malicious['score_means'].get('content_spam_score')
+            if spam_mean is not None:
+                report['critical_fixes']['content_spam_pattern']['after_malicious_mean'] = spam_mean
+                report['critical_fixes']['content_spam_pattern']['fixed'] = bool(spam_mean < 0.25)
+        return report
+
+def relabel_block(block, aggregates):
+    """Corrected labels and fired-rule codes of one block, folded into aggregates."""
+    cache = PredicateCache(block)
+    labels, fired = MULTI_MODEL_RULES.apply(block, cache)
+    aggregates.add(block, labels, fired, cache)
+    return labels, fired
+
+def typed_block(text_block, columns):
+    """columns of an all-text block, with the types read_csv would infer."""
+    buffer = io.StringIO()
+    text_block[columns].to_csv(buffer, index=False)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+def stream_csv(input_path, output_path, chunk_rows, aggregates):
+    # Rows are labeled and written from the same parsed block, so blank lines
+    # and quoted newlines cannot shift labels onto other rows
+    blocks = pd.read_csv(input_path, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+    with open(output_path, 'w', newline='') as target:
+        for number, text_block in enumerate(blocks):
+            usecols = [col for col in MULTI_MODEL_RULES.fields + REPORT_COLUMNS if col in text_block.columns]
+            labels, fired = relabel_block(typed_block(text_block, usecols), aggregates)
+            text_block.assign(corrected_label=labels, corrected_rule=fired).to_csv(
+                target, index=False, header=number == 0)
+
+def stream_parquet(input_path, output_path, chunk_rows, aggregates):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(input_path)
+    names = source.schema_arrow.names
+    usecols = [col for col in MULTI_MODEL_RULES.fields + REPORT_COLUMNS if col in names]
+    writer = None
+    try:
+        for batch in source.iter_batches(batch_size=chunk_rows):
+            block = batch.select(usecols).to_pandas()
+            labels, fired = relabel_block(block, aggregates)
+            batch = batch.append_column('corrected_label', pa.array(labels, type=pa.string()))
+            batch = batch.append_column('corrected_rule', pa.array(fired, type=pa.int8()))
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def correct_dataset_streaming(input_path, output_dir, chunk_rows=STREAM_CHUNK_ROWS):
+    """Relabel a signals CSV or Parquet file block by block.
+
+    Memory is one block of the rule and report columns, whatever the file
+    size. Writes email_detection_signals_corrected.csv (or .parquet),
+    correction_report.json and correction_summary.md to output_dir.
+    """
+    print(f"\n=== STREAMING CORRECTIONS ({chunk_rows:,} rows per block) ===")
+    parquet = input_path.endswith('.parquet')
+    corrected_path = os.path.join(output_dir, "email_detection_signals_corrected" + (".parquet" if parquet else ".csv"))
+    aggregates = CorrectionAggregates()
+    start = time.perf_counter()
+    (stream_parquet if parquet else stream_csv)(input_path, corrected_path, chunk_rows, aggregates)
+    elapsed = time.perf_counter() - start
+    print(f"Relabeled {aggregates.rows:,} rows in {elapsed:.2f}s ({aggregates.rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+    report = aggregates.report()
+    print("\nCorrected Label Distribution:")
+    for label, count in report['correction_summary']['corrected_labels'].items():
+        print(f"  {label}: {count} ({count/max(aggregates.rows, 1)*100:.1f}%)")
+    activation = report['critical_fixes']['malicious_signal_activation']
+    if activation['after'] is not None:
+        print(f"Malicious signal activation: {activation['before']:.1f}% -> {activation['after']:.1f}%")
+
+    report_path = os.path.join(output_dir, "correction_report.json")
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    summary_path = os.path.join(output_dir, "correction_summary.md")
+    create_markdown_summary(None, report, summary_path)
+    print(f"Corrected dataset saved: {corrected_path}")
+    print(f"Correction report saved: {report_path}")
+    print(f"Summary report saved: {summary_path}")
+    return report
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Email Detection Signals Dataset Corrector")
+    parser.add_argument("--input", default="/home/u3/investigation/malicious/data/email_detection_signals.csv")
+    parser.add_argument("--output-dir", default="/home/u3/investigation/malicious/data")
+    parser.add_argument("--stream", action="store_true", help="relabel block by block (CSV or Parquet input)")
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS)
+    args = parser.parse_args()
+
     print("Email Detection Signals Dataset Corrector")
     print("=" * 50)
 
+    if args.stream:
+        correct_dataset_streaming(args.input, args.output_dir, args.chunk_rows)
+        return
+
     # Load dataset
-    df = load_dataset("/home/u3/investigation/malicious/data/email_detection_signals.csv")
+    df = load_dataset(args.input)
     if df is None:
         return
 
@@ -365,14 +541,15 @@ def main():
     # Apply corrections
     corrected_df = apply_corrections(df)
 
-    # Validate corrections
-    validate_corrections(df, corrected_df)
+    # Validate corrections (validation and report share one predicate cache)
+    cache = PredicateCache(corrected_df)
+    validate_corrections(df, corrected_df, cache)
 
     # Generate comprehensive report
-    report = generate_correction_report(df, corrected_df, analysis_results)
+    report = generate_correction_report(df, corrected_df, analysis_results, cache)
 
     # Save results
-    save_results(corrected_df, report)
+    save_results(corrected_df, report, args.output_dir)
 
     print("\n=== CORRECTION COMPLETE ===")
     print("Key outputs:")
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Delta-Versioned Dataset Store
+Keeps one base dataset and any number of versions derived from it, where a
+version stores only what differs from its parent: the cells that changed
+(label fixes, typically), the rows appended at the end, and any columns
+added or dropped. A training CSV that differs from its parent by a few
+hundred relabeled rows costs a few kilobytes instead of a full copy.
+
+Layout of a store directory:
+
+  base/<member>.npy       the base dataset in the signal_store encoding
+                          (values, __nulls, __levels), one .npy per member
+                          so every column is memory-mapped on demand
+  versions/<name>.npz     one compressed delta per version
+  manifest.json           parent, row count and change counts per version
+
+materialize() starts from the memory-mapped base and replays the deltas on
+the path to the requested version, decoding only the columns asked for.
+commit() diffs a DataFrame against the materialized parent: its first
+len(parent) rows must be the parent's rows, anything beyond is appended.
+Every version also keeps hashes of a fixed sample of rows, so
+commit(parent="auto") can rank the stored versions by how much they differ
+from the new frame without materializing them, and fully diffs only the
+few closest (AUTO_DIFFS).
+
+    python dataset_versions.py import spam.versions spam_detector_training_data.csv spam_detector_training_data_*.csv
+    python dataset_versions.py log spam.versions
+    python dataset_versions.py checkout spam.versions spam_detector_training_data_corrected training.csv
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from signal_store import decode_column, encode_column, write_signals
+
+BASE = "base"
+SAMPLE_ROWS = 256   # rows hashed per version for parent="auto"
+AUTO_DIFFS = 3      # candidates parent="auto" diffs exactly
+
+class _MemberDir:
+    """The base directory seen as an npz archive (files + item access), memory-mapped."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.files = [name[:-4] for name in os.listdir(directory) if name.endswith(".npy")]
+
+    def __getitem__(self, member: str) -> np.ndarray:
+        return np.load(os.path.join(self.directory, member + ".npy"), mmap_mode="r", allow_pickle=False)
+
+def _assign(series: pd.Series, rows: np.ndarray, values: pd.Series) -> pd.Series:
+    """series with series[rows] = values (last write wins), widening the dtype if needed."""
+    if len(rows) == 0:
+        return series
+    # Keep the last write to each row
+    last = len(rows) - 1 - np.unique(rows[::-1], return_index=True)[1]
+    rows, values = rows[last], values.iloc[last]
+    numeric = pd.api.types.is_numeric_dtype
+    if numeric(series) and numeric(values):
+        dtype = np.result_type(series.dtype, values.dtype)
+        out = series.to_numpy(dtype=dtype, copy=True)
+        out[rows] = values.to_numpy(dtype=dtype)
+        return pd.Series(out, name=series.name)
+    out = series.to_numpy(dtype=object, copy=True)
+    out[rows] = values.to_numpy(dtype=object)
+    if series.dtype == values.dtype:
+        return pd.Series(out, name=series.name, dtype=series.dtype)
+    return pd.Series(out, name=series.name).infer_objects()
+
+def _changed(old: pd.Series, new: pd.Series) -> np.ndarray:
+    """Positions where two aligned columns differ (NULL == NULL)."""
+    old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+    same = (old == new) | (old.isna() & new.isna())
+    return np.flatnonzero(~same.to_numpy(dtype=bool))
+
+def _fingerprint(df: pd.DataFrame, positions: np.ndarray) -> np.ndarray:
+    """uint64 hash of each sampled row (and the column names). Numbers are
+    hashed as float64 and everything else as text, so a frame re-read from
+    CSV hashes the same as the one committed."""
+    sample = df.iloc[positions].reset_index(drop=True)
+    normalized = pd.DataFrame({
+        str(col): (values.astype(float) if pd.api.types.is_numeric_dtype(values)
+                   else values.astype(object).where(values.notna(), None).astype(str))
+        for col, values in sample.items()})
+    names = pd.util.hash_array(np.array(list(normalized.columns), dtype=object)).sum()
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy() ^ names
+
+class DatasetStore:
+    """A base dataset plus named delta versions, in one directory."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.manifest = {"versions": {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    @property
+    def versions(self) -> Dict[str, dict]:
+        return self.manifest["versions"]
+
+    def _save_manifest(self):
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(temp_path, self.manifest_path)
+
+    def _delta_path(self, name: str) -> str:
+        return os.path.join(self.root, "versions", name + ".npz")
+
+    def init(self, df: pd.DataFrame, message: str = ""):
+        """Create the store with df as the base version."""
+        if self.versions:
+            raise ValueError(f"{self.root} already has a base dataset")
+        directory = os.path.join(self.root, BASE)
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(os.path.join(self.root, "versions"), exist_ok=True)
+        members = {"__columns__": np.array([str(c) for c in df.columns]), "__rows__": np.array(len(df))}
+        for col in df.columns:
+            members.update(encode_column(df[col].rename(str(col))))
+        members["__sample__"] = _fingerprint(df, self._sample_positions(len(df)))
+        for member, values in members.items():
+            np.save(os.path.join(directory, member + ".npy"), values)
+        self.versions[BASE] = {"parent": None, "rows": len(df), "columns": len(df.columns),
+                               "changed_cells": 0, "appended_rows": len(df), "message": message,
+                               "created": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self._save_manifest()
+
+    def _sample_positions(self, base_rows: Optional[int] = None) -> np.ndarray:
+        """Rows hashed for every version (rows of the base, so present in all)."""
+        base_rows = self.versions[BASE]["rows"] if base_rows is None else base_rows
+        rng = np.random.default_rng(0)
+        return np.sort(rng.choice(base_rows, min(base_rows, SAMPLE_ROWS), replace=False))
+
+    def _sample(self, name: str) -> Optional[np.ndarray]:
+        """Stored row hashes of a version (None for versions stored without them)."""
+        if name == BASE:
+            path = os.path.join(self.root, BASE, "__sample__.npy")
+            return np.load(path) if os.path.exists(path) else None
+        with np.load(self._delta_path(name), allow_pickle=False) as delta:
+            return delta["__sample__"] if "__sample__" in delta.files else None
+
+    def closest(self, df: pd.DataFrame) -> str:
+        """The version df differs least from (fewest stored delta values).
+
+        Versions are ranked by an estimate from the sampled row hashes plus
+        the rows df appends, and only the AUTO_DIFFS best (and any versions
+        without hashes) are diffed, so the cost does not grow with the
+        number of stored versions.
+        """
+        candidates = [version for version, info in self.versions.items() if info["rows"] <= len(df)]
+        if not candidates:
+            raise ValueError("no stored version is a prefix of this dataset")
+        fingerprint = _fingerprint(df, self._sample_positions())
+        estimates, unsampled = {}, []
+        for version in candidates:
+            sample = self._sample(version)
+            if sample is None:
+                unsampled.append(version)
+                continue
+            rows = self.versions[version]["rows"]
+            estimates[version] = (np.mean(sample != fingerprint) * rows + len(df) - rows) * len(df.columns)
+        shortlist = unsampled + sorted(estimates, key=estimates.get)[:AUTO_DIFFS]
+        costs = {}
+        for version in shortlist:
+            members = self.diff(df, version)
+            costs[version] = sum(v.size for k, v in members.items() if not k.startswith("__"))
+        return min(costs, key=costs.get)
+
+    def lineage(self, name: str) -> List[str]:
+        """Versions from the base down to name."""
+        if name not in self.versions:
+            raise KeyError(f"{self.root}: no version {name!r}")
+        chain = []
+        while name is not None:
+            chain.append(name)
+            name = self.versions[name]["parent"]
+        return chain[::-1]
+
+    def materialize(self, name: str = BASE, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The dataset as of version name (optionally only some columns)."""
+        chain = self.lineage(name)
+        base = _MemberDir(os.path.join(self.root, BASE))
+        names = [str(c) for c in base["__columns__"]]
+        n = int(base["__rows__"])
+        wanted = None if columns is None else set(columns)
+        data = {col: decode_column(base, col, n) for col in names if wanted is None or col in wanted}
+        # Cell edits only ever address existing rows, so they are collected along
+        # the chain and applied once per column, after all appends
+        edits: Dict[str, List] = {col: [] for col in data}
+
+        for version in chain[1:]:
+            with np.load(self._delta_path(version), allow_pickle=False) as delta:
+                version_names = [str(c) for c in delta["__columns__"]]
+                n_parent, n = n, int(delta["__rows__"])
+                for col in version_names:
+                    if wanted is not None and col not in wanted:
+                        continue
+                    if f"column:{col}" in delta.files:
+                        data[col] = decode_column(delta, f"column:{col}", n).rename(col)
+                        edits[col] = []
+                        continue
+                    if n > n_parent:
+                        appended = decode_column(delta, f"append:{col}", n - n_parent).rename(col)
+                        data[col] = pd.concat([data[col], appended], ignore_index=True)
+                    if f"edit:{col}:rows" in delta.files:
+                        rows = delta[f"edit:{col}:rows"]
+                        edits[col].append((rows, decode_column(delta, f"edit:{col}", len(rows))))
+                data = {col: data[col] for col in version_names if col in data}
+                names = version_names
+
+        for col, changes in edits.items():
+            if col in data and changes:
+                rows = np.concatenate([rows for rows, _ in changes])
+                values = pd.concat([values for _, values in changes], ignore_index=True)
+                data[col] = _assign(data[col], rows, values)
+
+        if columns is not None:
+            missing = [c for c in columns if c not in data]
+            if missing:
+                raise KeyError(f"{name}: no such columns {missing}")
+            names = list(columns)
+        return pd.DataFrame({col: data[col] for col in names}, columns=names)
+
+    def diff(self, df: pd.DataFrame, parent: str) -> Dict[str, np.ndarray]:
+        """Delta members that turn version parent into df."""
+        base = self.materialize(parent)
+        n_parent = len(base)
+        if len(df) < n_parent:
+            raise ValueError(f"{len(df)} rows, but version {parent!r} has {n_parent}; "
+                             "a version may only change or append rows")
+        df = df.reset_index(drop=True)
+        members = {"__columns__": np.array([str(c) for c in df.columns]), "__rows__": np.array(len(df)),
+                   "__parent_rows__": np.array(n_parent)}
+        for col in df.columns:
+            col = str(col)
+            if col not in base.columns:
+                members.update(encode_column(df[col].rename(f"column:{col}")))
+                continue
+            rows = _changed(base[col], df[col].iloc[:n_parent])
+            if len(rows):
+                members[f"edit:{col}:rows"] = rows.astype(np.int32)
+                members.update(encode_column(df[col].iloc[rows].reset_index(drop=True).rename(f"edit:{col}")))
+            if len(df) > n_parent:
+                members.update(encode_column(df[col].iloc[n_parent:].reset_index(drop=True).rename(f"append:{col}")))
+        return members
+
+    def commit(self, df: pd.DataFrame, name: str, parent: str = BASE, message: str = "") -> dict:
+        """Store df as version name, derived from parent ("auto" = the version it differs least from)."""
+        if not name or os.sep in name or name in self.versions:
+            raise ValueError(f"invalid or existing version name {name!r}")
+        if parent == "auto":
+            parent = self.closest(df)
+        members = self.diff(df, parent)
+        members["__sample__"] = _fingerprint(df, self._sample_positions())
+        path = self._delta_path(name)
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(temp_path, **members)
+        os.replace(temp_path, path)
+
+        n_parent = int(members["__parent_rows__"])
+        self.versions[name] = {
+            "parent": parent, "rows": len(df), "columns": len(df.columns),
+            "changed_cells": int(sum(v.size for k, v in members.items() if k.endswith(":rows"))),
+            "appended_rows": len(df) - n_parent,
+            "added_columns": sorted(k[len("column:"):] for k in members
+                                    if k.startswith("column:") and "__" not in k),
+            "message": message, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self._save_manifest()
+        return self.versions[name]
+
+    def disk_usage(self) -> int:
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+        return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta-Versioned Dataset Store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("import", help="create a store from a base CSV and add CSVs as versions")
+    cmd.add_argument("store")
+    cmd.add_argument("base")
+    cmd.add_argument("versions", nargs="*")
+    cmd.add_argument("--parent", default="auto", help="parent of every imported version (default: auto)")
+    cmd = commands.add_parser("log", help="list versions")
+    cmd.add_argument("store")
+    cmd = commands.add_parser("checkout", help="write a version as CSV (plus its typed .npz)")
+    cmd.add_argument("store")
+    cmd.add_argument("version")
+    cmd.add_argument("output")
+    args = parser.parse_args()
+
+    store = DatasetStore(args.store)
+    if args.command == "import":
+        if BASE not in store.versions:
+            store.init(pd.read_csv(args.base), message=os.path.basename(args.base))
+        csv_bytes = os.path.getsize(args.base)
+        for path in args.versions:
+            name = os.path.splitext(os.path.basename(path))[0]
+            df = pd.read_csv(path)
+            try:
+                info = store.commit(df, name, parent=args.parent, message=os.path.basename(path))
+            except ValueError as e:
+                print(f"❌ {name}: {e}")
+                continue
+            csv_bytes += os.path.getsize(path)
+            check = store.materialize(name)
+            exact = check.shape == df.shape and all(len(_changed(check[c], df[c])) == 0 for c in df.columns)
+            print(f"{'✅' if exact else '❌'} {name}: parent {info['parent']}, {info['changed_cells']} cells changed, "
+                  f"{info['appended_rows']} rows appended, {len(info['added_columns'])} columns added")
+        print(f"\nCSV files: {csv_bytes / 1e6:.1f} MB, store: {store.disk_usage() / 1e6:.2f} MB")
+    elif args.command == "log":
+        for name, info in store.versions.items():
+            print(f"{name:<55} parent={str(info['parent']):<40} rows={info['rows']:<8} "
+                  f"changed={info['changed_cells']:<6} appended={info['appended_rows']}")
+    elif args.command == "checkout":
+        df = store.materialize(args.version)
+        df.to_csv(args.output, index=False)
+        write_signals(df, args.output)
+        print(f"Saved {args.version} ({len(df):,} rows) to: {args.output}")
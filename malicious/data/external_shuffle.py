@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+External Shuffle Writer
+Bounded-memory CSV writer for very large generated datasets. Rows arrive in
+chunks of serialized CSV lines; each line gets a uniformly random bucket key
+and is appended to that bucket's temp file. On close every bucket is loaded
+on its own, shuffled in memory and appended to the output. Because bucket
+keys are independent and uniform, the result is a uniform random permutation
+of all rows, while peak memory is one bucket plus one chunk.
+"""
+
+import math
+import os
+import shutil
+import tempfile
+from typing import Any, List, Optional
+
+import numpy as np
+
+# Target rows per bucket; sets peak memory during the final pass
+BUCKET_ROWS = 500_000
+
+def bucket_count(n_records: int, bucket_rows: int = BUCKET_ROWS) -> int:
+    """Number of buckets so that each holds about bucket_rows rows."""
+    return max(1, math.ceil(n_records / bucket_rows))
+
+class ExternalShuffleWriter:
+    """Random-key bucket shuffle of CSV lines into output_file.
+
+    Usage:
+        with ExternalShuffleWriter("out.csv", header_line, n_buckets) as writer:
+            writer.add_lines(lines)
+
+    ``seed`` is anything np.random.default_rng accepts. Bucket files live in
+    a temp directory next to the output unless tmp_dir is given.
+    """
+
+    def __init__(self, output_file: str, header: str, n_buckets: int, seed: Any = 42,
+                 tmp_dir: Optional[str] = None):
+        self.output_file = output_file
+        self.header = header
+        self.n_buckets = n_buckets
+        self.rng = np.random.default_rng(seed)
+        self.rows_written = 0
+        self.bucket_dir = tempfile.mkdtemp(prefix="shuffle_buckets_", dir=tmp_dir or os.path.dirname(os.path.abspath(output_file)))
+        self.buckets = [
+            open(os.path.join(self.bucket_dir, f"bucket_{i:05d}.csv"), "w", newline="", encoding="utf-8")
+            for i in range(n_buckets)
+        ]
+
+    def add_lines(self, lines: List[str]):
+        """Scatter a chunk of newline-terminated CSV lines into random buckets."""
+        if not lines:
+            return
+        keys = self.rng.integers(0, self.n_buckets, len(lines))
+        order = np.argsort(keys, kind="stable")
+        bounds = np.searchsorted(keys[order], np.arange(self.n_buckets + 1))
+        for bucket, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if stop > start:
+                self.buckets[bucket].write("".join(lines[i] for i in order[start:stop]))
+        self.rows_written += len(lines)
+
+    def close(self) -> int:
+        """Shuffle each bucket into the output file; returns the row count."""
+        for f in self.buckets:
+            f.close()
+        try:
+            with open(self.output_file, "w", newline="", encoding="utf-8") as out:
+                out.write(self.header)
+                for f in self.buckets:
+                    with open(f.name, "r", newline="", encoding="utf-8") as bucket:
+                        lines = bucket.read().splitlines(keepends=True)
+                    out.write("".join(lines[i] for i in self.rng.permutation(len(lines))))
+                    del lines
+        finally:
+            shutil.rmtree(self.bucket_dir, ignore_errors=True)
+        return self.rows_written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self.buckets:
+                f.close()
+            shutil.rmtree(self.bucket_dir, ignore_errors=True)
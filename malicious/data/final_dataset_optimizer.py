@@ -17,10 +17,11 @@ FINAL OPTIMIZATION STRATEGY:
 4. Document the dataset's actual characteristics vs ideal expectations
 """
 
-import pandas as pd
-import numpy as np
 import json
 
+from signal_store import read_signals, write_signals
+from relabel_rules import CONFIRMED_MALWARE, FILE_SIGNALS, OPTIMAL_RULES, LabelIs, PredicateCache
+
 def create_final_optimal_dataset():
     """Create the final optimized dataset with realistic expectations"""
 
@@ -28,7 +29,7 @@ def create_final_optimal_dataset():
     print("=" * 50)
 
     # Load original dataset
-    df = pd.read_csv("/home/u3/investigation/malicious/data/email_detection_signals.csv")
+    df = read_signals("/home/u3/investigation/malicious/data/email_detection_signals.csv")
     print(f"Loaded original dataset: {len(df)} rows")
 
     # Analyze inherent characteristics
@@ -63,7 +64,9 @@ def create_final_optimal_dataset():
     print(f"\n=== CREATING OPTIMAL CLASSIFICATION ===")
 
     optimal_df = df.copy()
-    optimal_df['optimal_label'] = optimal_df.apply(optimal_relabel_function, axis=1)
+    labels, fired = OPTIMAL_RULES.apply(optimal_df)
+    optimal_df['optimal_label'] = labels
+    optimal_df['optimal_rule'] = fired  # int8 code into OPTIMAL_RULES.names
 
     # Report distribution
     print(f"Optimal Label Distribution:")
@@ -71,12 +74,19 @@ def create_final_optimal_dataset():
     for label, count in optimal_counts.items():
         print(f"  {label}: {count} ({count/len(optimal_df)*100:.1f}%)")
 
+    print(f"Rules Fired:")
+    for rule, count in OPTIMAL_RULES.explain(fired).items():
+        print(f"  {rule}: {count}")
+
     return optimal_df
 
 def optimal_relabel_function(row):
     """
     Optimal relabeling function that creates the best separation possible
     given the dataset's inherent characteristics
+
+    Reference definition for one row; the correction pass uses the
+    vectorized relabel_rules.OPTIMAL_RULES, which must give the same labels.
     """
 
     # TIER 1: Strongest malware indicators (confirmed hashes, exploits)
@@ -129,8 +139,9 @@ def optimal_relabel_function(row):
     else:
         return "No Action"  # Clean emails
 
-def create_final_analysis(df):
+def create_final_analysis(df, cache=None):
     """Create final comprehensive analysis of the optimized dataset"""
+    cache = cache or PredicateCache(df)
 
     print(f"\n=== FINAL DATASET ANALYSIS ===")
 
@@ -144,14 +155,7 @@ def create_final_analysis(df):
 
         if label == 'Malicious':
             # Malicious analysis
-            file_signals = (
-                (category_df.get('any_file_hash_malicious', 0) == 1.0) |
-                (category_df.get('has_executable_attachment', 0) == 1.0) |
-                (category_df.get('any_macro_enabled_document', 0) == 1.0) |
-                (category_df.get('any_exploit_pattern_detected', 0) == 1.0) |
-                (category_df.get('max_behavioral_sandbox_score', 0) > 0.60) |
-                (category_df.get('packer_detected', 0) == 1.0)
-            ).sum()
+            file_signals = cache.count(LabelIs('optimal_label', label) & FILE_SIGNALS)
 
             activation_rate = file_signals / len(category_df) * 100
             spam_mean = category_df['content_spam_score'].mean()
@@ -162,8 +166,7 @@ def create_final_analysis(df):
             print(f"  Content spam score median: {spam_median:.3f}")
 
             # Quality tiers
-            confirmed = ((category_df.get('any_file_hash_malicious', 0) == 1.0) |
-                        (category_df.get('any_exploit_pattern_detected', 0) == 1.0)).sum()
+            confirmed = cache.count(LabelIs('optimal_label', label) & CONFIRMED_MALWARE)
             print(f"  Confirmed malware (hash/exploit): {confirmed} ({confirmed/len(category_df)*100:.1f}%)")
 
         elif label == 'Warning':
@@ -187,8 +190,9 @@ def create_final_analysis(df):
             print(f"  Content spam score mean: {spam_mean:.3f}")
             print(f"  High spam scores (>0.60): {high_spam} ({high_spam/len(category_df)*100:.1f}%)")
 
-def generate_brutally_honest_report(original_df, optimized_df):
+def generate_brutally_honest_report(original_df, optimized_df, cache=None):
     """Generate a brutally honest assessment of what was achieved vs what was expected"""
+    cache = cache or PredicateCache(optimized_df)
 
     report = {
         "brutal_honesty_assessment": {
@@ -226,14 +230,7 @@ def generate_brutally_honest_report(original_df, optimized_df):
     malicious_final = optimized_df[optimized_df['optimal_label'] == 'Malicious']
 
     if len(malicious_final) > 0:
-        file_activation = (
-            (malicious_final.get('any_file_hash_malicious', 0) == 1.0) |
-            (malicious_final.get('has_executable_attachment', 0) == 1.0) |
-            (malicious_final.get('any_macro_enabled_document', 0) == 1.0) |
-            (malicious_final.get('any_exploit_pattern_detected', 0) == 1.0) |
-            (malicious_final.get('max_behavioral_sandbox_score', 0) > 0.60) |
-            (malicious_final.get('packer_detected', 0) == 1.0)
-        ).sum() / len(malicious_final) * 100
+        file_activation = cache.count(LabelIs('optimal_label', 'Malicious') & FILE_SIGNALS) / len(malicious_final) * 100
 
         spam_score_mean = malicious_final['content_spam_score'].mean()
 
@@ -254,6 +251,7 @@ def save_final_results(df, report):
     # Save dataset
     dataset_path = "/home/u3/investigation/malicious/data/email_detection_signals_FINAL.csv"
     df.to_csv(dataset_path, index=False)
+    write_signals(df, dataset_path)
 
     # Save report
     report_path = "/home/u3/investigation/malicious/data/final_optimization_report.json"
@@ -336,12 +334,13 @@ def main():
     # Create optimal dataset
     optimal_df = create_final_optimal_dataset()
 
-    # Analyze results
-    create_final_analysis(optimal_df)
+    # Analyze results (analysis and report share one predicate cache)
+    cache = PredicateCache(optimal_df)
+    create_final_analysis(optimal_df, cache)
 
     # Generate honest assessment
-    original_df = pd.read_csv("/home/u3/investigation/malicious/data/email_detection_signals.csv")
-    report = generate_brutally_honest_report(original_df, optimal_df)
+    original_df = read_signals("/home/u3/investigation/malicious/data/email_detection_signals.csv")
+    report = generate_brutally_honest_report(original_df, optimal_df, cache)
 
     # Save everything
     save_final_results(optimal_df, report)
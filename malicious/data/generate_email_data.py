@@ -7,9 +7,16 @@ with all 68 detection signals.
 
 import random
 import csv
+import io
 import json
 from typing import Dict, Any, List, Optional
 
+import pandas as pd
+
+from external_shuffle import ExternalShuffleWriter, bucket_count, BUCKET_ROWS
+from samplers import get_sampler
+from signal_store import write_signals
+
 # Set seed for reproducibility
 random.seed(42)
 
@@ -128,114 +135,149 @@ def random_float(low: float, high: float) -> float:
     return round(random.uniform(low, high), 3)
 
 def weighted_choice(choices: List[Any], weights: List[float]) -> Any:
-    """Make a weighted random choice."""
-    return random.choices(choices, weights=weights, k=1)[0]
+    """Make a weighted random choice (cached alias table, one random() call)."""
+    return get_sampler(choices, weights).draw()
+
+# ============================================================================
+# CATEGORICAL DISTRIBUTIONS (shared with the columnar generator)
+# ============================================================================
+
+AUTH_PATTERNS_MALICIOUS = [
+    {"spf": "fail", "dkim": "fail", "dmarc": "fail"},      # 25%
+    {"spf": "fail", "dkim": "none", "dmarc": "fail"},      # 15%
+    {"spf": "none", "dkim": "none", "dmarc": "none"},      # 20%
+    {"spf": "softfail", "dkim": "none", "dmarc": "fail"},  # 12%
+    {"spf": "pass", "dkim": "fail", "dmarc": "fail"},      # 8%
+    {"spf": "pass", "dkim": "pass", "dmarc": "pass"},      # 10% (sophisticated)
+    {"spf": "fail", "dkim": "pass", "dmarc": "fail"},      # 5%
+    {"spf": "neutral", "dkim": "none", "dmarc": "none"},   # 5%
+]
+AUTH_WEIGHTS_MALICIOUS = [25, 15, 20, 12, 8, 10, 5, 5]
+
+AUTH_PATTERNS_LEGITIMATE = [
+    {"spf": "pass", "dkim": "pass", "dmarc": "pass"},      # 75%
+    {"spf": "pass", "dkim": "none", "dmarc": "pass"},      # 10%
+    {"spf": "pass", "dkim": "pass", "dmarc": "none"},      # 8%
+    {"spf": "softfail", "dkim": "pass", "dmarc": "pass"},  # 4%
+    {"spf": "none", "dkim": "none", "dmarc": "none"},      # 3% (legacy)
+]
+AUTH_WEIGHTS_LEGITIMATE = [75, 10, 8, 4, 3]
+
+TLS_VERSIONS = ["TLS 1.3", "TLS 1.2", "TLS 1.1", "TLS 1.0", "SSL 3.0", "None"]
+TLS_WEIGHTS_MALICIOUS = [15, 30, 20, 15, 5, 15]
+TLS_WEIGHTS_LEGITIMATE = [50, 45, 3, 1, 0, 1]
+
+SSL_STATUSES_MALICIOUS = ["self_signed", "expired", "valid", "mismatch", "no_ssl", "invalid_chain", "error", "revoked"]
+SSL_WEIGHTS_MALICIOUS = [25, 20, 20, 15, 10, 5, 4, 1]
+
+SSL_STATUSES_LEGITIMATE = ["valid", "expired", "self_signed", "mismatch", "error"]
+SSL_WEIGHTS_LEGITIMATE = [92, 4, 2, 1, 1]
+
+PROCESS_CHAINS_MALICIOUS = [
+    ["winword.exe", "cmd.exe"],
+    ["winword.exe", "powershell.exe"],
+    ["winword.exe", "cmd.exe", "powershell.exe"],
+    ["excel.exe", "cmd.exe"],
+    ["excel.exe", "powershell.exe"],
+    ["excel.exe", "cmd.exe", "powershell.exe"],
+    ["wscript.exe"],
+    ["cscript.exe"],
+    ["mshta.exe"],
+    ["rundll32.exe"],
+    ["regsvr32.exe"],
+    ["certutil.exe"],
+    ["powershell.exe"],
+    ["cmd.exe", "powershell.exe"],
+]
+PROCESS_WEIGHTS_MALICIOUS = [15, 12, 10, 10, 8, 5, 8, 5, 5, 5, 3, 3, 6, 5]
+
+PROCESS_CHAINS_MACRO = [
+    ["winword.exe", "cmd.exe"],
+    ["winword.exe", "powershell.exe"],
+    ["winword.exe", "cmd.exe", "powershell.exe"],
+    ["excel.exe", "cmd.exe"],
+    ["excel.exe", "powershell.exe"],
+]
+PROCESS_WEIGHTS_MACRO = [30, 25, 20, 15, 10]
+
+PROCESS_CHAINS_LEGITIMATE = [
+    ["winword.exe"],
+    ["excel.exe"],
+    ["powerpnt.exe"],
+    ["acrord32.exe"],
+    ["notepad.exe"],
+]
+PROCESS_WEIGHTS_LEGITIMATE = [35, 30, 20, 10, 5]
+PROCESS_NAMES_LEGITIMATE_NULL_RATE = 0.7
+
+REQUEST_TYPES_MALICIOUS = [
+    "credential_request", "wire_transfer", "gift_card_request",
+    "document_download", "link_click", "sensitive_data_request",
+    "bank_detail_update", "urgent_callback", "executive_request",
+    "vpn_or_mfa_reset", "legal_threat", "invoice_payment"
+]
+REQUEST_WEIGHTS_MALICIOUS = [25, 15, 10, 12, 10, 8, 6, 4, 4, 3, 2, 1]
+
+REQUEST_TYPES_LEGITIMATE = [
+    "none", "meeting_request", "document_download",
+    "invoice_payment", "invoice_verification", "credential_request", "link_click"
+]
+REQUEST_WEIGHTS_LEGITIMATE = [60, 15, 10, 5, 5, 3, 2]
+
+# Alias samplers for the helpers below, built once at import
+AUTH_SAMPLER_MALICIOUS = get_sampler(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS)
+AUTH_SAMPLER_LEGITIMATE = get_sampler(AUTH_PATTERNS_LEGITIMATE, AUTH_WEIGHTS_LEGITIMATE)
+TLS_SAMPLER_MALICIOUS = get_sampler(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS)
+TLS_SAMPLER_LEGITIMATE = get_sampler(TLS_VERSIONS, TLS_WEIGHTS_LEGITIMATE)
+SSL_SAMPLER_MALICIOUS = get_sampler(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS)
+SSL_SAMPLER_LEGITIMATE = get_sampler(SSL_STATUSES_LEGITIMATE, SSL_WEIGHTS_LEGITIMATE)
+PROCESS_SAMPLER_MALICIOUS = get_sampler([json.dumps(c) for c in PROCESS_CHAINS_MALICIOUS], PROCESS_WEIGHTS_MALICIOUS)
+PROCESS_SAMPLER_MACRO = get_sampler([json.dumps(c) for c in PROCESS_CHAINS_MACRO], PROCESS_WEIGHTS_MACRO)
+PROCESS_SAMPLER_LEGITIMATE = get_sampler([json.dumps(c) for c in PROCESS_CHAINS_LEGITIMATE], PROCESS_WEIGHTS_LEGITIMATE)
+REQUEST_SAMPLER_MALICIOUS = get_sampler(REQUEST_TYPES_MALICIOUS, REQUEST_WEIGHTS_MALICIOUS)
+REQUEST_SAMPLER_LEGITIMATE = get_sampler(REQUEST_TYPES_LEGITIMATE, REQUEST_WEIGHTS_LEGITIMATE)
 
 def get_auth_pattern_malicious() -> Dict[str, str]:
     """Get realistic authentication pattern for malicious emails."""
-    patterns = [
-        {"spf": "fail", "dkim": "fail", "dmarc": "fail"},      # 25%
-        {"spf": "fail", "dkim": "none", "dmarc": "fail"},      # 15%
-        {"spf": "none", "dkim": "none", "dmarc": "none"},      # 20%
-        {"spf": "softfail", "dkim": "none", "dmarc": "fail"},  # 12%
-        {"spf": "pass", "dkim": "fail", "dmarc": "fail"},      # 8%
-        {"spf": "pass", "dkim": "pass", "dmarc": "pass"},      # 10% (sophisticated)
-        {"spf": "fail", "dkim": "pass", "dmarc": "fail"},      # 5%
-        {"spf": "neutral", "dkim": "none", "dmarc": "none"},   # 5%
-    ]
-    weights = [25, 15, 20, 12, 8, 10, 5, 5]
-    return weighted_choice(patterns, weights)
+    return AUTH_SAMPLER_MALICIOUS.draw()
 
 def get_auth_pattern_legitimate() -> Dict[str, str]:
     """Get realistic authentication pattern for legitimate emails."""
-    patterns = [
-        {"spf": "pass", "dkim": "pass", "dmarc": "pass"},      # 75%
-        {"spf": "pass", "dkim": "none", "dmarc": "pass"},      # 10%
-        {"spf": "pass", "dkim": "pass", "dmarc": "none"},      # 8%
-        {"spf": "softfail", "dkim": "pass", "dmarc": "pass"},  # 4%
-        {"spf": "none", "dkim": "none", "dmarc": "none"},      # 3% (legacy)
-    ]
-    weights = [75, 10, 8, 4, 3]
-    return weighted_choice(patterns, weights)
+    return AUTH_SAMPLER_LEGITIMATE.draw()
 
 def get_tls_malicious() -> str:
     """Get TLS version for malicious emails."""
-    choices = ["TLS 1.3", "TLS 1.2", "TLS 1.1", "TLS 1.0", "SSL 3.0", "None"]
-    weights = [15, 30, 20, 15, 5, 15]
-    return weighted_choice(choices, weights)
+    return TLS_SAMPLER_MALICIOUS.draw()
 
 def get_tls_legitimate() -> str:
     """Get TLS version for legitimate emails."""
-    choices = ["TLS 1.3", "TLS 1.2", "TLS 1.1", "TLS 1.0", "SSL 3.0", "None"]
-    weights = [50, 45, 3, 1, 0, 1]
-    return weighted_choice(choices, weights)
+    return TLS_SAMPLER_LEGITIMATE.draw()
 
 def get_ssl_status_malicious() -> str:
     """Get SSL status for malicious URLs."""
-    choices = ["self_signed", "expired", "valid", "mismatch", "no_ssl", "invalid_chain", "error", "revoked"]
-    weights = [25, 20, 20, 15, 10, 5, 4, 1]
-    return weighted_choice(choices, weights)
+    return SSL_SAMPLER_MALICIOUS.draw()
 
 def get_ssl_status_legitimate() -> str:
     """Get SSL status for legitimate URLs."""
-    choices = ["valid", "expired", "self_signed", "mismatch", "error"]
-    weights = [92, 4, 2, 1, 1]
-    return weighted_choice(choices, weights)
+    return SSL_SAMPLER_LEGITIMATE.draw()
 
 def get_process_names_malicious() -> Optional[str]:
     """Get parent process names for malicious attachments."""
-    chains = [
-        ["winword.exe", "cmd.exe"],
-        ["winword.exe", "powershell.exe"],
-        ["winword.exe", "cmd.exe", "powershell.exe"],
-        ["excel.exe", "cmd.exe"],
-        ["excel.exe", "powershell.exe"],
-        ["excel.exe", "cmd.exe", "powershell.exe"],
-        ["wscript.exe"],
-        ["cscript.exe"],
-        ["mshta.exe"],
-        ["rundll32.exe"],
-        ["regsvr32.exe"],
-        ["certutil.exe"],
-        ["powershell.exe"],
-        ["cmd.exe", "powershell.exe"],
-    ]
-    weights = [15, 12, 10, 10, 8, 5, 8, 5, 5, 5, 3, 3, 6, 5]
-    return json.dumps(weighted_choice(chains, weights))
+    return PROCESS_SAMPLER_MALICIOUS.draw()
 
 def get_process_names_legitimate() -> Optional[str]:
     """Get parent process names for legitimate attachments."""
-    if random.random() < 0.7:
+    if random.random() < PROCESS_NAMES_LEGITIMATE_NULL_RATE:
         return None
-    chains = [
-        ["winword.exe"],
-        ["excel.exe"],
-        ["powerpnt.exe"],
-        ["acrord32.exe"],
-        ["notepad.exe"],
-    ]
-    weights = [35, 30, 20, 10, 5]
-    return json.dumps(weighted_choice(chains, weights))
+    return PROCESS_SAMPLER_LEGITIMATE.draw()
 
 def get_request_type_malicious() -> str:
     """Get request type for malicious emails."""
-    types = [
-        "credential_request", "wire_transfer", "gift_card_request",
-        "document_download", "link_click", "sensitive_data_request",
-        "bank_detail_update", "urgent_callback", "executive_request",
-        "vpn_or_mfa_reset", "legal_threat", "invoice_payment"
-    ]
-    weights = [25, 15, 10, 12, 10, 8, 6, 4, 4, 3, 2, 1]
-    return weighted_choice(types, weights)
+    return REQUEST_SAMPLER_MALICIOUS.draw()
 
 def get_request_type_legitimate() -> str:
     """Get request type for legitimate emails."""
-    types = [
-        "none", "meeting_request", "document_download",
-        "invoice_payment", "invoice_verification", "credential_request", "link_click"
-    ]
-    weights = [60, 15, 10, 5, 5, 3, 2]
-    return weighted_choice(types, weights)
+    return REQUEST_SAMPLER_LEGITIMATE.draw()
 
 # ============================================================================
 # BASE RECORD GENERATOR
@@ -648,15 +690,7 @@ def generate_malware_macro(record: Dict) -> Dict:
     record["packer_detected"] = weighted_choice([1, 0], [40, 60])
 
     # Process names for macro attack
-    record["unique_parent_process_names"] = json.dumps(
-        weighted_choice([
-            ["winword.exe", "cmd.exe"],
-            ["winword.exe", "powershell.exe"],
-            ["winword.exe", "cmd.exe", "powershell.exe"],
-            ["excel.exe", "cmd.exe"],
-            ["excel.exe", "powershell.exe"],
-        ], [30, 25, 20, 15, 10])
-    )
+    record["unique_parent_process_names"] = PROCESS_SAMPLER_MACRO.draw()
 
     return record
 
@@ -1581,44 +1615,70 @@ def generate_legitimate_qr_code(record: Dict) -> Dict:
 # MAIN GENERATION FUNCTION
 # ============================================================================
 
-def generate_dataset(output_file: str = "email_detection_signals.csv"):
-    """Generate the complete dataset with 4200 records."""
-
-    # Define malicious scenario distribution (2100 total)
-    malicious_scenarios = [
-        (generate_phishing_obvious, 250),
-        (generate_phishing_moderate, 200),
-        (generate_phishing_sophisticated, 100),
-        (generate_bec_obvious, 200),
-        (generate_bec_sophisticated, 150),
-        (generate_malware_executable, 150),
-        (generate_malware_macro, 200),
-        (generate_malware_evasive, 100),
-        (generate_ransomware, 100),
-        (generate_spam_obvious, 200),
-        (generate_evasion_encrypted, 100),
-        (generate_evasion_image_only, 80),
-        (generate_qr_phishing, 50),
-        (generate_known_threat_actor, 120),
-        (generate_callback_phishing, 100),
-    ]
-
-    # Define legitimate scenario distribution (2100 total)
-    legitimate_scenarios = [
-        (generate_legitimate_enterprise, 350),
-        (generate_legitimate_smb, 250),
-        (generate_legitimate_marketing, 250),
-        (generate_legitimate_transactional, 200),
-        (generate_legitimate_password_reset, 100),
-        (generate_legitimate_meeting_invite, 200),
-        (generate_legitimate_document_share, 150),
-        (generate_legitimate_invoice, 100),
-        (generate_legitimate_with_attachment, 150),
-        (generate_legitimate_misconfigured, 100),
-        (generate_legitimate_urgent, 100),
-        (generate_legitimate_new_business, 100),
-        (generate_legitimate_qr_code, 50),
-    ]
+# Malicious scenario distribution (2100 of the 4200 base records)
+MALICIOUS_SCENARIOS = [
+    (generate_phishing_obvious, 250),
+    (generate_phishing_moderate, 200),
+    (generate_phishing_sophisticated, 100),
+    (generate_bec_obvious, 200),
+    (generate_bec_sophisticated, 150),
+    (generate_malware_executable, 150),
+    (generate_malware_macro, 200),
+    (generate_malware_evasive, 100),
+    (generate_ransomware, 100),
+    (generate_spam_obvious, 200),
+    (generate_evasion_encrypted, 100),
+    (generate_evasion_image_only, 80),
+    (generate_qr_phishing, 50),
+    (generate_known_threat_actor, 120),
+    (generate_callback_phishing, 100),
+]
+
+# Legitimate scenario distribution (2100 of the 4200 base records)
+LEGITIMATE_SCENARIOS = [
+    (generate_legitimate_enterprise, 350),
+    (generate_legitimate_smb, 250),
+    (generate_legitimate_marketing, 250),
+    (generate_legitimate_transactional, 200),
+    (generate_legitimate_password_reset, 100),
+    (generate_legitimate_meeting_invite, 200),
+    (generate_legitimate_document_share, 150),
+    (generate_legitimate_invoice, 100),
+    (generate_legitimate_with_attachment, 150),
+    (generate_legitimate_misconfigured, 100),
+    (generate_legitimate_urgent, 100),
+    (generate_legitimate_new_business, 100),
+    (generate_legitimate_qr_code, 50),
+]
+
+BASE_RECORD_COUNT = 4200
+
+def scale_scenarios(scenarios: List, n_records: int = BASE_RECORD_COUNT) -> List:
+    """Scale (generator, count) pairs from the 4200-record base to n_records.
+
+    Pass the whole base mix (MALICIOUS_SCENARIOS + LEGITIMATE_SCENARIOS):
+    counts are distributed over it with the largest-remainder method, so
+    they add up to exactly n_records, every scenario keeps its share and
+    the base mix is returned unchanged for n_records=4200.
+    """
+    base = sum(count for _, count in scenarios)
+    exact = [count * n_records / BASE_RECORD_COUNT for _, count in scenarios]
+    counts = [int(value) for value in exact]
+    target = round(base * n_records / BASE_RECORD_COUNT)
+    by_remainder = sorted(range(len(exact)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in by_remainder[:target - sum(counts)]:
+        counts[i] += 1
+    return [(func, count) for (func, _), count in zip(scenarios, counts)]
+
+def generate_dataset(output_file: str = "email_detection_signals.csv", n_records: int = BASE_RECORD_COUNT):
+    """Generate the complete dataset (4200 records by default).
+
+    Writes the CSV plus its typed .npz companion (see signal_store).
+    """
+
+    scenarios = scale_scenarios(MALICIOUS_SCENARIOS + LEGITIMATE_SCENARIOS, n_records)
+    malicious_scenarios = scenarios[:len(MALICIOUS_SCENARIOS)]
+    legitimate_scenarios = scenarios[len(MALICIOUS_SCENARIOS):]
 
     # Verify counts
     mal_count = sum(count for _, count in malicious_scenarios)
@@ -1654,6 +1714,7 @@ def generate_dataset(output_file: str = "email_detection_signals.csv"):
         writer = csv.DictWriter(f, fieldnames=SIGNAL_COLUMNS)
         writer.writeheader()
         writer.writerows(all_records)
+    write_signals(pd.DataFrame.from_records(all_records, columns=SIGNAL_COLUMNS), output_file)
 
     print("Done!")
 
@@ -1665,6 +1726,46 @@ def generate_dataset(output_file: str = "email_detection_signals.csv"):
     print(f"  Not Malicious: {leg_actual}")
     print(f"  Total: {len(all_records)}")
 
+# Records generated between writes in streaming mode
+STREAM_CHUNK_ROWS = 50_000
+
+def records_to_lines(records: List[Dict]) -> List[str]:
+    """Serialize records to CSV lines exactly as DictWriter.writerows would."""
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fieldnames=SIGNAL_COLUMNS).writerows(records)
+    return buffer.getvalue().splitlines(keepends=True)
+
+def generate_dataset_streaming(output_file: str = "email_detection_signals.csv", n_records: int = BASE_RECORD_COUNT,
+                               chunk_size: int = STREAM_CHUNK_ROWS, bucket_rows: int = BUCKET_ROWS, seed: int = 42):
+    """Generate the dataset in constant memory.
+
+    Records are serialized in chunks of chunk_size and handed to an external
+    bucket shuffle, so no more than one chunk and one bucket are ever held
+    in memory regardless of n_records.
+    """
+    scenarios = scale_scenarios(MALICIOUS_SCENARIOS + LEGITIMATE_SCENARIOS, n_records)
+    header = ",".join(SIGNAL_COLUMNS) + "\r\n"
+    label_counts = {"Malicious": 0, "Not Malicious": 0}
+
+    print(f"Streaming {n_records:,} records to {output_file}...")
+    with ExternalShuffleWriter(output_file, header, bucket_count(n_records, bucket_rows), seed) as writer:
+        chunk = []
+        for generator_func, count in scenarios:
+            for _ in range(count):
+                record = generator_func(create_base_record())
+                label_counts[record["label"]] += 1
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    writer.add_lines(records_to_lines(chunk))
+                    chunk = []
+        writer.add_lines(records_to_lines(chunk))
+
+    print("Done!")
+    print(f"\nSummary:")
+    print(f"  Malicious: {label_counts['Malicious']}")
+    print(f"  Not Malicious: {label_counts['Not Malicious']}")
+    print(f"  Total: {sum(label_counts.values())}")
+
 
 if __name__ == "__main__":
     generate_dataset("email_detection_signals.csv")
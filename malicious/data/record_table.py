@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Compact Record Table
+Array-backed container for email detection signal records, shared by the
+generators, the dataset correctors and the trainers. Each signal is one
+typed NumPy column:
+
+  - float signals are float64,
+  - bools, counts and category codes are int16,
+  - categorical signals (spf_result, tls_version, request_type, ...) are
+    codes into a per-table list of levels,
+
+and every column that contains NULLs has a packed null bitmap (1 bit per
+row). A few million records take a few hundred MB instead of the gigabytes
+needed for one dict of Python objects per record.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from generate_email_data import SIGNAL_COLUMNS
+from column_schema import CATEGORY_LEVELS, CATEGORICAL_SIGNALS, FLOAT_SIGNALS, INT_NULL
+from signal_store import pack_nulls, unpack_nulls, write_arrays
+
+class RecordTable:
+    """Columnar table of signal records with null bitmaps.
+
+    ``values`` maps each column to its value array (NULL slots hold 0),
+    ``nulls`` maps columns that contain NULLs to their packed bitmaps and
+    ``levels`` holds the category strings of each categorical column. Levels
+    start from column_schema.CATEGORY_LEVELS and grow when a table is built
+    from data containing other values (e.g. corrected labels).
+    """
+
+    def __init__(self, values: Dict[str, np.ndarray], nulls: Dict[str, np.ndarray],
+                 levels: Dict[str, List[str]], n: int):
+        self.values = values
+        self.nulls = nulls
+        self.levels = levels
+        self.n = n
+
+    @staticmethod
+    def default_levels() -> Dict[str, List[str]]:
+        return {col: list(levels) for col, levels in CATEGORY_LEVELS.items()}
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray],
+                     levels: Optional[Dict[str, List[str]]] = None) -> "RecordTable":
+        """From columnar_generator output (NaN / INT_NULL mark NULLs)."""
+        n = len(next(iter(columns.values())))
+        values, nulls = {}, {}
+        for col, array in columns.items():
+            mask = np.isnan(array) if array.dtype.kind == "f" else array == INT_NULL
+            bitmap = pack_nulls(mask)
+            if bitmap is not None:
+                nulls[col] = bitmap
+                array = np.where(mask, 0, array).astype(array.dtype)
+            values[col] = array
+        return cls(values, nulls, levels or cls.default_levels(), n)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]],
+                     columns: Sequence[str] = SIGNAL_COLUMNS) -> "RecordTable":
+        """From record dicts as built by generate_email_data (None = NULL)."""
+        return cls.from_dataframe(pd.DataFrame.from_records(records, columns=columns))
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "RecordTable":
+        """From a DataFrame such as pd.read_csv of a generated dataset.
+
+        Columns outside the signal schema are kept too: numeric ones as
+        float64 and anything else as a categorical with levels in order of
+        first appearance.
+        """
+        levels = cls.default_levels()
+        values, nulls = {}, {}
+        for col in df.columns:
+            series = df[col]
+            mask = series.isna().to_numpy()
+            if col in CATEGORICAL_SIGNALS or not pd.api.types.is_numeric_dtype(series):
+                col_levels = levels.setdefault(col, [])
+                known = set(col_levels)
+                col_levels.extend(v for v in pd.unique(series[~mask]) if v not in known)
+                array = pd.Categorical(series, categories=col_levels).codes.astype(np.int16)
+            elif col in FLOAT_SIGNALS or col not in SIGNAL_COLUMNS:
+                array = series.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                array = series.to_numpy(dtype=float, na_value=0).astype(np.int16)
+            bitmap = pack_nulls(mask)
+            if bitmap is not None:
+                nulls[col] = bitmap
+                array = np.where(mask, 0, array).astype(array.dtype)
+            values[col] = array
+        return cls(values, nulls, levels, len(df))
+
+    @classmethod
+    def load(cls, path: str, columns: Optional[Sequence[str]] = None) -> "RecordTable":
+        """Read a typed .npz dataset (see signal_store), optionally only some columns."""
+        with np.load(path, allow_pickle=False) as archive:
+            members = set(archive.files)
+            n = int(archive["__rows__"])
+            values, nulls, levels = {}, {}, {}
+            for col in columns or list(archive["__columns__"]):
+                values[col] = archive[col]
+                if f"{col}__nulls" in members:
+                    nulls[col] = archive[f"{col}__nulls"]
+                if f"{col}__levels" in members:
+                    levels[col] = [str(v) for v in archive[f"{col}__levels"]]
+        return cls(values, nulls, levels, n)
+
+    @classmethod
+    def concat(cls, tables: Iterable["RecordTable"]) -> "RecordTable":
+        """Stack tables with the same columns (categorical levels are merged)."""
+        tables = list(tables)
+        levels = {col: list(col_levels) for col, col_levels in tables[0].levels.items()}
+        n = sum(t.n for t in tables)
+        values, nulls = {}, {}
+        for col in tables[0].values:
+            parts = []
+            for t in tables:
+                part = t.values[col]
+                if col in t.levels and t.levels[col] != levels.get(col):
+                    col_levels = levels.setdefault(col, [])
+                    known = set(col_levels)
+                    col_levels.extend(v for v in t.levels[col] if v not in known)
+                    remap = np.array([col_levels.index(v) for v in t.levels[col]] or [0], dtype=np.int16)
+                    part = remap[part]
+                parts.append(part)
+            values[col] = np.concatenate(parts)
+            if any(col in t.nulls for t in tables):
+                nulls[col] = pack_nulls(np.concatenate([t.is_null(col) for t in tables]))
+        return cls(values, nulls, levels, n)
+
+    # ------------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by values and null bitmaps."""
+        return sum(a.nbytes for a in self.values.values()) + sum(b.nbytes for b in self.nulls.values())
+
+    def is_null(self, col: str) -> np.ndarray:
+        return unpack_nulls(self.nulls.get(col), self.n)
+
+    def column(self, col: str) -> np.ndarray:
+        """Column with NaN / INT_NULL sentinels, as columnar_generator stores it."""
+        array = self.values[col]
+        if col not in self.nulls:
+            return array
+        return np.where(self.is_null(col), np.nan if array.dtype.kind == "f" else INT_NULL, array).astype(array.dtype)
+
+    def code(self, col: str, value: str) -> int:
+        """Integer code of a category value (-1 if the table has no such level)."""
+        levels = self.levels[col]
+        return levels.index(value) if value in levels else -1
+
+    def take(self, indices: np.ndarray) -> "RecordTable":
+        """Rows at indices (a subset, or a permutation for shuffling)."""
+        values = {col: array[indices] for col, array in self.values.items()}
+        nulls = {}
+        for col in self.nulls:
+            bitmap = pack_nulls(self.is_null(col)[indices])
+            if bitmap is not None:
+                nulls[col] = bitmap
+        return RecordTable(values, nulls, self.levels, len(values[next(iter(values))]))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """One record as a dict, in the form the dict generators build."""
+        record = {}
+        for col, array in self.values.items():
+            if col in self.nulls and self.nulls[col][i >> 3] >> (i & 7) & 1:
+                record[col] = None
+            elif col in self.levels:
+                record[col] = self.levels[col][array[i]]
+            else:
+                record[col] = array[i].item()
+        return record
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """Dict of sentinel columns for columnar_generator.write_columns."""
+        return {col: self.column(col) for col in self.values}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame whose CSV form matches the dict-based generator."""
+        data = {}
+        for col, array in self.values.items():
+            mask = self.is_null(col)
+            if col in self.levels:
+                decoded = np.array(self.levels[col] + [None], dtype=object)
+                data[col] = decoded[np.where(mask, len(self.levels[col]), array)]
+            elif array.dtype.kind == "f":
+                data[col] = np.where(mask, np.nan, array)
+            else:
+                data[col] = pd.arrays.IntegerArray(array.astype(np.int64), mask)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def save(self, path: str):
+        """Write the table as a typed .npz dataset readable by signal_store.read_signals
+        (path may be the CSV it accompanies; see signal_store.write_arrays)."""
+        arrays = dict(self.values)
+        arrays.update({f"{col}__nulls": bitmap for col, bitmap in self.nulls.items()})
+        arrays.update({f"{col}__levels": np.array(self.levels[col]) for col in self.values if col in self.levels})
+        write_arrays(arrays, path)
+
+    def to_matrix(self, columns: Optional[Sequence[str]] = None, dtype=np.float32) -> np.ndarray:
+        """Dense feature matrix for the trainers: category codes as numbers, NULL = NaN."""
+        columns = columns or [col for col in self.values if col not in self.levels]
+        matrix = np.empty((self.n, len(columns)), dtype=dtype)
+        for j, col in enumerate(columns):
+            matrix[:, j] = self.values[col]
+            if col in self.nulls:
+                matrix[self.is_null(col), j] = np.nan
+        return matrix
@@ -16,12 +16,12 @@ REFINED APPROACH:
 - Ensure only highest-quality file-based threats remain in Malicious category
 """
 
-import pandas as pd
-import numpy as np
+from signal_store import read_signals, write_signals
+from relabel_rules import FILE_SIGNALS, REFINED_RULES, LabelIs, PredicateCache
 
 def load_corrected_dataset():
     """Load the previously corrected dataset"""
-    df = pd.read_csv("/home/u3/investigation/malicious/data/email_detection_signals_corrected.csv")
+    df = read_signals("/home/u3/investigation/malicious/data/email_detection_signals_corrected.csv")
     print(f"Loaded corrected dataset: {len(df)} rows")
     return df
 
@@ -91,6 +91,9 @@ def refined_relabel_function(row):
     3. URL-based threats = Warning
     4. High spam content = Spam
     5. Everything else = No Action
+
+    Reference definition for one row; the correction pass uses the
+    vectorized relabel_rules.REFINED_RULES, which must give the same labels.
     """
 
     # Define strong file-based threat indicators (very confident malware signals)
@@ -154,33 +157,32 @@ def apply_refined_corrections(df):
     print(f"\n=== APPLYING REFINED CORRECTIONS ===")
 
     refined_df = df.copy()
-    refined_df['refined_label'] = refined_df.apply(refined_relabel_function, axis=1)
+    labels, fired = REFINED_RULES.apply(refined_df)
+    refined_df['refined_label'] = labels
+    refined_df['refined_rule'] = fired  # int8 code into REFINED_RULES.names
 
     print(f"Refined Label Distribution:")
     refined_counts = refined_df['refined_label'].value_counts()
     for label, count in refined_counts.items():
         print(f"  {label}: {count} ({count/len(refined_df)*100:.1f}%)")
 
+    print(f"Rules Fired:")
+    for rule, count in REFINED_RULES.explain(fired).items():
+        print(f"  {rule}: {count}")
+
     return refined_df
 
-def validate_refined_corrections(df):
+def validate_refined_corrections(df, cache=None):
     """Validate that refined corrections meet all targets"""
     print(f"\n=== REFINED VALIDATION ===")
+    cache = cache or PredicateCache(df)
 
     refined_malicious = df[df['refined_label'] == 'Malicious']
 
     if len(refined_malicious) > 0:
         # Signal activation rate
-        file_signal_mask = (
-            (refined_malicious.get('any_file_hash_malicious', 0) == 1.0) |
-            (refined_malicious.get('has_executable_attachment', 0) == 1.0) |
-            (refined_malicious.get('any_macro_enabled_document', 0) == 1.0) |
-            (refined_malicious.get('any_exploit_pattern_detected', 0) == 1.0) |
-            (refined_malicious.get('max_behavioral_sandbox_score', 0) > 0.60) |
-            (refined_malicious.get('packer_detected', 0) == 1.0)
-        )
-
-        activation_rate = (file_signal_mask.sum() / len(refined_malicious)) * 100
+        file_signal_count = cache.count(LabelIs('refined_label', 'Malicious') & FILE_SIGNALS)
+        activation_rate = (file_signal_count / len(refined_malicious)) * 100
         spam_score_mean = refined_malicious['content_spam_score'].mean()
 
         print(f"Refined Malicious Category Validation:")
@@ -206,28 +208,23 @@ def validate_refined_corrections(df):
     else:
         print("No samples in refined Malicious category!")
 
-def compare_correction_approaches(df):
-    """Compare original correction vs refined correction"""
+def compare_correction_approaches(df, cache=None, approaches=('corrected_label', 'refined_label')):
+    """Compare original correction vs refined correction
+
+    Every approach is scored from the same predicate cache, so the file
+    signal mask is computed once however many label columns are compared.
+    """
     print(f"\n=== CORRECTION APPROACH COMPARISON ===")
+    cache = cache or PredicateCache(df)
 
     comparison_data = []
-    for approach in ['corrected_label', 'refined_label']:
-        approach_df = df[df[approach] == 'Malicious']
-
-        if len(approach_df) > 0:
-            spam_mean = approach_df['content_spam_score'].mean()
-            count = len(approach_df)
-
-            file_signals = (
-                (approach_df.get('any_file_hash_malicious', 0) == 1.0) |
-                (approach_df.get('has_executable_attachment', 0) == 1.0) |
-                (approach_df.get('any_macro_enabled_document', 0) == 1.0) |
-                (approach_df.get('any_exploit_pattern_detected', 0) == 1.0) |
-                (approach_df.get('max_behavioral_sandbox_score', 0) > 0.60) |
-                (approach_df.get('packer_detected', 0) == 1.0)
-            ).sum()
-
-            activation_rate = file_signals / len(approach_df) * 100
+    for approach in approaches:
+        malicious = LabelIs(approach, 'Malicious')
+        count = cache.count(malicious)
+
+        if count > 0:
+            spam_mean = df.loc[cache.mask(malicious), 'content_spam_score'].mean()
+            activation_rate = cache.count(malicious & FILE_SIGNALS) / count * 100
         else:
             spam_mean, count, activation_rate = 0, 0, 0
 
@@ -247,6 +244,7 @@ def save_refined_results(df):
     """Save refined correction results"""
     output_path = "/home/u3/investigation/malicious/data/email_detection_signals_refined.csv"
     df.to_csv(output_path, index=False)
+    write_signals(df, output_path)
     print(f"\nRefined dataset saved: {output_path}")
 
 def main():
@@ -264,10 +262,11 @@ def main():
     refined_df = apply_refined_corrections(df)
 
     # Validate refined corrections
-    validate_refined_corrections(refined_df)
+    cache = PredicateCache(refined_df)
+    validate_refined_corrections(refined_df, cache)
 
     # Compare approaches
-    compare_correction_approaches(refined_df)
+    compare_correction_approaches(refined_df, cache)
 
     # Save results
     save_refined_results(refined_df)
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Vectorized Relabeling Rules
+The relabel hierarchies of dataset_corrector, refined_corrector and
+final_dataset_optimizer as ordered rule sets: named predicates over signal
+thresholds, each with a target label. Rule sets are evaluated as boolean
+masks over the whole frame, so a multi-million-row export is relabeled in
+one pass of array operations instead of one Python call per row, and every
+row also gets the int8 code of the rule that labeled it.
+
+A PredicateStore keeps the predicate bitmasks on disk next to the dataset,
+so after a rule edit only the changed predicates are recomputed:
+
+    labels, fired = refined_rules(0.75).apply(cache=PredicateStore("signals.csv"))
+
+The row functions stay in their scripts as the reference definition;
+verify_relabel() checks that both give identical labels:
+
+    python relabel_rules.py [signals.csv] [rows]
+"""
+
+import hashlib
+import json
+import operator
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from signal_store import read_signals, typed_path, write_signals
+
+# ============================================================================
+# RULE LANGUAGE
+# ============================================================================
+#
+# A rule set is an ordered list of Rule(name, when, label): the first rule
+# whose predicate holds gives the row its label, rows no rule matches get the
+# default. Predicates are built from Signal leaves (`field <op> value`)
+# combined with &, | and ~, and are evaluated through a PredicateCache: every
+# distinct predicate (leaf or compound, identified by its text) is computed
+# once per frame and kept as a packed bitmask, so rule sets and report checks
+# that share sub-expressions share the work. The rule that fired is recorded
+# as an int8 code into RuleSet.names (the last name is the default), so an
+# explanation per row costs one byte.
+
+# Set bits per byte value (np.bitwise_count needs numpy 2.0)
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+class PredicateCache:
+    """Packed bitmasks (1 bit per row) of predicates over one frame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.n = len(df)
+        self.bits: Dict[str, np.ndarray] = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.all_rows = self.pack(np.ones(self.n, dtype=bool))
+
+    def series(self, field: str) -> Optional[pd.Series]:
+        """Raw column, or None when the frame has no such column."""
+        return self.df[field] if field in self.df.columns else None
+
+    def column(self, field: str) -> np.ndarray:
+        """Column as float64 with NaN for NULL; all zeros when the column is
+        missing (the row functions' row.get(col, 0))."""
+        if field not in self.columns:
+            series = self.series(field)
+            self.columns[field] = (np.zeros(self.n) if series is None
+                                   else series.to_numpy(dtype=float, na_value=np.nan))
+        return self.columns[field]
+
+    def pack(self, mask: np.ndarray) -> np.ndarray:
+        return np.packbits(mask, bitorder="little")
+
+    def packed(self, predicate: "Predicate") -> np.ndarray:
+        key = str(predicate)
+        if key not in self.bits:
+            self.bits[key] = predicate.evaluate(self)
+        return self.bits[key]
+
+    def mask(self, predicate: "Predicate") -> np.ndarray:
+        """Bool mask of the rows where the predicate holds."""
+        return np.unpackbits(self.packed(predicate), count=self.n, bitorder="little").view(bool)
+
+    def count(self, predicate: "Predicate") -> int:
+        """Rows where the predicate holds."""
+        return int(POPCOUNT[self.packed(predicate)].sum(dtype=np.int64))
+
+class PredicateStore(PredicateCache):
+    """PredicateCache persisted next to a dataset file.
+
+    Bitmasks live in <dataset>.predicates/, one .npy per predicate, named by
+    a hash of the dataset content plus the predicate text. Editing a rule
+    therefore only recomputes the predicates whose text changed, and only
+    the columns those predicates read are loaded (through the typed .npz
+    companion, see signal_store). The content hash is kept in manifest.json
+    with the file's size and mtime and recomputed only when those change;
+    a new hash clears the old bitmasks.
+    """
+
+    def __init__(self, path: str):
+        # Make sure a fresh typed companion exists so columns can be read one by one
+        read_signals(path, columns=[], cache=True)
+        self.path = path
+        self.directory = os.path.splitext(path)[0] + ".predicates"
+        self.dataset_hash = self._dataset_hash()
+        with np.load(path if path.endswith(".npz") else typed_path(path), allow_pickle=False) as archive:
+            self.names = set(archive["__columns__"])
+            self.n = int(archive["__rows__"])
+        self.bits: Dict[str, np.ndarray] = {}
+        self.columns: Dict[str, np.ndarray] = {}
+        self.all_rows = self.pack(np.ones(self.n, dtype=bool))
+        self.loaded = self.computed = 0
+
+    def _dataset_hash(self) -> str:
+        manifest_path = os.path.join(self.directory, "manifest.json")
+        stat = os.stat(self.path)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        if manifest.get("size") == stat.st_size and manifest.get("mtime_ns") == stat.st_mtime_ns:
+            return manifest["dataset_hash"]
+
+        digest = hashlib.blake2b(digest_size=16)
+        with open(self.path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        dataset_hash = digest.hexdigest()
+        if os.path.isdir(self.directory) and manifest.get("dataset_hash") != dataset_hash:
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(manifest_path, "w") as f:
+            json.dump({"dataset": os.path.basename(self.path), "dataset_hash": dataset_hash,
+                       "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, f, indent=2)
+        return dataset_hash
+
+    def series(self, field):
+        if field not in self.names:
+            return None
+        return read_signals(self.path, columns=[field])[field]
+
+    def packed(self, predicate):
+        key = str(predicate)
+        if key not in self.bits:
+            name = hashlib.blake2b(f"{self.dataset_hash}\n{key}".encode(), digest_size=16).hexdigest()
+            file_path = os.path.join(self.directory, name + ".npy")
+            if os.path.exists(file_path):
+                self.bits[key] = np.load(file_path)
+                self.loaded += 1
+            else:
+                self.bits[key] = predicate.evaluate(self)
+                self.computed += 1
+                temp_path = file_path + ".tmp.npy"
+                np.save(temp_path, self.bits[key])
+                os.replace(temp_path, file_path)
+        return self.bits[key]
+
+class Predicate:
+    """Base class for rule predicates."""
+
+    def leaves(self) -> List["Signal"]:
+        raise NotImplementedError
+
+    def evaluate(self, cache: PredicateCache) -> np.ndarray:
+        """Packed bitmask over the cache's rows (called once per cache)."""
+        raise NotImplementedError
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return All(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return AnyOf(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return Not(self)
+
+class Signal(Predicate):
+    """Row condition `field <op> value`. NULLs and missing columns behave as
+    in the row functions: a missing column reads as 0, a NULL fails every
+    comparison."""
+
+    OPS = {"==": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge,
+           "<": operator.lt, "<=": operator.le}
+
+    def __init__(self, field: str, op: str, value: float):
+        self.field, self.op, self.value = field, op, value
+
+    def leaves(self):
+        return [self]
+
+    def evaluate(self, cache):
+        return cache.pack(self.OPS[self.op](cache.column(self.field), self.value))
+
+    def __str__(self):
+        return f"{self.field} {self.op} {self.value}"
+
+def is_set(field: str) -> Signal:
+    return Signal(field, "==", 1.0)
+
+class LabelIs(Predicate):
+    """Row condition `field == label` on a string column (e.g. corrected_label)."""
+
+    def __init__(self, field: str, label: str):
+        self.field, self.label = field, label
+
+    def leaves(self):
+        return []
+
+    def evaluate(self, cache):
+        series = cache.series(self.field)
+        if series is None:
+            return cache.pack(np.zeros(cache.n, dtype=bool))
+        return cache.pack((series == self.label).to_numpy(dtype=bool, na_value=False))
+
+    def __str__(self):
+        return f"{self.field} is {self.label!r}"
+
+class All(Predicate):
+    """Every part holds."""
+
+    def __init__(self, *parts: Predicate):
+        self.parts = parts
+
+    def leaves(self):
+        return [leaf for part in self.parts for leaf in part.leaves()]
+
+    def evaluate(self, cache):
+        return np.bitwise_and.reduce([cache.packed(part) for part in self.parts])
+
+    def __str__(self):
+        return "(" + " & ".join(map(str, self.parts)) + ")"
+
+class AnyOf(Predicate):
+    """At least one part holds."""
+
+    def __init__(self, *parts: Predicate):
+        self.parts = parts
+
+    def leaves(self):
+        return [leaf for part in self.parts for leaf in part.leaves()]
+
+    def evaluate(self, cache):
+        return np.bitwise_or.reduce([cache.packed(part) for part in self.parts])
+
+    def __str__(self):
+        return "(" + " | ".join(map(str, self.parts)) + ")"
+
+class Not(Predicate):
+    """The part does not hold (a NULL comparison counts as not holding)."""
+
+    def __init__(self, part: Predicate):
+        self.part = part
+
+    def leaves(self):
+        return self.part.leaves()
+
+    def evaluate(self, cache):
+        # Mask with all_rows so the padding bits of the last byte stay 0
+        return ~cache.packed(self.part) & cache.all_rows
+
+    def __str__(self):
+        return f"~{self.part}"
+
+class Rule(NamedTuple):
+    name: str
+    when: Predicate
+    label: str
+
+class RuleSet:
+    """Ordered rules compiled for vectorized evaluation."""
+
+    def __init__(self, rules: List[Rule], default: str = "No Action"):
+        if len(rules) >= np.iinfo(np.int8).max:
+            raise ValueError("too many rules for an int8 fired-rule code")
+        self.rules = rules
+        self.default = default
+        self.names = [rule.name for rule in rules] + ["default"]
+        self.labels = np.array([rule.label for rule in rules] + [default], dtype=object)
+        self.fields = sorted({leaf.field for rule in rules for leaf in rule.when.leaves()})
+
+    def fire(self, df: Optional[pd.DataFrame] = None, cache: Optional[PredicateCache] = None) -> np.ndarray:
+        """int8 code of the first rule that holds for each row (len(rules) = default).
+
+        Pass the frame, or a cache (e.g. a PredicateStore) to work from.
+        """
+        cache = cache or PredicateCache(df)
+        fired = np.full(cache.n, len(self.rules), dtype=np.int8)
+        for code in range(len(self.rules) - 1, -1, -1):
+            np.putmask(fired, cache.mask(self.rules[code].when), code)
+        return fired
+
+    def apply(self, df: Optional[pd.DataFrame] = None,
+              cache: Optional[PredicateCache] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(labels, fired-rule codes) for every row."""
+        fired = self.fire(df, cache)
+        return self.labels.take(fired), fired
+
+    def explain(self, fired: np.ndarray) -> pd.Series:
+        """Rows per rule, in rule order."""
+        counts = np.bincount(fired, minlength=len(self.names))
+        return pd.Series(counts, index=self.names)
+
+    def describe(self) -> str:
+        lines = [f"  {code}. {rule.name}: {rule.when} -> {rule.label}" for code, rule in enumerate(self.rules)]
+        return "\n".join(lines + [f"  {len(self.rules)}. default -> {self.default}"])
+
+def apply_strategies(df: Optional[pd.DataFrame], strategies: Dict[str, RuleSet],
+                     cache: Optional[PredicateCache] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """(labels, fired) of several rule sets, sharing one predicate cache."""
+    cache = cache or PredicateCache(df)
+    return {name: rules.apply(df, cache) for name, rules in strategies.items()}
+
+# ============================================================================
+# RELABEL HIERARCHIES
+# ============================================================================
+
+BEHAVIORAL = 'max_behavioral_sandbox_score'
+SPAM_SCORE = 'content_spam_score'
+
+CONFIRMED_MALWARE = is_set('any_file_hash_malicious') | is_set('any_exploit_pattern_detected')
+MODERATE_MALWARE = AnyOf(is_set('has_executable_attachment'), is_set('any_macro_enabled_document'),
+                         is_set('packer_detected'), Signal(BEHAVIORAL, ">", 0.60))
+FILE_SIGNALS = CONFIRMED_MALWARE | MODERATE_MALWARE
+URL_THREATS = AnyOf(is_set('final_url_known_malicious'), is_set('domain_known_malicious'),
+                    is_set('is_high_risk_role_targeted') & is_set('urgency_keywords_present'))
+BULK = is_set('bulk_message_indicator')
+
+# dataset_corrector.relabel_for_multi_model
+MULTI_MODEL_RULES = RuleSet([
+    Rule("file_threat", FILE_SIGNALS, "Malicious"),
+    Rule("url_threat", URL_THREATS, "Warning"),
+    Rule("spam_content", Signal(SPAM_SCORE, ">", 0.55) | BULK, "Spam"),
+])
+
+def refined_rules(strong_behavioral: float = 0.80) -> RuleSet:
+    """refined_corrector.refined_relabel_function (behavioral score above
+    strong_behavioral counts as a strong file signal)."""
+    strong = CONFIRMED_MALWARE | Signal(BEHAVIORAL, ">", strong_behavioral)
+    return RuleSet([
+        Rule("strong_low_spam", strong & Signal(SPAM_SCORE, "<", 0.45), "Malicious"),
+        Rule("moderate_clean", MODERATE_MALWARE & Signal(SPAM_SCORE, "<", 0.25), "Malicious"),
+        Rule("confirmed_spam_hybrid", All(strong, Signal(SPAM_SCORE, ">=", 0.45), CONFIRMED_MALWARE), "Malicious"),
+        Rule("behavioral_spam_hybrid", strong & Signal(SPAM_SCORE, ">=", 0.45), "Spam"),
+        Rule("url_threat", URL_THREATS, "Warning"),
+        Rule("spam_content", Signal(SPAM_SCORE, ">", 0.55) | BULK, "Spam"),
+    ])
+
+REFINED_RULES = refined_rules()
+
+# final_dataset_optimizer.optimal_relabel_function
+SPAM_INDICATORS = Signal(SPAM_SCORE, ">", 0.65) | BULK
+OPTIMAL_RULES = RuleSet([
+    Rule("confirmed_malware", CONFIRMED_MALWARE, "Malicious"),
+    Rule("strong_malware", Signal(BEHAVIORAL, ">", 0.75) |
+         (is_set('has_executable_attachment') & is_set('packer_detected')), "Malicious"),
+    Rule("moderate_not_spam", MODERATE_MALWARE & ~SPAM_INDICATORS, "Malicious"),
+    Rule("phishing", URL_THREATS & ~MODERATE_MALWARE, "Warning"),
+    Rule("spam", SPAM_INDICATORS | Signal(SPAM_SCORE, ">", 0.60), "Spam"),
+])
+
+STRATEGIES = {
+    'corrected_label': MULTI_MODEL_RULES,
+    'refined_label': REFINED_RULES,
+    'optimal_label': OPTIMAL_RULES,
+}
+
+def file_signals(df: pd.DataFrame) -> np.ndarray:
+    """Any file-based threat signal (the activation check used in the reports)."""
+    return PredicateCache(df).mask(FILE_SIGNALS)
+
+def relabel_multi_model(df: pd.DataFrame) -> np.ndarray:
+    """dataset_corrector.relabel_for_multi_model for every row."""
+    return MULTI_MODEL_RULES.apply(df)[0]
+
+def relabel_refined(df: pd.DataFrame) -> np.ndarray:
+    """refined_corrector.refined_relabel_function for every row."""
+    return REFINED_RULES.apply(df)[0]
+
+def relabel_optimal(df: pd.DataFrame) -> np.ndarray:
+    """final_dataset_optimizer.optimal_relabel_function for every row."""
+    return OPTIMAL_RULES.apply(df)[0]
+
+# ============================================================================
+# EQUIVALENCE CHECK
+# ============================================================================
+
+def verify_relabel(df: pd.DataFrame, vectorized: Callable, row_function: Callable) -> int:
+    """Number of rows where the vectorized rules disagree with the row function."""
+    expected = df.apply(row_function, axis=1).to_numpy(dtype=object)
+    actual = vectorized(df).astype(object)
+    return int((expected != actual).sum())
+
+def stress_frame(df: pd.DataFrame, rng: np.random.Generator) -> pd.DataFrame:
+    """Copy of df with the rule inputs perturbed around every threshold,
+    with NULLs mixed in, so all tiers and tie cases get exercised."""
+    stressed = df.copy()
+    n = len(df)
+    for col in ['content_spam_score', 'max_behavioral_sandbox_score']:
+        values = rng.choice([0.0, 0.25, 0.45, 0.55, 0.60, 0.65, 0.75, 0.80, 1.0], size=n)
+        values = values + rng.choice([-1e-9, 0.0, 1e-9], size=n)
+        values[rng.random(n) < 0.05] = np.nan
+        stressed[col] = values
+    for col in ['any_file_hash_malicious', 'any_exploit_pattern_detected', 'has_executable_attachment',
+                'any_macro_enabled_document', 'packer_detected', 'final_url_known_malicious',
+                'domain_known_malicious', 'is_high_risk_role_targeted', 'urgency_keywords_present',
+                'bulk_message_indicator']:
+        values = (rng.random(n) < 0.3).astype(float)
+        values[rng.random(n) < 0.05] = np.nan
+        stressed[col] = values
+    return stressed
+
+
+if __name__ == "__main__":
+    from dataset_corrector import relabel_for_multi_model
+    from refined_corrector import refined_relabel_function
+    from final_dataset_optimizer import optimal_relabel_function
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "email_detection_signals.csv"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    base = read_signals(path)
+    rng = np.random.default_rng(0)
+
+    rules = [
+        ("multi-model", relabel_multi_model, relabel_for_multi_model),
+        ("refined", relabel_refined, refined_relabel_function),
+        ("optimal", relabel_optimal, optimal_relabel_function),
+    ]
+
+    print(f"Equivalence on {path} ({len(base)} rows) and a threshold stress copy:")
+    failed = False
+    for name, vectorized, row_function in rules:
+        for label, frame in [("data", base), ("stress", stress_frame(base, rng))]:
+            mismatches = verify_relabel(frame, vectorized, row_function)
+            failed |= mismatches > 0
+            print(f"  {name:<12} {label:<7} {'OK' if mismatches == 0 else f'{mismatches} MISMATCHES'}")
+
+    big = base.iloc[np.resize(np.arange(len(base)), rows)].reset_index(drop=True)
+    print(f"\nSpeed on {rows:,} rows:")
+    for name, vectorized, row_function in rules:
+        start = time.perf_counter()
+        big.apply(row_function, axis=1)
+        row_time = time.perf_counter() - start
+        start = time.perf_counter()
+        vectorized(big)
+        vector_time = time.perf_counter() - start
+        print(f"  {name:<12} apply {row_time:7.2f}s  vectorized {vector_time:7.4f}s  ({row_time / vector_time:,.0f}x)")
+
+    start = time.perf_counter()
+    for rule_set in STRATEGIES.values():
+        rule_set.apply(big)
+    separate = time.perf_counter() - start
+    start = time.perf_counter()
+    apply_strategies(big, STRATEGIES)
+    shared = time.perf_counter() - start
+    print(f"  all {len(STRATEGIES)} strategies: separate {separate:.4f}s, shared cache {shared:.4f}s")
+
+    # Edit one threshold of the refined rules and relabel from the on-disk cache
+    edited = refined_rules(strong_behavioral=0.75)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset = os.path.join(tmp_dir, "signals.npz")
+        write_signals(big, dataset)
+        print(f"\nIncremental relabel of {rows:,} stored rows (behavioral > 0.80 -> 0.75):")
+        for step, rule_set in [("cold", REFINED_RULES), ("warm", REFINED_RULES), ("edited", edited)]:
+            start = time.perf_counter()
+            store = PredicateStore(dataset)
+            labels, fired = rule_set.apply(cache=store)
+            print(f"  {step:<7} {time.perf_counter() - start:7.4f}s  "
+                  f"({store.computed} predicates computed, {store.loaded} loaded)")
+        failed |= not np.array_equal(labels, edited.apply(big)[0])
+
+        # A CSV without a companion, as in PredicateStore("signals.csv")
+        csv_dataset = os.path.join(tmp_dir, "signals.csv")
+        big.to_csv(csv_dataset, index=False)
+        csv_labels, _ = REFINED_RULES.apply(cache=PredicateStore(csv_dataset))
+        csv_ok = np.array_equal(csv_labels, REFINED_RULES.apply(read_signals(csv_dataset))[0])
+        print(f"  CSV path {'OK' if csv_ok else 'MISMATCH'} (companion {'written' if os.path.exists(typed_path(csv_dataset)) else 'missing'})")
+        failed |= not csv_ok
+
+    sys.exit(1 if failed else 0)
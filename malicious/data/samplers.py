@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Alias-Table Samplers
+Weighted categorical sampling with Walker/Vose alias tables. A table is built
+once per (choices, weights) pair and cached in a registry; after that a
+scalar draw costs one random.random() call and a batch of k draws is two
+vectorized NumPy operations.
+"""
+
+import random
+from typing import Any, Dict, Hashable, List, Sequence, Tuple
+
+import numpy as np
+
+class AliasSampler:
+    """O(1) weighted sampler over a fixed list of choices."""
+
+    def __init__(self, choices: Sequence[Any], weights: Sequence[float]):
+        if len(choices) != len(weights) or not choices:
+            raise ValueError("choices and weights must be non-empty and of equal length")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("weights must sum to a positive value")
+
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are exactly 1.0 up to rounding and keep prob 1.0
+
+        self.choices = list(choices)
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+        self.prob_array = np.asarray(prob)
+        self.alias_array = np.asarray(alias, dtype=np.intp)
+
+    def draw(self) -> Any:
+        """One draw using a single random.random() call."""
+        u = random.random() * self.n
+        i = int(u)
+        return self.choices[i] if u - i < self.prob[i] else self.choices[self.alias[i]]
+
+    def draw_indices(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """size draws as indices into choices."""
+        u = rng.random(size) * self.n
+        i = u.astype(np.intp)
+        return np.where(u - i < self.prob_array[i], i, self.alias_array[i])
+
+    def draw_many(self, rng: np.random.Generator, size: int) -> List[Any]:
+        """size draws as a list of choice values."""
+        return [self.choices[i] for i in self.draw_indices(rng, size)]
+
+_SAMPLERS: Dict[Tuple[Hashable, Hashable], AliasSampler] = {}
+
+# Registry keys pair every choice with its type: 0 == False == 0.0 hash alike,
+# but [0, 1], [False, True] and [0.0, 1.0] must get their own samplers
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return type(value), value
+
+def get_sampler(choices: Sequence[Any], weights: Sequence[float]) -> AliasSampler:
+    """Cached AliasSampler for this (choices, weights) pair."""
+    try:
+        key = (tuple((type(c), c) for c in choices), tuple(weights))
+        sampler = _SAMPLERS.get(key)
+    except TypeError:  # unhashable choices such as auth pattern dicts
+        key = (_freeze(choices), tuple(weights))
+        sampler = _SAMPLERS.get(key)
+    if sampler is None:
+        sampler = _SAMPLERS[key] = AliasSampler(choices, weights)
+    return sampler
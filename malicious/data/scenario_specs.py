@@ -0,0 +1,1291 @@
+#!/usr/bin/env python3
+"""
+Declarative Scenario Specs
+The 28 email scenarios of generate_email_data.py as data: each scenario names
+an optional parent and a mapping of signal -> distribution spec. Specs are
+resolved through the parent chain at import time into one flat field table
+per scenario, ordered by dependencies, so generation draws every field exactly
+once instead of running the parent generator and overwriting its output.
+
+Adding a scenario or tweaking a distribution is a change to SCENARIO_SPECS.
+"""
+
+import json
+import operator
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+import numpy as np
+
+from column_schema import URL_DETAIL_SIGNALS, encode, null_column, random_floats, weighted_indices
+from generate_email_data import (
+    SIGNAL_COLUMNS,
+    AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS,
+    AUTH_PATTERNS_LEGITIMATE, AUTH_WEIGHTS_LEGITIMATE,
+    TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS, TLS_WEIGHTS_LEGITIMATE,
+    SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS,
+    PROCESS_CHAINS_MALICIOUS, PROCESS_WEIGHTS_MALICIOUS,
+    PROCESS_CHAINS_MACRO, PROCESS_WEIGHTS_MACRO,
+    PROCESS_CHAINS_LEGITIMATE, PROCESS_WEIGHTS_LEGITIMATE,
+    PROCESS_NAMES_LEGITIMATE_NULL_RATE,
+    REQUEST_TYPES_MALICIOUS, REQUEST_WEIGHTS_MALICIOUS,
+)
+
+# ============================================================================
+# SPEC NODES
+# ============================================================================
+#
+# Every node draws values for one target column. `rows` is the index array of
+# the rows being drawn (None = all rows of the batch) and `n` their count.
+# Field names starting with "_" are latent: drawn like any other field so
+# several signals can share them, but never written to the output.
+
+class Spec:
+    """Base class for per-field distribution specs."""
+
+    def deps(self) -> Set[str]:
+        """Fields this spec reads."""
+        return set()
+
+    def resolve(self, inherited: "Spec") -> "Spec":
+        """Replace Inherit() placeholders with the parent's spec."""
+        return self
+
+    def draw(self, col: str, rng: np.random.Generator, columns: Dict[str, np.ndarray],
+             rows: Optional[np.ndarray], n: int) -> np.ndarray:
+        raise NotImplementedError
+
+class Const(Spec):
+    """Fixed value for every row (None = NULL)."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def draw(self, col, rng, columns, rows, n):
+        values = null_column(col, n)
+        values[:] = encode(col, [self.value])[0]
+        return values
+
+NULL = Const(None)
+
+class Uniform(Spec):
+    """random_float(low, high)."""
+
+    def __init__(self, low: float, high: float):
+        self.low, self.high = low, high
+
+    def draw(self, col, rng, columns, rows, n):
+        return random_floats(rng, self.low, self.high, n)
+
+class RandInt(Spec):
+    """random.randint(low, high), inclusive."""
+
+    def __init__(self, low: int, high: int):
+        self.low, self.high = low, high
+
+    def draw(self, col, rng, columns, rows, n):
+        return rng.integers(self.low, self.high + 1, n)
+
+class Choice(Spec):
+    """weighted_choice(choices, weights)."""
+
+    def __init__(self, choices: List[Any], weights: List[float]):
+        self.choices, self.weights = choices, weights
+
+    def draw(self, col, rng, columns, rows, n):
+        return encode(col, self.choices)[weighted_indices(rng, self.weights, n)]
+
+class Ref(Spec):
+    """Copy of another field's value."""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def deps(self):
+        return {self.field}
+
+    def draw(self, col, rng, columns, rows, n):
+        values = columns[self.field]
+        return values.copy() if rows is None else values[rows]
+
+class Pick(Spec):
+    """values[latent] for an index-valued latent field."""
+
+    def __init__(self, latent: str, values: List[Any]):
+        self.latent, self.values = latent, values
+
+    def deps(self):
+        return {self.latent}
+
+    def draw(self, col, rng, columns, rows, n):
+        index = columns[self.latent] if rows is None else columns[self.latent][rows]
+        return encode(col, self.values)[index]
+
+class Add(Spec):
+    """Sum of two numeric specs."""
+
+    def __init__(self, left: Spec, right: Spec):
+        self.left, self.right = left, right
+
+    def deps(self):
+        return self.left.deps() | self.right.deps()
+
+    def resolve(self, inherited):
+        return Add(self.left.resolve(inherited), self.right.resolve(inherited))
+
+    def draw(self, col, rng, columns, rows, n):
+        return self.left.draw(col, rng, columns, rows, n) + self.right.draw(col, rng, columns, rows, n)
+
+class Inherit(Spec):
+    """Placeholder for the parent scenario's spec of the same field."""
+
+    def resolve(self, inherited):
+        return inherited
+
+    def draw(self, col, rng, columns, rows, n):
+        raise ValueError(f"unresolved Inherit() for {col}")
+
+class Cond:
+    """Row condition `field <op> value` on an already drawn field."""
+
+    OPS = {"==": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge,
+           "<": operator.lt, "<=": operator.le}
+
+    def __init__(self, field: str, op: str, value: Any):
+        self.field, self.op, self.value = field, self.OPS[op], value
+
+    def deps(self) -> Set[str]:
+        return {self.field}
+
+    def mask(self, rng, columns, rows, n) -> np.ndarray:
+        values = columns[self.field] if rows is None else columns[self.field][rows]
+        return self.op(values, encode(self.field, [self.value])[0])
+
+class Chance:
+    """Independent per-row coin: random.random() < p."""
+
+    def __init__(self, p: float):
+        self.p = p
+
+    def deps(self) -> Set[str]:
+        return set()
+
+    def mask(self, rng, columns, rows, n) -> np.ndarray:
+        return rng.random(n) < self.p
+
+class When(Spec):
+    """`then` where the condition holds, `otherwise` elsewhere (default NULL)."""
+
+    def __init__(self, cond, then: Spec, otherwise: Spec = NULL):
+        self.cond, self.then, self.otherwise = cond, then, otherwise
+
+    def deps(self):
+        return self.cond.deps() | self.then.deps() | self.otherwise.deps()
+
+    def resolve(self, inherited):
+        return When(self.cond, self.then.resolve(inherited), self.otherwise.resolve(inherited))
+
+    def draw(self, col, rng, columns, rows, n):
+        mask = self.cond.mask(rng, columns, rows, n)
+        values = null_column(col, n)
+        for branch, selected in ((self.then, mask), (self.otherwise, ~mask)):
+            count = int(np.count_nonzero(selected))
+            if branch is NULL or count == 0:
+                continue
+            branch_rows = np.flatnonzero(selected) if rows is None else rows[selected]
+            values[selected] = branch.draw(col, rng, columns, branch_rows, count)
+        return values
+
+# ============================================================================
+# SPEC HELPERS
+# ============================================================================
+
+HAS_URLS = Cond("url_count", ">", 0)
+
+def auth(patterns: List[Dict[str, str]], weights: List[float]) -> Dict[str, Spec]:
+    """Joint spf/dkim/dmarc draw from an auth pattern table via a shared latent."""
+    return {
+        "_auth_pattern": Choice(list(range(len(patterns))), weights),
+        "spf_result": Pick("_auth_pattern", [p["spf"] for p in patterns]),
+        "dkim_result": Pick("_auth_pattern", [p["dkim"] for p in patterns]),
+        "dmarc_result": Pick("_auth_pattern", [p["dmarc"] for p in patterns]),
+    }
+
+def process_chains(chains: List[List[str]]) -> List[str]:
+    """Parent process chains as the JSON strings stored in the dataset."""
+    return [json.dumps(chain) for chain in chains]
+
+def safe_attachment(metadata_high: float, behavioral_high: float, embedded_high: int,
+                    entropy_high: float, execution_high: float) -> Dict[str, Spec]:
+    """File and sandbox signals of a clean attachment."""
+    fields = {col: Const(0) for col in (
+        "packer_detected", "any_file_hash_malicious", "malicious_attachment_count",
+        "has_executable_attachment", "unscannable_attachment_present",
+        "total_components_detected_malicious", "total_yara_match_count", "total_ioc_count",
+        "any_macro_enabled_document", "any_vbscript_javascript_detected",
+        "any_active_x_objects_detected", "any_network_call_on_open",
+        "any_exploit_pattern_detected",
+    )}
+    fields.update({
+        "max_metadata_suspicious_score": Uniform(0.02, metadata_high),
+        "max_behavioral_sandbox_score": Uniform(0.0, behavioral_high),
+        "max_amsi_suspicion_score": Uniform(0.0, 0.08),
+        "max_exfiltration_behavior_score": Uniform(0.0, 0.05),
+        "total_embedded_file_count": RandInt(0, embedded_high),
+        "max_suspicious_string_entropy_score": Uniform(0.05, entropy_high),
+        "max_sandbox_execution_time": Uniform(1, execution_high),
+        # get_process_names_legitimate: NULL most of the time
+        "unique_parent_process_names": When(
+            Chance(1 - PROCESS_NAMES_LEGITIMATE_NULL_RATE),
+            Choice(process_chains(PROCESS_CHAINS_LEGITIMATE), PROCESS_WEIGHTS_LEGITIMATE),
+        ),
+    })
+    return fields
+
+def only_when(cond, fields: Dict[str, Spec]) -> Dict[str, Spec]:
+    """Wrap every field so it is only drawn where cond holds (NULL elsewhere)."""
+    return {col: When(cond, spec) for col, spec in fields.items()}
+
+class ScenarioSpec(NamedTuple):
+    doc: str
+    parent: Optional[str]
+    fields: Dict[str, Spec]
+
+SCENARIO_SPECS: Dict[str, ScenarioSpec] = {}
+
+# ============================================================================
+# MALICIOUS SCENARIO GENERATORS
+# ============================================================================
+
+SCENARIO_SPECS["phishing_obvious"] = ScenarioSpec(
+    "Generate obvious phishing email signals.",
+    parent=None,
+    fields={
+        # Sender signals
+        "sender_known_malicious": Choice([1, 0], [40, 60]),
+        "sender_domain_reputation_score": Uniform(0.05, 0.35),
+        "sender_spoof_detected": Const(1),
+        "sender_temp_email_likelihood": Uniform(0.3, 0.8),
+        "sender_name_similarity_to_vip": Uniform(0.1, 0.4),
+
+        # Authentication - mostly failing
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [70, 30]),
+        "reverse_dns_valid": Choice([0, 1], [60, 40]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [35, 65]),
+        "smtp_ip_geo": Uniform(0.5, 0.95),
+        "smtp_ip_asn": Uniform(0.5, 0.9),
+        "smtp_ip_reputation_score": Uniform(0.1, 0.4),
+
+        # Return/Reply path
+        "return_path_mismatch_with_from": Const(1),
+        "return_path_known_malicious": Choice([1, 0], [30, 70]),
+        "return_path_reputation_score": Uniform(0.1, 0.4),
+        "reply_path_known_malicious": Choice([1, 0], [25, 75]),
+        "reply_path_diff_from_sender": Choice([1, 0], [60, 40]),
+        "reply_path_reputation_score": Uniform(0.15, 0.45),
+
+        # URL signals - phishing has URLs
+        "url_count": RandInt(1, 5),
+        "total_links_detected": Add(Ref("url_count"), RandInt(0, 3)),
+        "domain_known_malicious": Choice([1, 0], [50, 50]),
+        "dns_morphing_detected": Choice([1, 0], [40, 60]),
+        "domain_tech_stack_match_score": Uniform(0.1, 0.5),
+        "url_shortener_detected": Choice([1, 0], [50, 50]),
+        "url_redirect_chain_length": When(Cond("url_shortener_detected", "==", 1), RandInt(1, 5), RandInt(0, 2)),
+        "final_url_known_malicious": Choice([1, 0], [60, 40]),
+        "url_decoded_spoof_detected": Choice([1, 0], [45, 55]),
+        "url_reputation_score": Uniform(0.05, 0.35),
+        "ssl_validity_status": Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS),
+        "site_visual_similarity_to_known_brand": Uniform(0.65, 0.98),
+        "url_rendering_behavior_score": Uniform(0.5, 0.9),
+        "link_rewritten_through_redirector": Const(0),
+
+        # BEC/VIP signals
+        "is_high_risk_role_targeted": Choice([1, 0], [30, 70]),
+        "urgency_keywords_present": Choice([1, 0], [75, 25]),
+        "request_type": Const("credential_request"),
+
+        # Spam signals
+        "content_spam_score": Uniform(0.4, 0.75),
+        "user_marked_as_spam_before": Choice([1, 0], [20, 80]),
+        "bulk_message_indicator": Choice([1, 0], [40, 60]),
+        "unsubscribe_link_present": Choice([1, 0], [30, 70]),
+        "marketing_keywords_detected": Uniform(0.2, 0.5),
+        "html_text_ratio": Uniform(0.2, 0.6),
+        "image_only_email": Const(0),
+
+        # No attachment for URL-based phishing (attachment columns stay NULL)
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["phishing_moderate"] = ScenarioSpec(
+    "Generate moderate sophistication phishing.",
+    parent="phishing_obvious",
+    fields={
+        # Improve some signals to be less obvious
+        "sender_domain_reputation_score": Uniform(0.3, 0.55),
+        "smtp_ip_reputation_score": Uniform(0.25, 0.5),
+        "sender_known_malicious": Const(0),
+        "smtp_ip_known_malicious": Choice([1, 0], [15, 85]),
+
+        # Better auth sometimes
+        "_better_auth": Choice([1, 0], [30, 70]),
+        "spf_result": When(Cond("_better_auth", "==", 1), Const("pass"), Inherit()),
+        "dkim_result": When(Cond("_better_auth", "==", 1), Choice(["pass", "none"], [50, 50]), Inherit()),
+    },
+)
+
+SCENARIO_SPECS["phishing_sophisticated"] = ScenarioSpec(
+    "Generate sophisticated phishing with good signals.",
+    parent="phishing_moderate",
+    fields={
+        # Good reputation (aged domain / compromised)
+        "sender_domain_reputation_score": Uniform(0.5, 0.72),
+        "smtp_ip_reputation_score": Uniform(0.45, 0.68),
+        "sender_known_malicious": Const(0),
+        "smtp_ip_known_malicious": Const(0),
+        "domain_known_malicious": Const(0),
+
+        # Pass authentication
+        "spf_result": Const("pass"),
+        "dkim_result": Const("pass"),
+        "dmarc_result": Const("pass"),
+        "reverse_dns_valid": Const(1),
+        "tls_version": Choice(["TLS 1.3", "TLS 1.2"], [40, 60]),
+
+        # But still has malicious URL behavior
+        "site_visual_similarity_to_known_brand": Uniform(0.7, 0.95),
+        "url_rendering_behavior_score": Uniform(0.6, 0.85),
+        "ssl_validity_status": Choice(["valid", "self_signed"], [60, 40]),
+    },
+)
+
+SCENARIO_SPECS["bec_obvious"] = ScenarioSpec(
+    "Generate obvious BEC/CEO fraud email.",
+    parent=None,
+    fields={
+        # Sender signals - impersonation
+        "sender_known_malicious": Choice([1, 0], [20, 80]),
+        "sender_domain_reputation_score": Uniform(0.15, 0.45),
+        "sender_spoof_detected": Const(1),
+        "sender_temp_email_likelihood": Uniform(0.2, 0.6),
+        "sender_name_similarity_to_vip": Uniform(0.75, 0.98),
+
+        # Authentication - failing
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [60, 40]),
+        "reverse_dns_valid": Choice([0, 1], [55, 45]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [25, 75]),
+        "smtp_ip_geo": Uniform(0.4, 0.85),
+        "smtp_ip_asn": Uniform(0.4, 0.8),
+        "smtp_ip_reputation_score": Uniform(0.15, 0.45),
+
+        # Return/Reply - attacker wants replies
+        "return_path_mismatch_with_from": Const(1),
+        "return_path_known_malicious": Choice([1, 0], [20, 80]),
+        "return_path_reputation_score": Uniform(0.2, 0.5),
+        "reply_path_known_malicious": Choice([1, 0], [25, 75]),
+        "reply_path_diff_from_sender": Const(1),  # Critical for BEC
+        "reply_path_reputation_score": Uniform(0.15, 0.45),
+
+        # BEC/VIP - key signals
+        "is_high_risk_role_targeted": Const(1),
+        "urgency_keywords_present": Const(1),
+        "request_type": Choice(
+            ["wire_transfer", "gift_card_request", "executive_request", "sensitive_data_request"],
+            [40, 30, 20, 10]
+        ),
+
+        # Spam signals - BEC is not spammy
+        "content_spam_score": Uniform(0.15, 0.4),
+        "user_marked_as_spam_before": Const(0),
+        "bulk_message_indicator": Const(0),
+        "unsubscribe_link_present": Const(0),
+        "marketing_keywords_detected": Uniform(0.0, 0.15),
+        "html_text_ratio": Uniform(0.5, 0.85),
+        "image_only_email": Const(0),
+
+        # URL signals - BEC often has no/few URLs
+        "url_count": Choice([0, 1], [70, 30]),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": When(HAS_URLS, Choice([1, 0], [30, 70])),
+        "dns_morphing_detected": When(HAS_URLS, Const(0)),
+        "domain_tech_stack_match_score": When(HAS_URLS, Uniform(0.3, 0.7)),
+        "url_shortener_detected": When(HAS_URLS, Const(0)),
+        "url_redirect_chain_length": When(HAS_URLS, Const(0)),
+        "final_url_known_malicious": When(HAS_URLS, Choice([1, 0], [40, 60])),
+        "url_decoded_spoof_detected": When(HAS_URLS, Const(0)),
+        "url_reputation_score": When(HAS_URLS, Uniform(0.2, 0.5)),
+        "ssl_validity_status": When(HAS_URLS, Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS)),
+        "site_visual_similarity_to_known_brand": When(HAS_URLS, Uniform(0.1, 0.4)),
+        "url_rendering_behavior_score": When(HAS_URLS, Uniform(0.2, 0.5)),
+        "link_rewritten_through_redirector": When(HAS_URLS, Const(0)),
+
+        # No attachment
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["bec_sophisticated"] = ScenarioSpec(
+    "Generate sophisticated BEC with compromised account.",
+    parent="bec_obvious",
+    fields={
+        # Compromised account - good auth
+        "spf_result": Const("pass"),
+        "dkim_result": Const("pass"),
+        "dmarc_result": Const("pass"),
+        "reverse_dns_valid": Const(1),
+        "tls_version": Choice(["TLS 1.3", "TLS 1.2"], [50, 50]),
+
+        # Better reputation
+        "sender_domain_reputation_score": Uniform(0.55, 0.78),
+        "smtp_ip_reputation_score": Uniform(0.5, 0.75),
+        "sender_known_malicious": Const(0),
+        "smtp_ip_known_malicious": Const(0),
+
+        # Still has BEC indicators
+        "sender_name_similarity_to_vip": Uniform(0.85, 0.99),
+        "reply_path_diff_from_sender": Const(1),
+        "urgency_keywords_present": Const(1),
+    },
+)
+
+SCENARIO_SPECS["malware_executable"] = ScenarioSpec(
+    "Generate malware with executable attachment.",
+    parent=None,
+    fields={
+        # Sender signals
+        "sender_known_malicious": Choice([1, 0], [45, 55]),
+        "sender_domain_reputation_score": Uniform(0.08, 0.35),
+        "sender_spoof_detected": Choice([1, 0], [60, 40]),
+        "sender_temp_email_likelihood": Uniform(0.3, 0.75),
+        "sender_name_similarity_to_vip": Uniform(0.0, 0.3),
+
+        # Authentication
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [65, 35]),
+        "reverse_dns_valid": Choice([0, 1], [60, 40]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [40, 60]),
+        "smtp_ip_geo": Uniform(0.5, 0.92),
+        "smtp_ip_asn": Uniform(0.5, 0.88),
+        "smtp_ip_reputation_score": Uniform(0.1, 0.38),
+
+        # Return/Reply path
+        "return_path_mismatch_with_from": Choice([1, 0], [70, 30]),
+        "return_path_known_malicious": Choice([1, 0], [35, 65]),
+        "return_path_reputation_score": Uniform(0.1, 0.4),
+        "reply_path_known_malicious": Choice([1, 0], [30, 70]),
+        "reply_path_diff_from_sender": Choice([1, 0], [40, 60]),
+        "reply_path_reputation_score": Uniform(0.12, 0.42),
+
+        # File Analysis - EXECUTABLE
+        "packer_detected": Choice([1, 0], [60, 40]),
+        "any_file_hash_malicious": Choice([1, 0], [70, 30]),
+        "max_metadata_suspicious_score": Uniform(0.5, 0.95),
+        "malicious_attachment_count": RandInt(1, 2),
+        "has_executable_attachment": Const(1),
+        "unscannable_attachment_present": Const(0),
+
+        # Sandbox signals
+        "total_components_detected_malicious": RandInt(1, 8),
+        "total_yara_match_count": RandInt(2, 15),
+        "total_ioc_count": RandInt(5, 40),
+        "max_behavioral_sandbox_score": Uniform(0.65, 0.98),
+        "max_amsi_suspicion_score": Uniform(0.4, 0.85),
+        "any_macro_enabled_document": Const(0),
+        "any_vbscript_javascript_detected": Choice([1, 0], [40, 60]),
+        "any_active_x_objects_detected": Choice([1, 0], [15, 85]),
+        "any_network_call_on_open": Choice([1, 0], [65, 35]),
+        "max_exfiltration_behavior_score": Uniform(0.3, 0.8),
+        "any_exploit_pattern_detected": Choice([1, 0], [25, 75]),
+        "total_embedded_file_count": RandInt(0, 5),
+        "max_suspicious_string_entropy_score": Uniform(0.55, 0.95),
+        "max_sandbox_execution_time": Uniform(5, 60),
+        "unique_parent_process_names": Choice(process_chains(PROCESS_CHAINS_MALICIOUS), PROCESS_WEIGHTS_MALICIOUS),
+
+        # URL signals - malware may or may not have URLs
+        "url_count": Choice([0, 1, 2], [50, 35, 15]),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": When(HAS_URLS, Choice([1, 0], [40, 60])),
+        "dns_morphing_detected": When(HAS_URLS, Choice([1, 0], [20, 80])),
+        "domain_tech_stack_match_score": When(HAS_URLS, Uniform(0.2, 0.6)),
+        "url_shortener_detected": When(HAS_URLS, Choice([1, 0], [30, 70])),
+        "url_redirect_chain_length": When(HAS_URLS, RandInt(0, 3)),
+        "final_url_known_malicious": When(HAS_URLS, Choice([1, 0], [50, 50])),
+        "url_decoded_spoof_detected": When(HAS_URLS, Choice([1, 0], [25, 75])),
+        "url_reputation_score": When(HAS_URLS, Uniform(0.1, 0.45)),
+        "ssl_validity_status": When(HAS_URLS, Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS)),
+        "site_visual_similarity_to_known_brand": When(HAS_URLS, Uniform(0.1, 0.5)),
+        "url_rendering_behavior_score": When(HAS_URLS, Uniform(0.3, 0.7)),
+        "link_rewritten_through_redirector": When(HAS_URLS, Const(0)),
+
+        # BEC/VIP
+        "is_high_risk_role_targeted": Choice([1, 0], [30, 70]),
+        "urgency_keywords_present": Choice([1, 0], [55, 45]),
+        "request_type": Choice(["document_download", "link_click", "none"], [50, 30, 20]),
+
+        # Spam signals
+        "content_spam_score": Uniform(0.35, 0.7),
+        "user_marked_as_spam_before": Choice([1, 0], [25, 75]),
+        "bulk_message_indicator": Choice([1, 0], [35, 65]),
+        "unsubscribe_link_present": Choice([1, 0], [20, 80]),
+        "marketing_keywords_detected": Uniform(0.1, 0.4),
+        "html_text_ratio": Uniform(0.25, 0.65),
+        "image_only_email": Const(0),
+
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["malware_macro"] = ScenarioSpec(
+    "Generate malware with macro-enabled document.",
+    parent="malware_executable",
+    fields={
+        # Macro-specific changes
+        "has_executable_attachment": Const(0),
+        "any_macro_enabled_document": Const(1),
+        "any_vbscript_javascript_detected": Const(1),
+        "max_amsi_suspicion_score": Uniform(0.55, 0.95),
+        "packer_detected": Choice([1, 0], [40, 60]),
+
+        # Process names for macro attack
+        "unique_parent_process_names": Choice(process_chains(PROCESS_CHAINS_MACRO), PROCESS_WEIGHTS_MACRO),
+    },
+)
+
+SCENARIO_SPECS["malware_evasive"] = ScenarioSpec(
+    "Generate evasive malware with low detection.",
+    parent="malware_executable",
+    fields={
+        # Lower detection scores (evasion)
+        "any_file_hash_malicious": Const(0),  # Unknown/new malware
+        "max_behavioral_sandbox_score": Uniform(0.25, 0.5),
+        "total_yara_match_count": RandInt(0, 3),
+        "total_ioc_count": RandInt(0, 8),
+        "total_components_detected_malicious": RandInt(0, 2),
+        "max_sandbox_execution_time": Uniform(90, 180),  # Delayed
+
+        # Better reputation
+        "sender_domain_reputation_score": Uniform(0.35, 0.58),
+        "smtp_ip_reputation_score": Uniform(0.3, 0.55),
+    },
+)
+
+SCENARIO_SPECS["ransomware"] = ScenarioSpec(
+    "Generate ransomware delivery email.",
+    parent="malware_executable",
+    fields={
+        # Ransomware specific - high exfiltration
+        "max_exfiltration_behavior_score": Uniform(0.75, 0.99),
+        "any_network_call_on_open": Const(1),
+        "max_behavioral_sandbox_score": Uniform(0.8, 0.99),
+        "total_ioc_count": RandInt(15, 80),
+    },
+)
+
+SCENARIO_SPECS["spam_obvious"] = ScenarioSpec(
+    "Generate obvious spam email.",
+    parent=None,
+    fields={
+        # Sender signals
+        "sender_known_malicious": Choice([1, 0], [30, 70]),
+        "sender_domain_reputation_score": Uniform(0.03, 0.25),
+        "sender_spoof_detected": Choice([1, 0], [50, 50]),
+        "sender_temp_email_likelihood": Uniform(0.6, 0.95),
+        "sender_name_similarity_to_vip": Uniform(0.0, 0.2),
+
+        # Authentication - mostly failing
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [75, 25]),
+        "reverse_dns_valid": Choice([0, 1], [65, 35]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [35, 65]),
+        "smtp_ip_geo": Uniform(0.55, 0.95),
+        "smtp_ip_asn": Uniform(0.5, 0.9),
+        "smtp_ip_reputation_score": Uniform(0.05, 0.3),
+
+        # Return/Reply path
+        "return_path_mismatch_with_from": Choice([1, 0], [65, 35]),
+        "return_path_known_malicious": Choice([1, 0], [30, 70]),
+        "return_path_reputation_score": Uniform(0.08, 0.35),
+        "reply_path_known_malicious": Choice([1, 0], [25, 75]),
+        "reply_path_diff_from_sender": Choice([1, 0], [50, 50]),
+        "reply_path_reputation_score": Uniform(0.1, 0.38),
+
+        # Spam signals - HIGH
+        "content_spam_score": Uniform(0.75, 0.99),
+        "user_marked_as_spam_before": Choice([1, 0], [40, 60]),
+        "bulk_message_indicator": Const(1),
+        "unsubscribe_link_present": Choice([1, 0], [50, 50]),
+        "marketing_keywords_detected": Uniform(0.6, 0.95),
+        "html_text_ratio": Uniform(0.1, 0.45),
+        "image_only_email": Choice([1, 0], [40, 60]),
+
+        # URLs in spam
+        "url_count": RandInt(2, 12),
+        "total_links_detected": Add(Ref("url_count"), RandInt(1, 5)),
+        "domain_known_malicious": Choice([1, 0], [40, 60]),
+        "dns_morphing_detected": Choice([1, 0], [25, 75]),
+        "domain_tech_stack_match_score": Uniform(0.15, 0.5),
+        "url_shortener_detected": Choice([1, 0], [45, 55]),
+        "url_redirect_chain_length": RandInt(1, 4),
+        "final_url_known_malicious": Choice([1, 0], [45, 55]),
+        "url_decoded_spoof_detected": Choice([1, 0], [30, 70]),
+        "url_reputation_score": Uniform(0.08, 0.38),
+        "ssl_validity_status": Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS),
+        "site_visual_similarity_to_known_brand": Uniform(0.2, 0.6),
+        "url_rendering_behavior_score": Uniform(0.35, 0.75),
+        "link_rewritten_through_redirector": Const(0),
+
+        # BEC/VIP - not targeted
+        "is_high_risk_role_targeted": Const(0),
+        "urgency_keywords_present": Choice([1, 0], [60, 40]),
+        "request_type": Choice(["link_click", "credential_request", "none"], [50, 30, 20]),
+
+        # No attachment typically
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["evasion_encrypted"] = ScenarioSpec(
+    "Generate email with encrypted/password-protected attachment.",
+    parent=None,
+    fields={
+        # Sender signals - moderate
+        "sender_known_malicious": Choice([1, 0], [20, 80]),
+        "sender_domain_reputation_score": Uniform(0.2, 0.5),
+        "sender_spoof_detected": Choice([1, 0], [55, 45]),
+        "sender_temp_email_likelihood": Uniform(0.25, 0.65),
+        "sender_name_similarity_to_vip": Uniform(0.1, 0.45),
+
+        # Authentication
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [60, 40]),
+        "reverse_dns_valid": Choice([0, 1], [50, 50]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [25, 75]),
+        "smtp_ip_geo": Uniform(0.4, 0.8),
+        "smtp_ip_asn": Uniform(0.4, 0.75),
+        "smtp_ip_reputation_score": Uniform(0.2, 0.5),
+
+        # Return/Reply
+        "return_path_mismatch_with_from": Choice([1, 0], [55, 45]),
+        "return_path_known_malicious": Choice([1, 0], [20, 80]),
+        "return_path_reputation_score": Uniform(0.2, 0.5),
+        "reply_path_known_malicious": Choice([1, 0], [18, 82]),
+        "reply_path_diff_from_sender": Choice([1, 0], [45, 55]),
+        "reply_path_reputation_score": Uniform(0.22, 0.52),
+
+        # File Analysis - UNSCANNABLE (hash/packer/count can't be determined)
+        "max_metadata_suspicious_score": Uniform(0.4, 0.7),
+        "unscannable_attachment_present": Const(1),  # KEY SIGNAL
+
+        # Sandbox - limited
+        "total_ioc_count": RandInt(0, 3),
+        "max_suspicious_string_entropy_score": Uniform(0.5, 0.85),
+
+        # URL signals
+        "url_count": RandInt(0, 2),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": When(HAS_URLS, Choice([1, 0], [25, 75])),
+        "dns_morphing_detected": When(HAS_URLS, Const(0)),
+        "domain_tech_stack_match_score": When(HAS_URLS, Uniform(0.3, 0.65)),
+        "url_shortener_detected": When(HAS_URLS, Const(0)),
+        "url_redirect_chain_length": When(HAS_URLS, Const(0)),
+        "final_url_known_malicious": When(HAS_URLS, Choice([1, 0], [30, 70])),
+        "url_decoded_spoof_detected": When(HAS_URLS, Const(0)),
+        "url_reputation_score": When(HAS_URLS, Uniform(0.25, 0.55)),
+        "ssl_validity_status": When(HAS_URLS, Choice(["valid", "self_signed"], [60, 40])),
+        "site_visual_similarity_to_known_brand": When(HAS_URLS, Uniform(0.1, 0.4)),
+        "url_rendering_behavior_score": When(HAS_URLS, Uniform(0.2, 0.5)),
+        "link_rewritten_through_redirector": When(HAS_URLS, Const(0)),
+
+        # BEC/VIP
+        "is_high_risk_role_targeted": Choice([1, 0], [40, 60]),
+        "urgency_keywords_present": Const(1),  # Password in body = urgency
+        "request_type": Const("document_download"),
+
+        # Spam
+        "content_spam_score": Uniform(0.25, 0.55),
+        "user_marked_as_spam_before": Const(0),
+        "bulk_message_indicator": Const(0),
+        "unsubscribe_link_present": Const(0),
+        "marketing_keywords_detected": Uniform(0.05, 0.25),
+        "html_text_ratio": Uniform(0.45, 0.75),
+        "image_only_email": Const(0),
+
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["evasion_image_only"] = ScenarioSpec(
+    "Generate image-only email (evasion technique).",
+    parent=None,
+    fields={
+        # Sender signals
+        "sender_known_malicious": Choice([1, 0], [30, 70]),
+        "sender_domain_reputation_score": Uniform(0.1, 0.4),
+        "sender_spoof_detected": Choice([1, 0], [55, 45]),
+        "sender_temp_email_likelihood": Uniform(0.35, 0.75),
+        "sender_name_similarity_to_vip": Uniform(0.1, 0.4),
+
+        # Authentication
+        **auth(AUTH_PATTERNS_MALICIOUS, AUTH_WEIGHTS_MALICIOUS),
+        "dmarc_enforced": Choice([0, 1], [60, 40]),
+        "reverse_dns_valid": Choice([0, 1], [55, 45]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP signals
+        "smtp_ip_known_malicious": Choice([1, 0], [30, 70]),
+        "smtp_ip_geo": Uniform(0.45, 0.85),
+        "smtp_ip_asn": Uniform(0.4, 0.8),
+        "smtp_ip_reputation_score": Uniform(0.15, 0.45),
+
+        # Return/Reply
+        "return_path_mismatch_with_from": Choice([1, 0], [60, 40]),
+        "return_path_known_malicious": Choice([1, 0], [25, 75]),
+        "return_path_reputation_score": Uniform(0.15, 0.45),
+        "reply_path_known_malicious": Choice([1, 0], [22, 78]),
+        "reply_path_diff_from_sender": Choice([1, 0], [50, 50]),
+        "reply_path_reputation_score": Uniform(0.18, 0.48),
+
+        # Spam - IMAGE ONLY
+        "content_spam_score": Uniform(0.3, 0.6),  # Lower - evaded text analysis
+        "user_marked_as_spam_before": Choice([1, 0], [25, 75]),
+        "bulk_message_indicator": Choice([1, 0], [50, 50]),
+        "unsubscribe_link_present": Choice([1, 0], [30, 70]),
+        "marketing_keywords_detected": Uniform(0.1, 0.35),  # Lower - no text
+        "html_text_ratio": Uniform(0.02, 0.12),  # CRITICAL - very low
+        "image_only_email": Const(1),  # CRITICAL
+
+        # URL - often in image
+        "url_count": RandInt(1, 3),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": Choice([1, 0], [40, 60]),
+        "dns_morphing_detected": Choice([1, 0], [30, 70]),
+        "domain_tech_stack_match_score": Uniform(0.2, 0.55),
+        "url_shortener_detected": Choice([1, 0], [45, 55]),
+        "url_redirect_chain_length": RandInt(1, 4),
+        "final_url_known_malicious": Choice([1, 0], [50, 50]),
+        "url_decoded_spoof_detected": Choice([1, 0], [35, 65]),
+        "url_reputation_score": Uniform(0.12, 0.42),
+        "ssl_validity_status": Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS),
+        "site_visual_similarity_to_known_brand": Uniform(0.5, 0.9),
+        "url_rendering_behavior_score": Uniform(0.45, 0.8),
+        "link_rewritten_through_redirector": Const(0),
+
+        # BEC/VIP
+        "is_high_risk_role_targeted": Choice([1, 0], [25, 75]),
+        "urgency_keywords_present": Const(0),  # Can't detect - image
+        "request_type": Choice(["link_click", "credential_request"], [60, 40]),
+
+        # No attachment
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["qr_phishing"] = ScenarioSpec(
+    "Generate QR code phishing email.",
+    parent="evasion_image_only",
+    fields={
+        # QR specific
+        "qrcode_analysis": Const(1),  # Malicious QR detected
+        "url_count": Const(0),  # No text URLs
+        "total_links_detected": Const(0),
+
+        # Set URL-dependent signals to NULL
+        **{col: NULL for col in URL_DETAIL_SIGNALS},
+    },
+)
+
+SCENARIO_SPECS["known_threat_actor"] = ScenarioSpec(
+    "Generate email from known threat actor.",
+    parent=None,
+    fields={
+        # Sender - KNOWN MALICIOUS
+        "sender_known_malicious": Const(1),
+        "sender_domain_reputation_score": Uniform(0.02, 0.2),
+        "sender_spoof_detected": Choice([1, 0], [70, 30]),
+        "sender_temp_email_likelihood": Uniform(0.4, 0.85),
+        "sender_name_similarity_to_vip": Uniform(0.1, 0.5),
+
+        # Authentication - failing
+        "spf_result": Choice(["fail", "softfail", "none"], [50, 30, 20]),
+        "dkim_result": Choice(["fail", "none"], [60, 40]),
+        "dmarc_result": Const("fail"),
+        "dmarc_enforced": Const(0),
+        "reverse_dns_valid": Const(0),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_MALICIOUS),
+
+        # IP - KNOWN MALICIOUS
+        "smtp_ip_known_malicious": Const(1),
+        "smtp_ip_geo": Uniform(0.7, 0.98),
+        "smtp_ip_asn": Uniform(0.7, 0.95),
+        "smtp_ip_reputation_score": Uniform(0.02, 0.18),
+
+        # Return/Reply - KNOWN MALICIOUS
+        "return_path_mismatch_with_from": Const(1),
+        "return_path_known_malicious": Const(1),
+        "return_path_reputation_score": Uniform(0.02, 0.15),
+        "reply_path_known_malicious": Choice([1, 0], [70, 30]),
+        "reply_path_diff_from_sender": Const(1),
+        "reply_path_reputation_score": Uniform(0.05, 0.2),
+
+        # URL - KNOWN MALICIOUS
+        "url_count": RandInt(1, 5),
+        "total_links_detected": Add(Ref("url_count"), RandInt(0, 2)),
+        "domain_known_malicious": Const(1),
+        "dns_morphing_detected": Choice([1, 0], [40, 60]),
+        "domain_tech_stack_match_score": Uniform(0.1, 0.35),
+        "url_shortener_detected": Choice([1, 0], [50, 50]),
+        "url_redirect_chain_length": RandInt(1, 5),
+        "final_url_known_malicious": Const(1),
+        "url_decoded_spoof_detected": Choice([1, 0], [45, 55]),
+        "url_reputation_score": Uniform(0.02, 0.18),
+        "ssl_validity_status": Choice(SSL_STATUSES_MALICIOUS, SSL_WEIGHTS_MALICIOUS),
+        "site_visual_similarity_to_known_brand": Uniform(0.6, 0.95),
+        "url_rendering_behavior_score": Uniform(0.6, 0.92),
+        "link_rewritten_through_redirector": Const(0),
+
+        # BEC/VIP
+        "is_high_risk_role_targeted": Choice([1, 0], [50, 50]),
+        "urgency_keywords_present": Choice([1, 0], [70, 30]),
+        "request_type": Choice(REQUEST_TYPES_MALICIOUS, REQUEST_WEIGHTS_MALICIOUS),
+
+        # Spam
+        "content_spam_score": Uniform(0.5, 0.85),
+        "user_marked_as_spam_before": Choice([1, 0], [60, 40]),
+        "bulk_message_indicator": Choice([1, 0], [55, 45]),
+        "unsubscribe_link_present": Choice([1, 0], [30, 70]),
+        "marketing_keywords_detected": Uniform(0.2, 0.6),
+        "html_text_ratio": Uniform(0.2, 0.6),
+        "image_only_email": Choice([1, 0], [25, 75]),
+
+        # No attachment
+        "label": Const("Malicious"),
+    },
+)
+
+SCENARIO_SPECS["callback_phishing"] = ScenarioSpec(
+    "Generate callback/TOAD phishing.",
+    parent="bec_obvious",
+    fields={
+        # Callback specific - no URLs
+        "url_count": Const(0),
+        "total_links_detected": Const(0),
+        "request_type": Const("urgent_callback"),
+
+        # Clear URL signals
+        **{col: NULL for col in URL_DETAIL_SIGNALS},
+    },
+)
+
+# ============================================================================
+# LEGITIMATE SCENARIO GENERATORS
+# ============================================================================
+
+SCENARIO_SPECS["legitimate_enterprise"] = ScenarioSpec(
+    "Generate legitimate enterprise internal email.",
+    parent=None,
+    fields={
+        # Sender - GOOD
+        "sender_known_malicious": Const(0),
+        "sender_domain_reputation_score": Uniform(0.82, 0.98),
+        "sender_spoof_detected": Const(0),
+        "sender_temp_email_likelihood": Uniform(0.0, 0.08),
+        "sender_name_similarity_to_vip": Uniform(0.0, 0.15),
+
+        # Authentication - PASSING
+        "spf_result": Const("pass"),
+        "dkim_result": Const("pass"),
+        "dmarc_result": Const("pass"),
+        "dmarc_enforced": Const(1),
+        "reverse_dns_valid": Const(1),
+        "tls_version": Choice(["TLS 1.3", "TLS 1.2"], [55, 45]),
+
+        # IP - GOOD
+        "smtp_ip_known_malicious": Const(0),
+        "smtp_ip_geo": Uniform(0.02, 0.25),
+        "smtp_ip_asn": Uniform(0.02, 0.2),
+        "smtp_ip_reputation_score": Uniform(0.8, 0.98),
+
+        # Return/Reply - MATCHING
+        "return_path_mismatch_with_from": Const(0),
+        "return_path_known_malicious": Const(0),
+        "return_path_reputation_score": Uniform(0.78, 0.96),
+        "reply_path_known_malicious": Const(0),
+        "reply_path_diff_from_sender": Const(0),
+        "reply_path_reputation_score": Uniform(0.8, 0.97),
+
+        # BEC/VIP - NOT TARGETED
+        "is_high_risk_role_targeted": Const(0),
+        "urgency_keywords_present": Const(0),
+        "request_type": Const("none"),
+
+        # Spam - LOW
+        "content_spam_score": Uniform(0.02, 0.18),
+        "user_marked_as_spam_before": Const(0),
+        "bulk_message_indicator": Const(0),
+        "unsubscribe_link_present": Const(0),
+        "marketing_keywords_detected": Uniform(0.0, 0.12),
+        "html_text_ratio": Uniform(0.6, 0.92),
+        "image_only_email": Const(0),
+
+        # URL - minimal
+        "url_count": Choice([0, 1, 2], [40, 45, 15]),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": When(HAS_URLS, Const(0)),
+        "dns_morphing_detected": When(HAS_URLS, Const(0)),
+        "domain_tech_stack_match_score": When(HAS_URLS, Uniform(0.75, 0.98)),
+        "url_shortener_detected": When(HAS_URLS, Const(0)),
+        "url_redirect_chain_length": When(HAS_URLS, Const(0)),
+        "final_url_known_malicious": When(HAS_URLS, Const(0)),
+        "url_decoded_spoof_detected": When(HAS_URLS, Const(0)),
+        "url_reputation_score": When(HAS_URLS, Uniform(0.82, 0.98)),
+        "ssl_validity_status": When(HAS_URLS, Const("valid")),
+        "site_visual_similarity_to_known_brand": When(HAS_URLS, Uniform(0.0, 0.15)),
+        "url_rendering_behavior_score": When(HAS_URLS, Uniform(0.02, 0.18)),
+        "link_rewritten_through_redirector": When(HAS_URLS, Choice([1, 0], [30, 70])),
+        "token_validation_success": When(Cond("link_rewritten_through_redirector", "==", 1), Const(1)),
+
+        # No attachment
+        "label": Const("Not Malicious"),
+    },
+)
+
+SCENARIO_SPECS["legitimate_smb"] = ScenarioSpec(
+    "Generate legitimate SMB email with some imperfections.",
+    parent="legitimate_enterprise",
+    fields={
+        # Lower but still acceptable reputation
+        "sender_domain_reputation_score": Uniform(0.55, 0.78),
+        "smtp_ip_reputation_score": Uniform(0.52, 0.75),
+
+        # Some auth issues possible
+        "spf_result": When(Chance(0.2), Const("softfail"), Inherit()),
+        "dkim_result": When(Chance(0.15), Const("none"), Inherit()),
+        "dmarc_result": When(Chance(0.1), Const("none"), Inherit()),
+
+        "dmarc_enforced": Choice([1, 0], [60, 40]),
+    },
+)
+
+SCENARIO_SPECS["legitimate_marketing"] = ScenarioSpec(
+    "Generate legitimate marketing email.",
+    parent=None,
+    fields={
+        # Sender - GOOD but marketing
+        "sender_known_malicious": Const(0),
+        "sender_domain_reputation_score": Uniform(0.62, 0.88),
+        "sender_spoof_detected": Const(0),
+        "sender_temp_email_likelihood": Uniform(0.0, 0.1),
+        "sender_name_similarity_to_vip": Uniform(0.0, 0.1),
+
+        # Authentication - mostly passing
+        **auth(AUTH_PATTERNS_LEGITIMATE, AUTH_WEIGHTS_LEGITIMATE),
+        "dmarc_enforced": Choice([1, 0], [75, 25]),
+        "reverse_dns_valid": Choice([1, 0], [90, 10]),
+        "tls_version": Choice(TLS_VERSIONS, TLS_WEIGHTS_LEGITIMATE),
+
+        # IP - GOOD
+        "smtp_ip_known_malicious": Const(0),
+        "smtp_ip_geo": Uniform(0.05, 0.3),
+        "smtp_ip_asn": Uniform(0.05, 0.25),
+        "smtp_ip_reputation_score": Uniform(0.65, 0.9),
+
+        # Return/Reply
+        "return_path_mismatch_with_from": Choice([0, 1], [85, 15]),  # Some use different return paths
+        "return_path_known_malicious": Const(0),
+        "return_path_reputation_score": Uniform(0.6, 0.88),
+        "reply_path_known_malicious": Const(0),
+        "reply_path_diff_from_sender": Choice([0, 1], [70, 30]),  # Reply-to support address
+        "reply_path_reputation_score": Uniform(0.62, 0.9),
+
+        # BEC/VIP - not targeted
+        "is_high_risk_role_targeted": Const(0),
+        "urgency_keywords_present": Choice([0, 1], [70, 30]),  # Some marketing urgency
+        "request_type": Choice(["none", "link_click"], [60, 40]),
+
+        # Spam - MARKETING indicators but legitimate
+        "content_spam_score": Uniform(0.25, 0.55),  # Higher but not spam
+        "user_marked_as_spam_before": Choice([0, 1], [85, 15]),
+        "bulk_message_indicator": Const(1),  # IS bulk
+        "unsubscribe_link_present": Const(1),  # MUST have for legitimate
+        "marketing_keywords_detected": Uniform(0.55, 0.9),
+        "html_text_ratio": Uniform(0.35, 0.7),
+        "image_only_email": Choice([0, 1], [80, 20]),
+
+        # URLs - marketing has many
+        "url_count": RandInt(3, 10),
+        "total_links_detected": Add(Ref("url_count"), RandInt(1, 5)),
+        "domain_known_malicious": Const(0),
+        "dns_morphing_detected": Const(0),
+        "domain_tech_stack_match_score": Uniform(0.7, 0.95),
+        "url_shortener_detected": Choice([0, 1], [85, 15]),
+        "url_redirect_chain_length": RandInt(0, 2),  # Tracking redirects
+        "final_url_known_malicious": Const(0),
+        "url_decoded_spoof_detected": Const(0),
+        "url_reputation_score": Uniform(0.7, 0.95),
+        "ssl_validity_status": Const("valid"),
+        "site_visual_similarity_to_known_brand": Uniform(0.0, 0.2),
+        "url_rendering_behavior_score": Uniform(0.05, 0.25),
+        "link_rewritten_through_redirector": Choice([1, 0], [40, 60]),
+        "token_validation_success": When(Cond("link_rewritten_through_redirector", "==", 1), Const(1)),
+
+        # No attachment typically
+        "label": Const("Not Malicious"),
+    },
+)
+
+SCENARIO_SPECS["legitimate_transactional"] = ScenarioSpec(
+    "Generate legitimate transactional email (banks, services).",
+    parent="legitimate_enterprise",
+    fields={
+        # Very high reputation
+        "sender_domain_reputation_score": Uniform(0.9, 0.99),
+        "smtp_ip_reputation_score": Uniform(0.88, 0.99),
+
+        # Always passing auth
+        "spf_result": Const("pass"),
+        "dkim_result": Const("pass"),
+        "dmarc_result": Const("pass"),
+        "dmarc_enforced": Const(1),
+
+        # May have URLs
+        "url_count": RandInt(1, 3),
+        "total_links_detected": Ref("url_count"),
+        "domain_known_malicious": Const(0),
+        "url_reputation_score": Uniform(0.9, 0.99),
+        "ssl_validity_status": Const("valid"),
+        "url_shortener_detected": Const(0),
+        "url_redirect_chain_length": Const(0),
+        "final_url_known_malicious": Const(0),
+        "url_decoded_spoof_detected": Const(0),
+        "dns_morphing_detected": Const(0),
+        "domain_tech_stack_match_score": Uniform(0.85, 0.98),
+        "site_visual_similarity_to_known_brand": Uniform(0.0, 0.1),
+        "url_rendering_behavior_score": Uniform(0.02, 0.12),
+        "link_rewritten_through_redirector": Const(0),
+        "token_validation_success": Const(None),
+    },
+)
+
+SCENARIO_SPECS["legitimate_password_reset"] = ScenarioSpec(
+    "Generate legitimate password reset email.",
+    parent="legitimate_transactional",
+    fields={
+        # This is a credential request but legitimate
+        "request_type": Const("credential_request"),
+        "urgency_keywords_present": Choice([0, 1], [50, 50]),  # May have urgency
+    },
+)
+
+SCENARIO_SPECS["legitimate_meeting_invite"] = ScenarioSpec(
+    "Generate legitimate meeting invite.",
+    parent="legitimate_enterprise",
+    fields={
+        "request_type": Const("meeting_request"),
+        "url_count": Const(1),  # Calendar link
+        "total_links_detected": Const(1),
+        "domain_known_malicious": Const(0),
+        "url_reputation_score": Uniform(0.85, 0.98),
+        "ssl_validity_status": Const("valid"),
+        "url_shortener_detected": Const(0),
+        "url_redirect_chain_length": Const(0),
+        "final_url_known_malicious": Const(0),
+        "url_decoded_spoof_detected": Const(0),
+        "dns_morphing_detected": Const(0),
+        "domain_tech_stack_match_score": Uniform(0.8, 0.98),
+        "site_visual_similarity_to_known_brand": Uniform(0.0, 0.1),
+        "url_rendering_behavior_score": Uniform(0.02, 0.1),
+        "link_rewritten_through_redirector": Const(0),
+        "token_validation_success": Const(None),
+    },
+)
+
+SCENARIO_SPECS["legitimate_document_share"] = ScenarioSpec(
+    "Generate legitimate document sharing email.",
+    parent="legitimate_enterprise",
+    fields={
+        "request_type": Const("document_download"),
+        "url_count": Const(1),
+        "total_links_detected": Const(1),
+        "domain_known_malicious": Const(0),
+        "url_reputation_score": Uniform(0.82, 0.97),
+        "ssl_validity_status": Const("valid"),
+        "url_shortener_detected": Const(0),
+        "url_redirect_chain_length": Choice([0, 1], [80, 20]),  # Google/SharePoint might redirect
+        "final_url_known_malicious": Const(0),
+        "url_decoded_spoof_detected": Const(0),
+        "dns_morphing_detected": Const(0),
+        "domain_tech_stack_match_score": Uniform(0.75, 0.95),
+        "site_visual_similarity_to_known_brand": Uniform(0.0, 0.15),
+        "url_rendering_behavior_score": Uniform(0.03, 0.15),
+        "link_rewritten_through_redirector": Choice([1, 0], [40, 60]),
+        "token_validation_success": When(Cond("link_rewritten_through_redirector", "==", 1), Const(1)),
+    },
+)
+
+SCENARIO_SPECS["legitimate_invoice"] = ScenarioSpec(
+    "Generate legitimate invoice email.",
+    parent="legitimate_smb",
+    fields={
+        "request_type": Const("invoice_payment"),
+        "urgency_keywords_present": Choice([0, 1], [60, 40]),  # Due dates
+
+        # May have attachment
+        "_has_attachment": Choice([1, 0], [60, 40]),
+        **only_when(Cond("_has_attachment", "==", 1), safe_attachment(
+            metadata_high=0.18, behavioral_high=0.1, embedded_high=2, entropy_high=0.25, execution_high=10
+        )),
+    },
+)
+
+SCENARIO_SPECS["legitimate_with_attachment"] = ScenarioSpec(
+    "Generate legitimate email with safe attachment.",
+    parent="legitimate_enterprise",
+    fields={
+        # Safe attachment
+        **safe_attachment(
+            metadata_high=0.15, behavioral_high=0.12, embedded_high=3, entropy_high=0.22, execution_high=15
+        ),
+    },
+)
+
+SCENARIO_SPECS["legitimate_misconfigured"] = ScenarioSpec(
+    "Generate legitimate but misconfigured email (false positive candidate).",
+    parent="legitimate_smb",
+    fields={
+        # Auth issues
+        "spf_result": Choice(["softfail", "fail", "none"], [50, 30, 20]),
+        "dkim_result": Choice(["none", "fail"], [70, 30]),
+        "dmarc_result": Choice(["none", "fail"], [60, 40]),
+        "dmarc_enforced": Const(0),
+
+        # Lower reputation
+        "sender_domain_reputation_score": Uniform(0.35, 0.55),
+        "smtp_ip_reputation_score": Uniform(0.38, 0.58),
+
+        # Some suspicious signals
+        "return_path_mismatch_with_from": Choice([0, 1], [50, 50]),
+    },
+)
+
+SCENARIO_SPECS["legitimate_urgent"] = ScenarioSpec(
+    "Generate legitimate urgent email (false positive candidate).",
+    parent="legitimate_enterprise",
+    fields={
+        # Legitimate urgency
+        "urgency_keywords_present": Const(1),
+        "request_type": Choice(["none", "document_download", "meeting_request"], [40, 30, 30]),
+
+        # Still good signals
+        "content_spam_score": Uniform(0.15, 0.35),
+    },
+)
+
+SCENARIO_SPECS["legitimate_new_business"] = ScenarioSpec(
+    "Generate legitimate email from new business (low reputation but genuine).",
+    parent="legitimate_smb",
+    fields={
+        # New domain = low reputation
+        "sender_domain_reputation_score": Uniform(0.3, 0.5),
+        "smtp_ip_reputation_score": Uniform(0.35, 0.55),
+
+        # But good auth
+        "spf_result": Const("pass"),
+        "dkim_result": Const("pass"),
+        "dmarc_result": Const("pass"),
+    },
+)
+
+SCENARIO_SPECS["legitimate_qr_code"] = ScenarioSpec(
+    "Generate legitimate email with safe QR code.",
+    parent="legitimate_marketing",
+    fields={
+        "qrcode_analysis": Const(0),  # Safe QR
+        "image_only_email": Choice([0, 1], [70, 30]),
+        "html_text_ratio": When(Cond("image_only_email", "==", 1), Uniform(0.08, 0.2), Inherit()),
+    },
+)
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+def resolve_fields(name: str) -> Dict[str, Spec]:
+    """Flatten a scenario and its ancestors into a single field table."""
+    spec = SCENARIO_SPECS[name]
+    fields = resolve_fields(spec.parent) if spec.parent else {}
+    for col, field in spec.fields.items():
+        if col not in SIGNAL_COLUMNS and not col.startswith("_"):
+            raise ValueError(f"{name}: unknown signal {col!r}")
+        fields[col] = field.resolve(fields.get(col, NULL))
+    return fields
+
+def dependency_order(fields: Dict[str, Spec]) -> List[str]:
+    """Fields in draw order: each after the fields it reads. Unused latents are dropped."""
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(col: str):
+        if state.get(col) == "done":
+            return
+        if state.get(col) == "visiting":
+            raise ValueError(f"dependency cycle through {col!r}")
+        state[col] = "visiting"
+        for dep in sorted(fields[col].deps()):
+            if dep in fields:
+                visit(dep)
+        state[col] = "done"
+        order.append(col)
+
+    for col in fields:
+        if not col.startswith("_"):
+            visit(col)
+    return order
+
+class CompiledScenario:
+    """Flat vectorized sampler for one scenario.
+
+    Called with a columnar_generator.ColumnBatch, like the dict generators are
+    called with a record.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.__name__ = f"generate_{name}"
+        self.__doc__ = SCENARIO_SPECS[name].doc
+        fields = resolve_fields(name)
+        # Batches start all-NULL, so NULL fields need no step
+        self.steps = [(col, fields[col]) for col in dependency_order(fields) if fields[col] is not NULL]
+
+    def __call__(self, batch):
+        columns = dict(batch.columns)
+        for col, spec in self.steps:
+            values = spec.draw(col, batch.rng, columns, None, batch.n)
+            if col.startswith("_"):
+                columns[col] = values
+            else:
+                columns[col][:] = values
+        return batch
+
+    def __reduce__(self):
+        # Pickle by name so process pools do not ship the spec tree around
+        return (CompiledScenario, (self.name,))
+
+COMPILED_SCENARIOS = {name: CompiledScenario(name) for name in SCENARIO_SPECS}
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Sharded Email Detection Signals Generator
+Splits the scenario counts of generate_email_data.py into fixed-size shards
+and generates them on a process pool. Every shard draws from its own seed
+stream derived from (seed, scenario index, shard index), and the final
+shuffle has a stream of its own, so the output is byte-identical whatever
+the number of workers.
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple
+
+import numpy as np
+
+import columnar_generator
+import generate_email_data as dict_generator
+from columnar_generator import ColumnBatch, interleave_order, write_columns, print_summary
+from generate_email_data import SIGNAL_COLUMNS, BASE_RECORD_COUNT, create_base_record, scale_scenarios
+
+# Rows per shard. Part of the output definition: changing it changes the
+# data, changing the worker count does not.
+SHARD_SIZE = 100_000
+
+# Spawn key of the seed stream used for the final shuffle (never a scenario index)
+SHUFFLE_STREAM = 2**31 - 1
+
+class Shard(NamedTuple):
+    generator_func: Callable
+    scenario_index: int
+    shard_index: int
+    offset: int
+    count: int
+    seed: int
+
+def shard_seed_sequence(seed: int, *stream: int) -> np.random.SeedSequence:
+    """Independent seed stream for one (scenario, shard) pair or for the shuffle."""
+    return np.random.SeedSequence(seed, spawn_key=stream)
+
+def plan_shards(scenarios: List, seed: int, shard_size: int = SHARD_SIZE) -> List[Shard]:
+    """Split every (generator, count) pair into shards of at most shard_size rows."""
+    shards = []
+    offset = 0
+    for scenario_index, (generator_func, count) in enumerate(scenarios):
+        for shard_index, start in enumerate(range(0, count, shard_size)):
+            shard_count = min(shard_size, count - start)
+            shards.append(Shard(generator_func, scenario_index, shard_index, offset, shard_count, seed))
+            offset += shard_count
+    return shards
+
+def generate_shard_columns(shard: Shard) -> Dict[str, np.ndarray]:
+    """Generate one shard with the columnar engine."""
+    rng = np.random.default_rng(shard_seed_sequence(shard.seed, shard.scenario_index, shard.shard_index))
+    batch = ColumnBatch(rng, shard.count)
+    shard.generator_func(batch)
+    return batch.columns
+
+def generate_shard_records(shard: Shard) -> List[Dict[str, Any]]:
+    """Generate one shard with the dict-based generators."""
+    state = shard_seed_sequence(shard.seed, shard.scenario_index, shard.shard_index).generate_state(2)
+    random.seed(int(state[0]) << 32 | int(state[1]))
+    return [shard.generator_func(create_base_record()) for _ in range(shard.count)]
+
+def run_shards(worker: Callable, shards: List[Shard], workers: int) -> Iterable:
+    """Yield worker results in shard order, in-process or on a process pool."""
+    if workers <= 1:
+        yield from map(worker, shards)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(worker, shards)
+
+def generate_columns_sharded(n_records: int = BASE_RECORD_COUNT, seed: int = 42, workers: int = 1,
+                             shard_size: int = SHARD_SIZE) -> Dict[str, np.ndarray]:
+    """Sharded counterpart of columnar_generator.generate_columns."""
+    scenarios = columnar_generator.columnar_scenarios(
+        scale_scenarios(dict_generator.MALICIOUS_SCENARIOS + dict_generator.LEGITIMATE_SCENARIOS, n_records)
+    )
+    shards = plan_shards(scenarios, seed, shard_size)
+
+    columns = ColumnBatch(None, sum(count for _, count in scenarios)).columns
+    for shard, shard_columns in zip(shards, run_shards(generate_shard_columns, shards, workers)):
+        for col, values in shard_columns.items():
+            columns[col][shard.offset:shard.offset + shard.count] = values
+
+    rng = np.random.default_rng(shard_seed_sequence(seed, SHUFFLE_STREAM))
+    order = interleave_order(rng, [count for _, count in scenarios])
+    return {col: values[order] for col, values in columns.items()}
+
+def generate_records_sharded(n_records: int = BASE_RECORD_COUNT, seed: int = 42, workers: int = 1,
+                             shard_size: int = SHARD_SIZE) -> List[Dict[str, Any]]:
+    """Sharded counterpart of the record loop in generate_email_data.generate_dataset."""
+    scenarios = scale_scenarios(dict_generator.MALICIOUS_SCENARIOS + dict_generator.LEGITIMATE_SCENARIOS,
+                                n_records)
+    shards = plan_shards(scenarios, seed, shard_size)
+
+    all_records = []
+    for records in run_shards(generate_shard_records, shards, workers):
+        all_records.extend(records)
+
+    state = shard_seed_sequence(seed, SHUFFLE_STREAM).generate_state(2)
+    random.Random(int(state[0]) << 32 | int(state[1])).shuffle(all_records)
+    return all_records
+
+def generate_dataset_sharded(output_file: str = "email_detection_signals.csv", n_records: int = BASE_RECORD_COUNT,
+                             seed: int = 42, workers: int = 1, engine: str = "columnar",
+                             shard_size: int = SHARD_SIZE):
+    """Generate the dataset on `workers` processes with either engine."""
+    print(f"Generating {n_records:,} records ({engine} engine, {workers} workers, {shard_size:,} rows/shard)...")
+    start = time.perf_counter()
+
+    if engine == "columnar":
+        columns = generate_columns_sharded(n_records, seed, workers, shard_size)
+        elapsed = time.perf_counter() - start
+        print(f"Generated in {elapsed:.2f}s ({n_records / max(elapsed, 1e-9):,.0f} rows/sec)")
+        write_columns(columns, output_file)
+        print_summary(columns)
+        return
+
+    all_records = generate_records_sharded(n_records, seed, workers, shard_size)
+    elapsed = time.perf_counter() - start
+    print(f"Generated in {elapsed:.2f}s ({n_records / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+    print(f"Writing to {output_file}...")
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SIGNAL_COLUMNS)
+        writer.writeheader()
+        writer.writerows(all_records)
+    print("Done!")
+
+    mal_actual = sum(1 for r in all_records if r["label"] == "Malicious")
+    print(f"\nSummary:")
+    print(f"  Malicious: {mal_actual:,}")
+    print(f"  Not Malicious: {len(all_records) - mal_actual:,}")
+    print(f"  Total: {len(all_records):,}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=BASE_RECORD_COUNT, help="total records to generate")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--engine", choices=["columnar", "dict"], default="columnar")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--output", default="email_detection_signals.csv", help=".npz for columnar output, else CSV")
+    args = parser.parse_args()
+    generate_dataset_sharded(args.output, args.rows, args.seed, args.workers, args.engine, args.shard_size)
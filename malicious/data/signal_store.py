@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Typed Columnar Signal Store
+Binary companion format for the signal CSVs, plus the shared loader used by
+the generators, correctors, trainers and analysis scripts.
+
+A dataset is an uncompressed .npz archive (each member can be read on its
+own, so loading a few columns only touches those columns):
+
+  __columns__       column names in order
+  __rows__          row count
+  <col>             typed values (bool, int32/int16, float64, or category codes)
+  <col>__nulls      packed null bitmap, 1 bit per row (only if the column has NULLs)
+  <col>__levels     category strings; present iff <col> holds codes
+
+  __source__        [size, mtime_ns] of the CSV the archive was written from
+
+read_signals() accepts either the .npz file or the original .csv. For a CSV
+it uses the sibling .npz only when that records the CSV's current size and
+modification time, and otherwise parses the CSV. With cache=True it then
+writes the .npz for next time; by default nothing is written next to the
+inputs.
+
+    python signal_store.py        round-trip check (NULL strings, ints, bools)
+"""
+
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+# Strings read_csv turns into NULL by default ('', 'NA', 'None', 'null', ...);
+# encoded as NULLs too, so the .npz and the CSV load the same values
+CSV_NA_VALUES = frozenset(STR_NA_VALUES)
+
+def pack_nulls(mask: np.ndarray) -> Optional[np.ndarray]:
+    """Packed null bitmap for a bool mask, or None when nothing is NULL."""
+    if not mask.any():
+        return None
+    return np.packbits(mask, bitorder="little")
+
+def unpack_nulls(bitmap: Optional[np.ndarray], n: int) -> np.ndarray:
+    """Bool mask of length n from a packed null bitmap (None = no NULLs)."""
+    if bitmap is None:
+        return np.zeros(n, dtype=bool)
+    return np.unpackbits(bitmap, count=n, bitorder="little").view(bool)
+
+def typed_path(path: str) -> str:
+    """The .npz file that goes with a CSV path."""
+    return os.path.splitext(path)[0] + ".npz"
+
+def narrow_ints(values: np.ndarray) -> np.ndarray:
+    """int32 when the values fit (half of read_csv's int64), else unchanged.
+
+    Narrower types would save more but overflow in ordinary arithmetic.
+    """
+    info = np.iinfo(np.int32)
+    if len(values) == 0 or (info.min <= values.min() and values.max() <= info.max):
+        return values.astype(np.int32)
+    return values
+
+def encode_column(series: pd.Series) -> Dict[str, np.ndarray]:
+    """npz members for one DataFrame column."""
+    col = series.name
+    mask = series.isna().to_numpy()
+    arrays = {}
+    if pd.api.types.is_bool_dtype(series) and not mask.any():
+        values = series.to_numpy(dtype=bool)
+    elif pd.api.types.is_integer_dtype(series):
+        values = narrow_ints(series.to_numpy(dtype=np.int64, na_value=0))
+    elif pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        present = values[~mask]
+        # Integer signals with NULLs come out of read_csv as float64
+        if mask.any() and np.array_equal(present, np.round(present)) and np.abs(present).max(initial=0) < 2**31:
+            values = narrow_ints(np.where(mask, 0, values).astype(np.int64))
+    else:
+        mask = mask | series.isin(CSV_NA_VALUES).to_numpy()
+        categorical = pd.Categorical(series.where(~mask))
+        levels = np.array([str(v) for v in categorical.categories], dtype=str)
+        values = categorical.codes.astype(np.int16 if len(levels) < 2**15 else np.int32)
+        values[mask] = 0
+        arrays[f"{col}__levels"] = levels
+    arrays[col] = values
+    bitmap = pack_nulls(mask)
+    if bitmap is not None:
+        arrays[f"{col}__nulls"] = bitmap
+    return arrays
+
+def decode_column(archive, col: str, n: int, categorical: bool = False) -> pd.Series:
+    """One DataFrame column from the npz members written by encode_column."""
+    values = archive[col]
+    members = archive.files
+    mask = unpack_nulls(archive[f"{col}__nulls"] if f"{col}__nulls" in members else None, n)
+    if f"{col}__levels" in members:
+        levels = archive[f"{col}__levels"]
+        codes = np.where(mask, -1, values)
+        if categorical:
+            return pd.Series(pd.Categorical.from_codes(codes, categories=levels), name=col)
+        # NaN, not None: read_csv's missing string (object dtype on pandas 1.x/2.x,
+        # str on 3.x, both inferred here); astype("str") would turn it into 'None'
+        strings = np.append(levels.astype(object), np.nan)
+        return pd.Series(strings[codes], name=col)
+    if mask.any():
+        # Same as read_csv: NULLs make a numeric column float64
+        return pd.Series(np.where(mask, np.nan, values), name=col)
+    if values.dtype.kind == "i" and values.dtype.itemsize < 4:
+        values = values.astype(np.int32)
+    return pd.Series(values, name=col)
+
+def source_stamp(path: str) -> np.ndarray:
+    """[size, mtime_ns] of a file, to tell whether an .npz still matches its CSV."""
+    info = os.stat(path)
+    return np.array([info.st_size, info.st_mtime_ns], dtype=np.int64)
+
+def _archive(path: str):
+    """(.npz path, stamp members) for a dataset path that may be the CSV path.
+
+    When the CSV exists (written first, as the generators do), the archive
+    records its size and mtime so read_signals() can use it in its place.
+    """
+    if path.endswith(".npz"):
+        return path, {}
+    stamp = {"__source__": source_stamp(path)} if os.path.exists(path) else {}
+    return typed_path(path), stamp
+
+def write_signals(df: pd.DataFrame, path: str):
+    """Write a DataFrame as a typed .npz dataset (path may be the CSV path)."""
+    path, arrays = _archive(path)
+    arrays.update({"__columns__": np.array([str(c) for c in df.columns]), "__rows__": np.array(len(df))})
+    for col in df.columns:
+        arrays.update(encode_column(df[col].rename(str(col))))
+    np.savez(path, **arrays)
+
+def write_arrays(arrays: Dict[str, np.ndarray], path: str):
+    """Write pre-encoded members (values, __nulls, __levels) as a typed
+    dataset (path may be the CSV path, as for write_signals)."""
+    path, stamp = _archive(path)
+    columns = [key for key in arrays if "__" not in key]
+    arrays = dict(arrays, **stamp)
+    for col in columns:
+        levels = arrays.get(f"{col}__levels")
+        null_levels = np.flatnonzero(np.isin(levels, list(CSV_NA_VALUES))) if levels is not None else []
+        if len(null_levels):
+            n = len(arrays[col])
+            mask = unpack_nulls(arrays.get(f"{col}__nulls"), n) | np.isin(arrays[col], null_levels)
+            arrays[f"{col}__nulls"] = pack_nulls(mask)
+    np.savez(path, __columns__=np.array(columns), __rows__=np.array(len(arrays[columns[0]])), **arrays)
+
+def _matches_source(npz: str, csv_path: str) -> bool:
+    """Whether npz was written from csv_path as it is now."""
+    if not os.path.exists(npz):
+        return False
+    try:
+        with np.load(npz, allow_pickle=False) as archive:
+            return ("__source__" in archive.files
+                    and np.array_equal(archive["__source__"], source_stamp(csv_path)))
+    except (OSError, ValueError):
+        return False
+
+def read_signals(path: str, columns: Optional[Sequence[str]] = None, cache: bool = False,
+                 categorical: bool = False) -> pd.DataFrame:
+    """Load a signal dataset from .npz or .csv, optionally only some columns.
+
+    Columns come back as pd.read_csv would give them, except that integer
+    columns without NULLs are int32. String columns are str (object on
+    pandas < 3), or pandas Categoricals with categorical=True (much smaller,
+    but new values cannot be assigned without adding categories first).
+    cache=True writes the .npz next to a CSV that had none (or a stale one).
+    """
+    if not path.endswith(".npz"):
+        npz = typed_path(path)
+        if not _matches_source(npz, path):
+            df = pd.read_csv(path)
+            if cache:
+                try:
+                    write_signals(df, path)
+                except OSError:
+                    pass
+            return df if columns is None else df[list(columns)]
+        path = npz
+
+    with np.load(path, allow_pickle=False) as archive:
+        names = list(archive["__columns__"])
+        n = int(archive["__rows__"])
+        if columns is not None:
+            missing = [c for c in columns if c not in names]
+            if missing:
+                raise KeyError(f"{path}: no such columns {missing}")
+            names = list(columns)
+        data = {col: decode_column(archive, col, n, categorical) for col in names}
+    return pd.DataFrame(data, columns=names)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    df = pd.DataFrame({
+        "label": ["Malicious", None, "Not-Malicious", "Malicious"],
+        "note": [None, None, "x", None],
+        "count": [1, 2, 3, 4],
+        "score": [0.5, np.nan, 2.0, 3.5],
+        "ioc_count": [1, None, 3, 2],
+        "flag": [True, False, True, True],
+        "tls_version": ["TLS 1.2", "None", "NA", "TLS 1.3"],
+    })
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "signals.csv")
+        df.to_csv(csv_path, index=False)
+        expected = pd.read_csv(csv_path)
+        first = read_signals(csv_path, cache=True)
+        written = os.path.exists(typed_path(csv_path))
+        second = read_signals(csv_path)
+        direct = os.path.join(directory, "direct.csv")
+        df.to_csv(direct, index=False)
+        write_signals(df, direct)
+        checks = [
+            ("CSV read writes the .npz with cache=True", written),
+            ("cached .npz is used on the next read", _matches_source(typed_path(csv_path), csv_path)),
+            ("'None'/'NA' strings load as NULL, as read_csv gives them",
+             second["tls_version"].isna().tolist() == [False, True, True, False]),
+            ("write_signals(df) loads like read_csv of its CSV",
+             read_signals(direct).astype(object).where(read_signals(direct).notna(), None).equals(
+                 expected.astype(object).where(expected.notna(), None))),
+            ("NULL strings stay missing", second["label"].isna().tolist() == expected["label"].isna().tolist()
+             and second["note"].isna().all() == expected["note"].isna().all()),
+            ("values round-trip", all(second[c].astype(object).where(second[c].notna(), None).tolist()
+                                      == expected[c].astype(object).where(expected[c].notna(), None).tolist()
+                                      for c in df.columns)),
+            ("first read equals read_csv", first.equals(expected)),
+        ]
+        # Same mtime, different size: the stale archive must not be used
+        with open(csv_path, "a") as f:
+            f.write("Malicious,,5,1.0,1,False\n")
+        checks.append(("stale .npz ignored", len(read_signals(csv_path)) == 5))
+        other = os.path.join(directory, "other.csv")
+        df.to_csv(other, index=False)
+        read_signals(other)
+        checks.append(("no .npz written by default", not os.path.exists(typed_path(other))))
+    for name, ok in checks:
+        print(f"  {'✅' if ok else '❌'} {name}")
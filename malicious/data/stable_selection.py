@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Hash-Stable Row Selection
+Picks rows for sampled corrections from a hash of each row's content (or of
+an ID column) instead of a seeded RNG over the whole frame. A row is
+selected when its hash, read as a number in [0, 1), is below the target
+rate, so the decision depends on that row alone: processing the data in one
+piece, in chunks, in another order or across workers selects the same rows.
+
+The hash is taken over canonical values, so it does not change with the
+dtype a chunk happens to be parsed as (int32 from the typed store, int64 or
+float64 from read_csv when a chunk has NULLs). Identical rows hash the same
+and are selected together.
+
+select_count() is the exact-count variant: the n rows with the smallest
+hashes. It also gives the same rows for any chunking, since the n smallest
+of every chunk merge into the n smallest overall (smallest_hashes()).
+
+    python stable_selection.py [dataset.csv] [rate] [chunk_rows]
+"""
+
+import sys
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+_MULTIPLIER = np.uint64(0x100000001B3)
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (uint64 in, well-spread uint64 out)."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * np.uint64(0xBF58476D1CE4E5B9)
+    h = h ^ (h >> np.uint64(27))
+    h = h * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+def column_hash(series: pd.Series) -> np.ndarray:
+    """uint64 hash of each value, independent of the column's dtype."""
+    if pd.api.types.is_bool_dtype(series):
+        series = series.astype(float)
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan) + 0.0   # -0.0 -> 0.0
+        values[np.isnan(values)] = np.nan                               # one NaN bit pattern
+        return pd.util.hash_array(values)
+    values = series.astype("str").to_numpy(dtype=object, na_value=None)
+    return pd.util.hash_array(values, categorize=False)
+
+def row_hash(df: pd.DataFrame, columns: Optional[Sequence[str]] = None, seed: int = 0) -> np.ndarray:
+    """uint64 hash of each row's values in columns (default: all), salted by seed."""
+    columns = list(df.columns) if columns is None else list(columns)
+    with np.errstate(over="ignore"):
+        h = np.full(len(df), np.uint64(seed) ^ np.uint64(0xCBF29CE484222325), dtype=np.uint64)
+        for col in columns:
+            h = (h ^ column_hash(df[col])) * _MULTIPLIER
+        return _mix(h)
+
+def hash_unit(hashes: np.ndarray) -> np.ndarray:
+    """Hashes as floats in [0, 1) (top 53 bits)."""
+    return (hashes >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+def select_rate(df: pd.DataFrame, rate: float, columns: Optional[Sequence[str]] = None,
+                seed: int = 0) -> np.ndarray:
+    """Bool mask selecting about rate * len(df) rows, the same rows under any chunking."""
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError("rate must be between 0 and 1")
+    return hash_unit(row_hash(df, columns, seed)) < rate
+
+def smallest_hashes(hashes: np.ndarray, n: int) -> np.ndarray:
+    """Positions of the n smallest hashes (ties broken by position)."""
+    if n >= len(hashes):
+        return np.arange(len(hashes))
+    cutoff = np.partition(hashes, n - 1)[n - 1]
+    below = np.flatnonzero(hashes < cutoff)
+    at = np.flatnonzero(hashes == cutoff)
+    return np.sort(np.concatenate([below, at[:n - len(below)]]))
+
+def select_count(df: pd.DataFrame, n: int, columns: Optional[Sequence[str]] = None,
+                 seed: int = 0) -> np.ndarray:
+    """Bool mask selecting the min(n, len(df)) rows with the smallest hashes."""
+    mask = np.zeros(len(df), dtype=bool)
+    mask[smallest_hashes(row_hash(df, columns, seed), n)] = True
+    return mask
+
+
+if __name__ == "__main__":
+    from signal_store import read_signals
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "email_detection_signals.csv"
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    chunk_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+
+    df = pd.read_csv(path)
+    whole = np.flatnonzero(select_rate(df, rate, seed=42))
+    print(f"{path}: {len(df):,} rows, rate {rate} -> {len(whole):,} selected")
+
+    # In chunks, each parsed on its own by read_csv (dtypes can differ per chunk)
+    chunked = []
+    for offset, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows)):
+        chunked.extend(np.flatnonzero(select_rate(chunk, rate, seed=42)) + offset * chunk_rows)
+    # Shuffled, and through the typed store
+    order = np.random.default_rng(0).permutation(len(df))
+    shuffled = np.sort(order[select_rate(df.iloc[order], rate, seed=42)])
+    typed = np.flatnonzero(select_rate(read_signals(path), rate, seed=42))
+
+    for name, rows in (("chunked", np.array(chunked)), ("shuffled", shuffled), ("typed store", typed)):
+        print(f"  {'✅' if np.array_equal(rows, whole) else '❌'} {name}: {len(rows):,} selected")
+
+    n = max(len(whole), 1)
+    first = smallest_hashes(row_hash(df, seed=42), n)
+    merged = []
+    for offset, chunk in enumerate(pd.read_csv(path, chunksize=chunk_rows)):
+        hashes = row_hash(chunk, seed=42)
+        merged.extend((hashes[i], offset * chunk_rows + i) for i in smallest_hashes(hashes, n))
+    merged = np.sort([row for _, row in sorted(merged)[:n]])
+    print(f"  {'✅' if np.array_equal(merged, first) else '❌'} select_count({n}) merged across chunks")
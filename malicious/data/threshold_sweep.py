@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Threshold Sweep Engine
+Evaluates a whole grid of cuts on a score column at once: the column is
+sorted a single time, and for every threshold the number of rows flagged
+(`score > t`, or whichever comparison is asked for) per label is read off
+with a binary search. Label distributions, confusion matrices and
+precision/recall for the full grid cost that one sort plus O(grid) lookups,
+instead of one filter (or one script run) per threshold value.
+
+sweep_rule_threshold() applies the same idea to a relabel rule set whose
+threshold is a parameter (e.g. relabel_rules.refined_rules): a row's label
+only depends on which side of the threshold its score falls, so the rule
+set is evaluated twice and the grid is read from the sorted scores.
+
+    python threshold_sweep.py final_spam_with_class.csv content_spam_score final-class Spam
+    python threshold_sweep.py data.csv score label positive --start 0.3 --stop 0.7 --step 0.01
+"""
+
+import argparse
+import operator
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from relabel_rules import RuleSet
+
+OPS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+class ThresholdSweep:
+    """One sorted score column; counts of rows flagged by `score <op> t`.
+
+    NULL scores are never flagged, as with a plain comparison.
+    """
+
+    def __init__(self, scores, op: str = ">"):
+        if op not in OPS:
+            raise ValueError(f"op must be one of {list(OPS)}")
+        scores = np.asarray(scores, dtype=float)
+        self.op = op
+        self.n = len(scores)
+        present = np.flatnonzero(~np.isnan(scores))
+        order = np.argsort(scores[present], kind="stable")
+        self.rows = present[order]            # row index of each sorted position
+        self.sorted = scores[self.rows]
+
+    def _flagged_positions(self, thresholds: np.ndarray) -> np.ndarray:
+        """(start, stop) of the flagged slice of the sorted scores per threshold."""
+        m = len(self.sorted)
+        if self.op in (">", ">="):
+            start = np.searchsorted(self.sorted, thresholds, side="right" if self.op == ">" else "left")
+            return start, np.full(len(thresholds), m)
+        stop = np.searchsorted(self.sorted, thresholds, side="left" if self.op == "<" else "right")
+        return np.zeros(len(thresholds), dtype=np.intp), stop
+
+    def flagged(self, thresholds: Sequence[float]) -> np.ndarray:
+        """Rows flagged at each threshold."""
+        start, stop = self._flagged_positions(np.asarray(thresholds, dtype=float))
+        return stop - start
+
+    def flagged_by_label(self, labels, thresholds: Sequence[float]) -> pd.DataFrame:
+        """Rows flagged at each threshold, per label value (thresholds x labels)."""
+        thresholds = np.asarray(thresholds, dtype=float)
+        codes, uniques = pd.factorize(pd.Series(labels), sort=True)
+        sorted_codes = codes[self.rows]
+        start, stop = self._flagged_positions(thresholds)
+        counts = {}
+        for code, label in enumerate(uniques):
+            # Sorted positions holding this label; flagged = those inside [start, stop)
+            positions = np.flatnonzero(sorted_codes == code)
+            counts[label] = np.searchsorted(positions, stop) - np.searchsorted(positions, start)
+        return pd.DataFrame(counts, index=pd.Index(thresholds, name="threshold"))
+
+    def label_distribution(self, labels, thresholds: Sequence[float]) -> pd.DataFrame:
+        """Label counts on each side of every threshold (columns: flagged / not_flagged x label)."""
+        flagged = self.flagged_by_label(labels, thresholds)
+        totals = pd.Series(labels).value_counts()
+        not_flagged = totals.reindex(flagged.columns, fill_value=0) - flagged
+        return pd.concat({"flagged": flagged, "not_flagged": not_flagged}, axis=1)
+
+    def confusion(self, labels, positive, thresholds: Sequence[float]) -> pd.DataFrame:
+        """tp / fp / fn / tn per threshold, predicting `positive` for flagged rows."""
+        actual = pd.Series(labels).to_numpy() == positive
+        flagged = self.flagged_by_label(actual, thresholds)
+        tp = flagged[True].to_numpy() if True in flagged else np.zeros(len(flagged), dtype=np.int64)
+        fp = flagged[False].to_numpy() if False in flagged else np.zeros(len(flagged), dtype=np.int64)
+        positives = int(actual.sum())
+        return pd.DataFrame({"tp": tp, "fp": fp, "fn": positives - tp, "tn": self.n - positives - fp},
+                            index=flagged.index)
+
+    def metrics(self, labels, positive, thresholds: Sequence[float]) -> pd.DataFrame:
+        """Confusion counts plus precision, recall, f1, accuracy and false positive rate."""
+        table = self.confusion(labels, positive, thresholds)
+        tp, fp, fn, tn = (table[c].to_numpy(dtype=float) for c in ("tp", "fp", "fn", "tn"))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["precision"] = tp / (tp + fp)
+            table["recall"] = tp / (tp + fn)
+            table["f1"] = 2 * tp / (2 * tp + fp + fn)
+            table["accuracy"] = (tp + tn) / max(self.n, 1)
+            table["fpr"] = fp / (fp + tn)
+        return table
+
+def sweep_rule_threshold(build: Callable[[float], "RuleSet"], df: pd.DataFrame, field: str,
+                         thresholds: Sequence[float], op: str = ">") -> pd.DataFrame:
+    """Label distribution of build(t).apply(df) for every t in thresholds.
+
+    build(t) must use t only in `field <op> t` predicates. Each row then
+    gets the label of build(-inf) or build(+inf) depending on which side of
+    t its score falls, so the rule set is evaluated twice for the whole grid.
+    """
+    flag_all, flag_none = (-np.inf, np.inf) if op in (">", ">=") else (np.inf, -np.inf)
+    labels_flagged = build(flag_all).apply(df)[0]
+    labels_unflagged = build(flag_none).apply(df)[0]
+    sweep = ThresholdSweep(df[field].to_numpy(dtype=float, na_value=np.nan), op)
+    moved_in = sweep.flagged_by_label(labels_flagged, thresholds)
+    moved_out = sweep.flagged_by_label(labels_unflagged, thresholds)
+    base = pd.Series(labels_unflagged).value_counts()
+    columns = sorted(set(moved_in.columns) | set(moved_out.columns) | set(base.index))
+    result = (moved_in.reindex(columns=columns, fill_value=0)
+              - moved_out.reindex(columns=columns, fill_value=0)
+              + base.reindex(columns, fill_value=0))
+    return result.astype(np.int64)
+
+
+if __name__ == "__main__":
+    from signal_store import read_signals
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dataset")
+    parser.add_argument("score_column")
+    parser.add_argument("label_column")
+    parser.add_argument("positive", help="label value counted as positive")
+    parser.add_argument("--op", choices=list(OPS), default=">")
+    parser.add_argument("--start", type=float, default=0.0)
+    parser.add_argument("--stop", type=float, default=1.0)
+    parser.add_argument("--step", type=float, default=0.05)
+    parser.add_argument("--check", action="store_true", help="compare every row of the grid with a direct filter")
+    args = parser.parse_args()
+
+    df = read_signals(args.dataset, columns=[args.score_column, args.label_column])
+    grid = np.round(np.arange(args.start, args.stop + args.step / 2, args.step), 10)
+
+    start = time.perf_counter()
+    sweep = ThresholdSweep(df[args.score_column].to_numpy(dtype=float, na_value=np.nan), args.op)
+    table = sweep.metrics(df[args.label_column], args.positive, grid)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.score_column} {args.op} t  vs  {args.label_column} == {args.positive!r}  "
+          f"({len(df):,} rows, {len(grid)} thresholds, {elapsed * 1000:.1f} ms)")
+    print("=" * 80)
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print(table.to_string())
+    best = table["f1"].idxmax()
+    print(f"\nBest F1: {table.loc[best, 'f1']:.3f} at threshold {best:g}")
+
+    if args.check:
+        scores = df[args.score_column]
+        actual = df[args.label_column] == args.positive
+        for t in grid:
+            predicted = OPS[args.op](scores, t)
+            expected = [(predicted & actual).sum(), (predicted & ~actual).sum(),
+                        (~predicted & actual).sum(), (~predicted & ~actual).sum()]
+            if list(table.loc[t, ["tp", "fp", "fn", "tn"]]) != expected:
+                print(f"MISMATCH at {t}: {list(table.loc[t, ['tp', 'fp', 'fn', 'tn']])} != {expected}")
+                sys.exit(1)
+        print("Check: every threshold matches a direct filter")
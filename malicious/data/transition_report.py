@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Label Transition Report
+Before/after report for any pair of label columns (label -> corrected_label,
+corrected_label -> refined_label, ...): transition counts, per-class signal
+activation rates and score means, rendered as JSON or markdown.
+
+Everything comes from one grouped aggregation: both label columns are
+factorized, each row gets the code of its (old, new) pair, and np.bincount
+over that code gives the pair counts, the number of rows with each signal
+set and the score sums. Per-class figures are sums over the pair table, so
+the cost is a few O(n) passes whatever the number of classes. The pair
+tables of separate row blocks add up (merge_tables), so a file relabeled
+block by block gets the same report.
+
+    python transition_report.py email_detection_signals_corrected.csv label corrected_label --markdown report.md
+"""
+
+import argparse
+import json
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from relabel_rules import FILE_SIGNALS, URL_THREATS, Predicate, PredicateCache
+
+DEFAULT_SIGNALS = {"file_signals": FILE_SIGNALS, "url_threats": URL_THREATS}
+DEFAULT_SCORES = ["content_spam_score"]
+
+def _nested(table: np.ndarray, rows, cols, skip_zero: bool = True) -> Dict:
+    """{row label: {col label: value}} from a 2-D table, largest first."""
+    result = {}
+    for i, row in enumerate(rows):
+        order = np.argsort(-table[i], kind="stable")
+        result[row] = {cols[j]: table[i, j].item() for j in order if not (skip_zero and table[i, j] == 0)}
+    return result
+
+def transition_tables(df: pd.DataFrame, old_column: str, new_column: str,
+                      signals: Optional[Dict[str, Predicate]] = None,
+                      scores: Sequence[str] = DEFAULT_SCORES,
+                      cache: Optional[PredicateCache] = None) -> Dict:
+    """(old, new) pair tables of df: rows, rows with each signal set, score
+    sums and non-NULL score counts. Tables of disjoint row blocks combine
+    with merge_tables; report_from_tables turns them into the report."""
+    signals = DEFAULT_SIGNALS if signals is None else signals
+    cache = cache or PredicateCache(df)
+    old_codes, old_labels = pd.factorize(df[old_column])
+    new_codes, new_labels = pd.factorize(df[new_column])
+    old_labels, new_labels = [str(v) for v in old_labels], [str(v) for v in new_labels]
+    k_old, k_new = len(old_labels), len(new_labels)
+    # NULL labels (code -1) are left out of every table
+    valid = (old_codes >= 0) & (new_codes >= 0)
+    pair = np.where(valid, old_codes * k_new + new_codes, k_old * k_new)
+    size = k_old * k_new + 1
+
+    def pair_table(weights=None) -> np.ndarray:
+        return np.bincount(pair, weights=weights, minlength=size)[:-1].reshape(k_old, k_new)
+
+    score_sums, score_counts = {}, {}
+    for score in scores:
+        values = cache.column(score)
+        present = ~np.isnan(values)
+        score_sums[score] = pair_table(np.where(present, values, 0.0))
+        score_counts[score] = pair_table(present)
+    return {
+        "old_column": old_column, "new_column": new_column,
+        "old_labels": old_labels, "new_labels": new_labels,
+        "counts": pair_table().astype(np.int64),
+        "signal_counts": {name: pair_table(cache.mask(predicate)) for name, predicate in signals.items()},
+        "score_sums": score_sums,
+        "score_counts": score_counts,
+    }
+
+def merge_tables(first: Dict, second: Dict) -> Dict:
+    """Tables of the rows of both blocks (labels in order of first appearance)."""
+    old_labels = first["old_labels"] + [v for v in second["old_labels"] if v not in first["old_labels"]]
+    new_labels = first["new_labels"] + [v for v in second["new_labels"] if v not in first["new_labels"]]
+
+    def aligned(tables: Dict, table: np.ndarray) -> np.ndarray:
+        out = np.zeros((len(old_labels), len(new_labels)), dtype=table.dtype)
+        out[np.ix_([old_labels.index(v) for v in tables["old_labels"]],
+                   [new_labels.index(v) for v in tables["new_labels"]])] = table
+        return out
+
+    merged = dict(first, old_labels=old_labels, new_labels=new_labels,
+                  counts=aligned(first, first["counts"]) + aligned(second, second["counts"]))
+    for key in ("signal_counts", "score_sums", "score_counts"):
+        merged[key] = {name: aligned(first, table) + aligned(second, second[key][name])
+                       for name, table in first[key].items()}
+    return merged
+
+def report_from_tables(tables: Dict) -> Dict:
+    """Transition counts, activation rates (%) and score means of both label columns."""
+    old_labels, new_labels = tables["old_labels"], tables["new_labels"]
+    counts = tables["counts"]
+    signal_counts, score_sums, score_counts = tables["signal_counts"], tables["score_sums"], tables["score_counts"]
+
+    def per_class(axis: int, labels) -> Dict:
+        totals = counts.sum(axis=axis)
+        classes = {}
+        for i, label in enumerate(labels):
+            entry = {"rows": int(totals[i]), "activation": {}, "score_means": {}}
+            for name, table in signal_counts.items():
+                hits = table.sum(axis=axis)[i]
+                entry["activation"][name] = float(hits / totals[i] * 100) if totals[i] else None
+            for score in score_sums:
+                n_present = score_counts[score].sum(axis=axis)[i]
+                entry["score_means"][score] = (float(score_sums[score].sum(axis=axis)[i] / n_present)
+                                                if n_present else None)
+            classes[label] = entry
+        return classes
+
+    return {
+        "old_column": tables["old_column"],
+        "new_column": tables["new_column"],
+        "rows": int(counts.sum()),
+        "transitions": _nested(counts, old_labels, new_labels),
+        "changed_rows": int(counts.sum() - sum(counts[i, new_labels.index(label)]
+                                               for i, label in enumerate(old_labels) if label in new_labels)),
+        "old_classes": per_class(1, old_labels),
+        "new_classes": per_class(0, new_labels),
+    }
+
+def transition_report(df: pd.DataFrame, old_column: str, new_column: str,
+                      signals: Optional[Dict[str, Predicate]] = None,
+                      scores: Sequence[str] = DEFAULT_SCORES,
+                      cache: Optional[PredicateCache] = None) -> Dict:
+    """Transition counts, activation rates (%) and score means of new_column
+    classes (and of old_column classes), from one grouped pass over df."""
+    return report_from_tables(transition_tables(df, old_column, new_column, signals, scores, cache))
+
+def _fmt(value, digits: int = 1) -> str:
+    return "n/a" if value is None else f"{value:.{digits}f}"
+
+def render_markdown(report: Dict, title: Optional[str] = None, level: int = 1) -> str:
+    """Markdown version of a transition_report; level is the depth of its
+    top heading, so the rendering can be a section of a larger document."""
+    old, new = report["old_column"], report["new_column"]
+    h = "#" * level
+    lines = [f"{h} {title or f'{old} -> {new}'}", "",
+             f"- **Rows**: {report['rows']:,}",
+             f"- **Rows whose label changed**: {report['changed_rows']:,}", ""]
+    for heading, key in ((f"Classes by {old}", "old_classes"), (f"Classes by {new}", "new_classes")):
+        classes = report[key]
+        signal_names = list(next(iter(classes.values()))["activation"]) if classes else []
+        score_names = list(next(iter(classes.values()))["score_means"]) if classes else []
+        lines += [f"{h}# {heading}", "",
+                  "| Class | Rows | Share | " + " | ".join([f"{s} %" for s in signal_names] +
+                                                   [f"mean {s}" for s in score_names]) + " |",
+                  "|---|---:|---:|" + "---:|" * (len(signal_names) + len(score_names))]
+        for label, entry in classes.items():
+            cells = ([_fmt(entry["activation"][s]) for s in signal_names] +
+                     [_fmt(entry["score_means"][s], 3) for s in score_names])
+            share = _fmt(entry["rows"] / report["rows"] * 100 if report["rows"] else None) + "%"
+            lines.append(f"| {label} | {entry['rows']:,} | {share} | " + " | ".join(cells) + " |")
+        lines.append("")
+    lines += [f"{h}# Transitions", ""]
+    for original, targets in report["transitions"].items():
+        total = sum(targets.values())
+        lines.append(f"{h}## {old} '{original}' redistributed as:")
+        for label, count in targets.items():
+            lines.append(f"- **{label}**: {count:,} ({count / total * 100:.1f}%)")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from signal_store import read_signals
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("dataset")
+    parser.add_argument("old_column")
+    parser.add_argument("new_column")
+    parser.add_argument("--json", help="write the report as JSON here")
+    parser.add_argument("--markdown", help="write the markdown rendering here")
+    args = parser.parse_args()
+
+    df = read_signals(args.dataset)
+    report = transition_report(df, args.old_column, args.new_column)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+    markdown = render_markdown(report)
+    if args.markdown:
+        with open(args.markdown, "w") as f:
+            f.write(markdown)
+    if not (args.json or args.markdown):
+        print(markdown)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
+
+from shared_store import read_signals
 
 # Load testing data
-testing_df = pd.read_csv("spam-kaggle-with-label.csv")
+testing_df = read_signals("spam-kaggle-with-label.csv")
 
 print("ANALYZING MISCLASSIFIED TESTING ROWS: 209, 104, 83")
 print("=" * 80)
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
-import pandas as pd
-import numpy as np
 
-df = pd.read_csv('spam-kaggle-with-label.csv')
+from shared_store import read_signals
+
+df = read_signals('spam-kaggle-with-label.csv')
 not_spam = df[df['final_label'] == 'Not-Spam']
 
 print("NOT-SPAM RECORDS ANALYSIS")
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
+
+from shared_store import read_signals
 
 # Load training data
-training_df = pd.read_csv("training_subset_15_signals.csv")
+training_df = read_signals("training_subset_15_signals.csv")
 not_spam_training = training_df[training_df['Binary_Label'] == 'Not-Spam']
 
 print("NOT-SPAM RECORDS IN TRAINING DATA ANALYSIS")
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
-import numpy as np
+
+from shared_store import read_signals
 
 # Read the testing file
-df = pd.read_csv("final_spam_with_class.csv")
+df = read_signals("final_spam_with_class.csv")
 
 print("THE BRUTAL TRUTH ABOUT THE THRESHOLD")
 print("=" * 80)
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
+
+from shared_store import read_signals
 
 # Read training data
-training_df = pd.read_csv("spam_detector_training_data.csv")
+training_df = read_signals("spam_detector_training_data.csv")
 
 print("TRAINING DATA ANALYSIS")
 print("=" * 80)
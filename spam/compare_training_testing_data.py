@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
-import pandas as pd
-import numpy as np
+
+from shared_store import read_signals
 
 # Load both datasets
-training_df = pd.read_csv("training_subset_15_signals.csv")
-testing_df = pd.read_csv("spam-kaggle-with-label.csv")
+training_df = read_signals("training_subset_15_signals.csv")
+testing_df = read_signals("spam-kaggle-with-label.csv")
 
 # Fix column name inconsistency
 if 'marketing-keywords_detected' in testing_df.columns:
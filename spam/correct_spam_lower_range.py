@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
-import pandas as pd
 import numpy as np
 
+from shared_store import read_signals, write_signals
+
 # Load the full training data
 print("CORRECTING LOWER-END SPAM RECORDS")
 print("=" * 80)
 
 # Load original training data
-full_training = pd.read_csv("spam_detector_training_data.csv")
+full_training = read_signals("spam_detector_training_data.csv")
 print(f"Original training data shape: {full_training.shape}")
 
 # Check the actual range of content_spam_score for Spam
@@ -82,6 +83,7 @@ for label in ['Spam', 'Not-Spam']:
 
 # Save corrected data
 corrected_training.to_csv("spam_detector_training_data_corrected.csv", index=False)
+write_signals(corrected_training, "spam_detector_training_data_corrected.csv")
 print("\n\nSaved corrected training data to: spam_detector_training_data_corrected.csv")
 
 # Save 15-signal subset
@@ -93,6 +95,7 @@ training_signals = [
 ]
 corrected_subset = corrected_training[training_signals + ['Binary_Label']]
 corrected_subset.to_csv("training_subset_15_signals_corrected.csv", index=False)
+write_signals(corrected_subset, "training_subset_15_signals_corrected.csv")
 print("Saved corrected 15-signal subset to: training_subset_15_signals_corrected.csv")
 
 print("\n\nIMPACT:")
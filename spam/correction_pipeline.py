@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Spam Training Data Correction Pipeline
+Runs the spam label fixes as one chain: the base training data is loaded
+once, each correction step edits it in memory in order, and a single final
+dataset is written. Per-step change counts (rows relabeled, rows added,
+label distribution after the step) come out as a side product.
+
+The steps are the corrections from correct_spam_edge_cases.py,
+correct_spam_lower_range.py, create_corrective_patterns.py and the anchor
+record scripts (create_200_spam_records.py / create_200_notspam_records.py),
+with the same selections and seeds, so no intermediate _v2/_v3/_v4 copies
+are needed.
+
+    python correction_pipeline.py
+    python correction_pipeline.py --steps edge_cases,anchor_spam --output spam_detector_training_data_fixed.csv
+    python correction_pipeline.py --rate 0.5    # hash-stable selection for the sampled steps
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+import pandas as pd
+
+from shared_store import read_signals, write_signals, select_rate
+
+LABEL = 'Binary_Label'
+CLASSIFICATION = 'Final Classification'
+
+TRAINING_SIGNALS = [
+    'spf_result', 'dmarc_result', 'user_marked_as_spam_before', 'image_only_email',
+    'url_count', 'url_reputation_score', 'total_links_detected', 'sender_domain_reputation_score',
+    'smtp_ip_reputation_score', 'return_path_reputation_score', 'content_spam_score',
+    'marketing-keywords_detected', 'bulk_message_indicator', 'unsubscribe_link_present', 'html_text_ratio'
+]
+
+SPF_OPTIONS = ['pass', 'neutral', 'none', 'fail', 'softfail', 'permerror', 'temperror']
+DMARC_OPTIONS = ['pass', 'none', 'fail', 'quarantine', 'reject', 'permerror', 'temperror']
+
+class CorrectionStep(NamedTuple):
+    name: str
+    apply: Callable[[pd.DataFrame], pd.DataFrame]  # edits labels in place and/or returns a longer frame
+    description: str
+
+def relabel(df: pd.DataFrame, index, label: str, classification: str):
+    df.loc[index, LABEL] = label
+    df.loc[index, CLASSIFICATION] = classification
+
+# ============================================================================
+# CORRECTION STEPS
+# ============================================================================
+
+def sample_spam_to_not_spam(low: float, high: float, inclusive: bool, n: int = 300, seed: int = 42,
+                            rate: Optional[float] = None):
+    """Spam rows with content_spam_score in (low, high) (or [low, high]) -> Not-Spam.
+
+    By default n candidates are sampled as the original script did, which
+    depends on seeing the whole frame in order. With a rate, each candidate
+    is selected on a hash of its signal values (stable_selection), so the
+    same rows are chosen however the data is chunked or split over workers.
+    """
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        score = df['content_spam_score']
+        in_range = score.between(low, high, inclusive="both" if inclusive else "neither")
+        candidates = (df[LABEL] == 'Spam') & in_range
+        if rate is None:
+            chosen = pd.Series(df.index[candidates]).sample(n=min(n, int(candidates.sum())), random_state=seed)
+            chosen = chosen.to_numpy()
+        else:
+            signals = [c for c in df.columns if c not in (LABEL, CLASSIFICATION)]
+            chosen = df.index[candidates.to_numpy() & select_rate(df, rate, signals, seed)]
+        relabel(df, chosen, 'Not-Spam', 'No Action')
+        return df
+    return step
+
+def corrective_patterns(df: pd.DataFrame) -> pd.DataFrame:
+    """Top Not-Spam rows of the three misclassified testing patterns -> Spam."""
+    not_spam = df[LABEL] == 'Not-Spam'
+    score = df['content_spam_score']
+    high_content = df[not_spam & (score > 0.5)].sort_values('content_spam_score', ascending=False)
+    low_sender = df[not_spam & (df['sender_domain_reputation_score'] < 0.4) & (score > 0.3)].sort_values(
+        ['content_spam_score', 'sender_domain_reputation_score'], ascending=[False, True])
+    high_url = df[not_spam & (df['url_count'] >= 5) & (score > 0.2)].sort_values(
+        ['url_count', 'content_spam_score'], ascending=[False, False])
+    chosen = high_content.index[:20].union(low_sender.index[:15]).union(high_url.index[:15])
+    relabel(df, chosen, 'Spam', 'Spam')
+    return df
+
+def anchor_spam_record(record: dict, rng: random.Random):
+    """High content score + high reputation = Spam (create_200_spam_records.py)."""
+    record['sender_domain_reputation_score'] = round(rng.uniform(0.70, 1.0), 2)
+    record['return_path_reputation_score'] = round(rng.uniform(0.70, 1.0), 2)
+    record['content_spam_score'] = round(rng.uniform(0.75, 0.99), 4)
+    record['marketing-keywords_detected'] = round(rng.uniform(0.35, 0.80), 4)
+    record['spf_result'] = rng.choice(SPF_OPTIONS)
+    record['dmarc_result'] = rng.choice(DMARC_OPTIONS)
+    record['url_count'] = rng.randint(0, 10)
+    record['total_links_detected'] = rng.randint(0, 10)
+    record['url_reputation_score'] = round(rng.uniform(0.1, 0.9), 2)
+    record['smtp_ip_reputation_score'] = round(rng.uniform(0.2, 0.7), 2)
+    record['reply_path_reputation_score'] = round(rng.uniform(0.5, 1.0), 2)
+    record['html_text_ratio'] = round(rng.uniform(0.5, 1.0), 2)
+    record['user_marked_as_spam_before'] = 0
+    record['image_only_email'] = rng.choice([0, 0, 0, 1])
+    record['bulk_message_indicator'] = rng.choice([0, 0, 1])
+    record['unsubscribe_link_present'] = rng.choice([0, 0, 1])
+
+def anchor_not_spam_record(record: dict, rng: random.Random):
+    """Low content score + many links + unsubscribe = Not-Spam (create_200_notspam_records.py)."""
+    record['content_spam_score'] = round(rng.uniform(0.05, 0.25), 4)
+    record['sender_domain_reputation_score'] = round(rng.uniform(0.0, 0.3), 2)
+    record['return_path_reputation_score'] = round(rng.uniform(0.70, 1.0), 2)
+    record['marketing-keywords_detected'] = round(rng.uniform(0.01, 0.15), 4)
+    record['total_links_detected'] = rng.randint(15, 50)
+    record['url_count'] = rng.randint(5, 15)
+    record['unsubscribe_link_present'] = 1
+    record['spf_result'] = rng.choice(SPF_OPTIONS)
+    record['dmarc_result'] = rng.choice(DMARC_OPTIONS)
+    record['url_reputation_score'] = round(rng.uniform(0.5, 0.9), 2)
+    record['smtp_ip_reputation_score'] = round(rng.uniform(0.0, 0.3), 2)
+    record['html_text_ratio'] = round(rng.uniform(0.8, 1.0), 2)
+    record['user_marked_as_spam_before'] = 0
+    record['image_only_email'] = rng.choice([0, 0, 0, 1])
+    record['bulk_message_indicator'] = rng.choice([0, 1])
+
+def append_anchor_records(label: str, classification: str, fill: Callable[[dict, random.Random], None],
+                          n: int = 200, seed: int = 42):
+    """Append n records built from the first `label` row with fill() applied."""
+    def step(df: pd.DataFrame) -> pd.DataFrame:
+        template = df[df[LABEL] == label].iloc[0].to_dict()
+        rng = random.Random(seed)
+        records = []
+        for _ in range(n):
+            record = template.copy()
+            fill(record, rng)
+            record[LABEL] = label
+            record[CLASSIFICATION] = classification
+            records.append(record)
+        return pd.concat([df, pd.DataFrame(records, columns=df.columns)], ignore_index=True)
+    return step
+
+def build_steps(rate: Optional[float] = None) -> Dict[str, CorrectionStep]:
+    """All correction steps by name; rate switches the sampled steps to hash selection."""
+    selection = "300 sampled" if rate is None else f"hash rate {rate}"
+    return {
+        'edge_cases': CorrectionStep('edge_cases', sample_spam_to_not_spam(0.25, 0.35, inclusive=False, rate=rate),
+                                     f"Spam with 0.25 < content_spam_score < 0.35 -> Not-Spam ({selection})"),
+        'lower_range': CorrectionStep('lower_range', sample_spam_to_not_spam(0.35, 0.45, inclusive=True, rate=rate),
+                                      f"Spam with 0.35 <= content_spam_score <= 0.45 -> Not-Spam ({selection})"),
+        'corrective_patterns': CorrectionStep('corrective_patterns', corrective_patterns,
+                                              "Not-Spam matching the misclassified testing patterns -> Spam"),
+        'anchor_spam': CorrectionStep('anchor_spam', append_anchor_records('Spam', 'Spam', anchor_spam_record, seed=42),
+                                      "Append 200 high content + high reputation Spam records"),
+        'anchor_not_spam': CorrectionStep('anchor_not_spam',
+                                          append_anchor_records('Not-Spam', 'No Action', anchor_not_spam_record, seed=43),
+                                          "Append 200 low content + many links + unsubscribe Not-Spam records"),
+    }
+
+STEPS = build_steps()
+DEFAULT_STEPS = list(STEPS)
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+
+def run_pipeline(df: pd.DataFrame, steps: Sequence[CorrectionStep]):
+    """Apply steps in order; returns (corrected df, per-step change counts)."""
+    df = df.copy()
+    changes = []
+    for step in steps:
+        start = time.perf_counter()
+        before = df[LABEL].to_numpy(copy=True)
+        df = step.apply(df)
+        after = df[LABEL].to_numpy()
+        changed = before != after[:len(before)]
+        moved = pd.Series(after[:len(before)][changed]).value_counts()
+        counts = df[LABEL].value_counts()
+        changes.append({
+            'step': step.name,
+            'relabeled': int(changed.sum()),
+            'to_spam': int(moved.get('Spam', 0)),
+            'to_not_spam': int(moved.get('Not-Spam', 0)),
+            'added': len(after) - len(before),
+            'spam': int(counts.get('Spam', 0)),
+            'not_spam': int(counts.get('Not-Spam', 0)),
+            'seconds': time.perf_counter() - start,
+        })
+    return df, pd.DataFrame(changes).set_index('step')
+
+def save_output(df: pd.DataFrame, output_path: str, subset: bool = False):
+    df.to_csv(output_path, index=False)
+    write_signals(df, output_path)
+    print(f"Saved corrected training data to: {output_path}")
+    if subset:
+        subset_path = os.path.join(os.path.dirname(output_path) or ".",
+                                   "training_subset_15_signals_" + os.path.basename(output_path))
+        corrected_subset = df[TRAINING_SIGNALS + [LABEL]]
+        corrected_subset.to_csv(subset_path, index=False)
+        write_signals(corrected_subset, subset_path)
+        print(f"Saved corrected 15-signal subset to: {subset_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spam Training Data Correction Pipeline")
+    parser.add_argument("--input", default="spam_detector_training_data.csv")
+    parser.add_argument("--output", default="spam_detector_training_data_pipeline.csv")
+    parser.add_argument("--steps", default=",".join(DEFAULT_STEPS),
+                        help=f"comma-separated, applied in order (available: {', '.join(STEPS)})")
+    parser.add_argument("--subset", action="store_true", help="also write the 15-signal training subset")
+    parser.add_argument("--rate", type=float, help="select sampled corrections by row hash at this rate "
+                                                    "(chunk- and order-independent) instead of sampling 300")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.steps.split(",") if name.strip()]
+    unknown = [name for name in names if name not in STEPS]
+    if unknown:
+        parser.error(f"unknown steps: {', '.join(unknown)}")
+    available = build_steps(args.rate)
+    steps = [available[name] for name in names]
+
+    print("SPAM TRAINING DATA CORRECTION PIPELINE")
+    print("=" * 80)
+    df = read_signals(args.input)
+    print(f"Loaded {args.input}: {df.shape}")
+    print(f"Original class distribution: {df[LABEL].value_counts().to_dict()}")
+
+    print("\nSteps:")
+    for i, step in enumerate(steps, 1):
+        print(f"  {i}. {step.name}: {step.description}")
+
+    corrected, changes = run_pipeline(df, steps)
+
+    print("\nCHANGES PER STEP:")
+    print("-" * 80)
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print(changes.to_string())
+    print(f"\nFinal class distribution: {corrected[LABEL].value_counts().to_dict()}")
+
+    save_output(corrected, args.output, args.subset)
@@ -3,11 +3,13 @@ import pandas as pd
 import numpy as np
 import random
 
+from shared_store import read_signals, write_signals
+
 np.random.seed(42)
 random.seed(42)
 
 # Load training data
-train_df = pd.read_csv('spam_detector_training_data_anchor2_corrected.csv')
+train_df = read_signals('spam_detector_training_data_anchor2_corrected.csv')
 
 print('CREATING 200 NEW SPAM RECORDS')
 print('=' * 60)
@@ -73,6 +75,7 @@ print(combined_df['Binary_Label'].value_counts())
 
 # Save combined data
 combined_df.to_csv('spam_detector_training_data_anchor2_corrected_v2.csv', index=False)
+write_signals(combined_df, 'spam_detector_training_data_anchor2_corrected_v2.csv')
 print(f'\nSaved to: spam_detector_training_data_anchor2_corrected_v2.csv')
 
 # Show sample of new records
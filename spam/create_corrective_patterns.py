@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
-import numpy as np
+
+from shared_store import read_signals, write_signals
 
 # Load training data
-training_df = pd.read_csv("spam_detector_training_data.csv")
+training_df = read_signals("spam_detector_training_data.csv")
 
 print("CREATING CORRECTIVE PATTERNS FOR MISCLASSIFICATIONS")
 print("=" * 80)
@@ -103,11 +103,13 @@ print(corrected_training['Binary_Label'].value_counts())
 
 # Save corrected data
 corrected_training.to_csv("spam_detector_training_data_misclassification_fix.csv", index=False)
+write_signals(corrected_training, "spam_detector_training_data_misclassification_fix.csv")
 print(f"\nSaved corrected training data to: spam_detector_training_data_misclassification_fix.csv")
 
 # Save 15-signal subset  
 corrected_subset = corrected_training[training_signals + ['Binary_Label']]
 corrected_subset.to_csv("training_subset_15_signals_misclassification_fix.csv", index=False)
+write_signals(corrected_subset, "training_subset_15_signals_misclassification_fix.csv")
 print("Saved corrected 15-signal subset to: training_subset_15_signals_misclassification_fix.csv")
 
 print(f"\n\nCORRECTION IMPACT:")
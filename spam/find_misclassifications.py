@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import pandas as pd
 
+from shared_store import read_signals
+
 # Load the training subset with 15 signals
-training_df = pd.read_csv("training_subset_15_signals.csv")
+training_df = read_signals("training_subset_15_signals.csv")
 
 print("FINDING POTENTIAL MISCLASSIFICATIONS IN TRAINING DATA")
 print("=" * 80)
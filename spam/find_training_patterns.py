@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 import pandas as pd
 
+from shared_store import read_signals
+
 # Load training data
-training_df = pd.read_csv("spam_detector_training_data.csv")
+training_df = read_signals("spam_detector_training_data.csv")
 
 print("FINDING SIMILAR PATTERNS IN TRAINING DATA")
 print("=" * 80)
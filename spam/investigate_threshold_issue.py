@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
-import pandas as pd
+
+from shared_store import read_signals
 
 # Read the testing file
-df = pd.read_csv("final_spam_with_class.csv")
+df = read_signals("final_spam_with_class.csv")
 
 print("INVESTIGATING THE REAL THRESHOLD ISSUE")
 print("=" * 80)
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Shared Signal Store Access
+The typed signal store and the dataset helpers live in malicious/data. This
+module is the one place the spam and warning scripts put that directory on
+the import path (warning/shared_store.py is a symlink to this file); they
+import from here instead.
+"""
+
+import os
+import sys
+
+__all__ = ["read_signals", "write_signals", "select_rate"]
+
+# realpath: resolved from this file, also when imported through the symlink
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), "malicious", "data")
+if DATA_DIR not in sys.path:
+    sys.path.insert(0, DATA_DIR)
+
+from signal_store import read_signals, write_signals  # noqa: E402
+from stable_selection import select_rate  # noqa: E402
@@ -9,6 +9,9 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import warnings
+
+from shared_store import read_signals
+
 warnings.filterwarnings('ignore')
 
 print("="*80)
@@ -16,7 +19,7 @@ print("BRUTALLY HONEST ML MODEL ANALYSIS - MALWARE DETECTION")
 print("="*80)
 
 # Load data
-df = pd.read_csv('data.csv')
+df = read_signals('data.csv')
 print(f"\n📊 Dataset Shape: {df.shape}")
 print(f"   - Total samples: {len(df)}")
 print(f"   - Features: {df.shape[1] - 1}")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Compiled NumPy Scorer
+Batch scoring for the exported detector models (model_artifact.py) without
+going through sklearn's per-call validation and generic tree walking. The
+model is compiled once into flat arrays laid out for vectorized scoring:
+
+  linear     the StandardScaler is folded into the weights, so a batch is
+             one matrix-vector product (X @ w + b), plus a sigmoid for
+             logistic regression
+  trees      split thresholds are moved into unscaled input space (exactly:
+             x <= t' wherever sklearn's float32((x - mean) / scale) <= t),
+             so rows are compared as they come. Then either
+               tables: the ensemble's distinct (feature, threshold) splits
+                 are evaluated once per row; each tree reads its own split
+                 bits as a small integer (one float32 matrix product over
+                 all trees) and looks up the leaf value in a table made by
+                 walking the tree for every combination of its bits. Used
+                 when every tree has at most MAX_CODE_BITS distinct splits
+                 and the tables stay under MAX_TABLE_ENTRIES, which covers
+                 the depth-limited forests and boosting models
+                 train_robust_model.py trains on these mostly binary and
+                 small-count signals (few distinct thresholds).
+               levels: otherwise, a block of rows walks all trees together,
+                 one level per step (level-synchronous): gather each (row,
+                 tree)'s split, compare, follow the child index.
+  svm        the kernel is the work; scored by the artifact in row blocks
+
+Results match sklearn up to float rounding (the linear fold and the order
+of the tree sums change the last bits).
+
+    python compiled_scorer.py [best_model] [data.csv] [rows]
+    python compiled_scorer.py --check [data.csv] [rows]
+"""
+
+import sys
+import time
+from typing import Union
+
+import numpy as np
+
+from model_artifact import ModelArtifact, _expit, _libsvm_proba, load_artifact
+
+MAX_CODE_BITS = 16          # tables hold 2 ** bits leaf values per tree
+MAX_TABLE_ENTRIES = 1 << 21
+BLOCK_ROWS = 1024
+SVM_BLOCK_ROWS = 4096
+
+def _input_thresholds(feature: np.ndarray, threshold: np.ndarray, mean: np.ndarray,
+                      scale: np.ndarray) -> np.ndarray:
+    """Largest float64 x with float32((x - mean) / scale) <= threshold, per split.
+
+    The scaled, float32-rounded value is monotone in x, so this is exact:
+    x <= result  <=>  sklearn sends x left. Found by bisection around the
+    analytic threshold * scale + mean.
+    """
+    m, s = mean[feature], scale[feature]
+    t32 = threshold.astype(np.float32)
+    t32 = np.where(t32.astype(np.float64) > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+    goes_left = lambda x: ((x - m) / s).astype(np.float32) <= t32
+    center = t32.astype(np.float64) * s + m
+    width = (np.abs(center) + s) * 2.0 ** -16
+    while True:
+        lo, hi = center - width, center + width
+        bad = ~goes_left(lo) | goes_left(hi)
+        if not bad.any():
+            break
+        width = np.where(bad, width * 2.0 ** 8, width)
+    while True:
+        mid = lo + (hi - lo) / 2
+        done = (mid == lo) | (mid == hi)
+        if done.all():
+            return lo
+        left = goes_left(mid)
+        lo, hi = np.where(left, mid, lo), np.where(left, hi, mid)
+
+class CompiledScorer:
+    """Vectorized scorer for a ModelArtifact; same scoring methods, much faster batches."""
+
+    def __init__(self, artifact: ModelArtifact, block_rows: int = BLOCK_ROWS):
+        self.artifact = artifact
+        self.model_type = artifact.model_type
+        self.params = artifact.params
+        self.classes = artifact.classes
+        self.feature_names = artifact.feature_names
+        self.has_proba = artifact.has_proba
+        self.block_rows = block_rows
+        self.strategy = self.model_type
+        n_features = len(self.feature_names)
+        a = artifact.arrays
+        if artifact.manifest["scaler"]:
+            self.mean, self.scale = np.asarray(a["scaler_mean"]), np.asarray(a["scaler_scale"])
+        else:
+            self.mean, self.scale = np.zeros(n_features), np.ones(n_features)
+
+        if self.model_type == "linear":
+            # (x - mean) / scale @ coef + b  ==  x @ (coef / scale) + (b - mean @ (coef / scale))
+            self.weights = np.asarray(a["coef"]) / self.scale
+            self.bias = float(a["intercept"][0] - self.mean @ self.weights)
+        elif self.model_type in ("forest", "boosting"):
+            self._compile_trees(a)
+
+    def _compile_trees(self, a):
+        feature, threshold = np.asarray(a["feature"]), np.asarray(a["threshold"])
+        left, right, value = np.asarray(a["left"]), np.asarray(a["right"]), np.asarray(a["value"])
+        roots = np.asarray(a["roots"])
+        self.depth = int(self.params["max_depth"])
+        self.n_trees = len(roots)
+        split = feature >= 0
+        node_feature = np.where(split, feature, 0)
+        node_threshold = np.full(len(feature), np.inf)
+        if split.any():
+            node_threshold[split] = _input_thresholds(feature[split], threshold[split], self.mean, self.scale)
+
+        # Distinct splits of the whole ensemble, and which ones each tree uses
+        keys = np.stack([node_feature, node_threshold], axis=1)[split]
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        predicate = np.zeros(len(feature), dtype=np.int64)
+        predicate[split] = inverse.ravel()
+        ends = np.append(roots[1:], len(feature))
+        used = [np.unique(predicate[start:end][split[start:end]]) for start, end in zip(roots, ends)]
+
+        bits = [len(splits) for splits in used]
+        if max(bits, default=0) <= MAX_CODE_BITS and sum(2 ** k for k in bits) <= MAX_TABLE_ENTRIES:
+            self.strategy = "tables"
+            self.split_feature = unique[:, 0].astype(np.intp)
+            self.split_threshold = unique[:, 1]
+            # code of tree t = sum of 2^j over its j-th split that sends the row left
+            self.code_weights = np.zeros((len(unique), self.n_trees), dtype=np.float32)
+            tables, offsets, size = [], [], 0
+            bit_of = np.zeros(len(unique), dtype=np.int64)
+            for tree, (root, splits) in enumerate(zip(roots, used)):
+                self.code_weights[splits, tree] = 2.0 ** np.arange(len(splits))
+                bit_of[splits] = np.arange(len(splits))
+                codes = np.arange(2 ** len(splits))
+                node = np.full(len(codes), root)
+                for _ in range(self.depth):          # leaves point to themselves
+                    go_left = (codes >> bit_of[predicate[node]]) & 1
+                    node = np.where(go_left == 1, left[node], right[node])
+                offsets.append(size)
+                tables.append(value[node])
+                size += len(codes)
+            self.table = np.concatenate(tables)
+            self.table_offset = np.array(offsets, dtype=np.int32)
+        else:
+            self.strategy = "levels"
+            self.node_feature = node_feature.astype(np.int32)
+            self.node_threshold = node_threshold
+            # children[2i] = left, children[2i + 1] = right
+            self.children = np.stack([left, right], axis=1).astype(np.int32).ravel()
+            self.leaf_value = value
+            self.roots = roots.astype(np.int32)[None, :]
+
+    def prepare(self, X) -> np.ndarray:
+        """X as a float64 matrix in the model's feature order (unscaled)."""
+        if hasattr(X, "columns"):
+            missing = [c for c in self.feature_names if c not in X.columns]
+            if missing:
+                raise KeyError(f"missing features {missing}")
+            X = X[self.feature_names].to_numpy(dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"expected {len(self.feature_names)} features, got shape {X.shape}")
+        return X
+
+    def _tree_sum(self, X: np.ndarray) -> np.ndarray:
+        """Sum over all trees of each row's leaf value, block by block."""
+        total = np.empty(len(X))
+        for start in range(0, len(X), self.block_rows):
+            block = X[start:start + self.block_rows]
+            if self.strategy == "tables":
+                bits = (block[:, self.split_feature] <= self.split_threshold).astype(np.float32)
+                codes = (bits @ self.code_weights).astype(np.int32)
+                codes += self.table_offset
+                values = self.table[codes]
+            else:
+                rows, n_features = block.shape
+                flat = np.ascontiguousarray(block).ravel()
+                row_base = (np.arange(rows, dtype=np.int32) * n_features)[:, None]
+                node = np.repeat(self.roots, rows, axis=0)
+                for _ in range(self.depth):
+                    x = flat[self.node_feature[node] + row_base]
+                    node = self.children[2 * node + 1 - (x <= self.node_threshold[node])]
+                values = self.leaf_value[node]
+            total[start:start + len(block)] = values.sum(axis=1)
+        return total
+
+    def _raw(self, X: np.ndarray) -> np.ndarray:
+        if self.model_type == "linear":
+            return X @ self.weights + self.bias
+        if self.model_type == "forest":
+            return self._tree_sum(X) / self.n_trees
+        if self.model_type == "boosting":
+            return self.params["init"] + self.params["learning_rate"] * self._tree_sum(X)
+        return np.concatenate([self.artifact._raw(self.artifact.prepare(X[start:start + SVM_BLOCK_ROWS]))
+                               for start in range(0, len(X), SVM_BLOCK_ROWS)] or [np.empty(0)])
+
+    def decision_function(self, X) -> np.ndarray:
+        raw = self._raw(self.prepare(X))
+        return raw - 0.5 if self.model_type == "forest" else raw
+
+    def predict_proba(self, X) -> np.ndarray:
+        if not self.has_proba:
+            raise AttributeError(f"{self.artifact.manifest['estimator']} has no predict_proba")
+        raw = self._raw(self.prepare(X))
+        if self.model_type == "forest":
+            p = raw
+        elif self.model_type == "svm":
+            a = self.artifact.arrays
+            p = _libsvm_proba(raw, a["prob_a"][0], a["prob_b"][0])
+        else:
+            p = _expit(raw)
+        return np.column_stack([1 - p, p])
+
+    def scores(self, X) -> np.ndarray:
+        """Positive-class probability if the model has one, else the decision value (model_zoo.scores)."""
+        return self.predict_proba(X)[:, 1] if self.has_proba else self.decision_function(X)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[(self.decision_function(X) > 0).astype(int)]
+
+def compile_scorer(source: Union[str, ModelArtifact], block_rows: int = BLOCK_ROWS) -> CompiledScorer:
+    """Compile an artifact (or the stem of one on disk)."""
+    artifact = load_artifact(source) if isinstance(source, str) else source
+    return CompiledScorer(artifact, block_rows)
+
+def _throughput(function, X, repeat: int = 3) -> float:
+    """Best rows per second over a few runs."""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(X)
+        best = min(best, time.perf_counter() - start)
+    return len(X) / best
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.filterwarnings('ignore')
+    from shared_store import read_signals
+
+    args = sys.argv[1:]
+    check = "--check" in args
+    args = [a for a in args if a != "--check"]
+    if not check:
+        stem = args.pop(0) if args else "best_model"
+    data_path = args[0] if args else "data.csv"
+    n_rows = int(args[1]) if len(args) > 1 else 1_000_000
+
+    df = read_signals(data_path).drop_duplicates()
+    X = df.drop(["Binary_Label"], axis=1)
+    y = df["Binary_Label"].map({"Malicious": 1, "Not-Malicious": 0}).to_numpy()
+    # Benchmark batch: the data tiled to n_rows, already in feature order
+    tiled = np.resize(X.to_numpy(dtype=np.float64), (n_rows, X.shape[1]))
+
+    if not check:
+        artifact = load_artifact(stem)
+        start = time.perf_counter()
+        scorer = compile_scorer(artifact)
+        print(f"{stem}: {artifact.manifest['estimator']} compiled ({scorer.strategy}) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        ok = (np.array_equal(scorer.predict(X), artifact.predict(X))
+              and np.allclose(scorer.scores(X), artifact.scores(X), rtol=0, atol=1e-9))
+        print(f"  {'✅' if ok else '❌'} matches the artifact's reference scorer on {len(X):,} rows")
+        print(f"  reference: {_throughput(artifact.scores, tiled[:100_000], 1):>13,.0f} rows/s")
+        print(f"  compiled:  {_throughput(scorer.scores, tiled):>13,.0f} rows/s ({n_rows:,} rows)")
+        sys.exit(0)
+
+    # --check: every model type train_robust_model.py trains, against sklearn
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, RidgeClassifier
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.svm import SVC
+
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    models = {
+        "Logistic Regression (L2)": LogisticRegression(penalty='l2', C=0.1, max_iter=1000, random_state=42),
+        "Ridge Classifier": RidgeClassifier(alpha=10.0, random_state=42),
+        "Random Forest": RandomForestClassifier(n_estimators=100, max_depth=5, min_samples_split=50,
+                                                min_samples_leaf=20, max_features='sqrt', random_state=42),
+        "Random Forest (unlimited depth)": RandomForestClassifier(n_estimators=30, random_state=42),
+        "Gradient Boosting": GradientBoostingClassifier(n_estimators=50, learning_rate=0.05, max_depth=3,
+                                                        subsample=0.8, max_features='sqrt', random_state=42),
+        "SVM (RBF)": SVC(kernel='rbf', C=0.1, probability=True, random_state=42),
+    }
+    print(f"{'Model':<32} {'strategy':<8} {'match':>5} {'sklearn rows/s':>15} {'compiled rows/s':>16}")
+    for name, model in models.items():
+        model.fit(X_scaled, y)
+        scorer = CompiledScorer(ModelArtifact.from_model(model, scaler, list(X.columns)))
+        expected = model.predict_proba(X_scaled)[:, 1] if scorer.has_proba else model.decision_function(X_scaled)
+        ok = (np.array_equal(scorer.predict(X), model.predict(X_scaled))
+              and np.allclose(scorer.scores(X), expected, rtol=0, atol=1e-9))
+        if scorer.has_proba:
+            baseline = lambda batch: model.predict_proba(scaler.transform(batch))[:, 1]
+        else:
+            baseline = lambda batch: model.decision_function(scaler.transform(batch))
+        batch = tiled[:10_000] if scorer.strategy == "svm" else tiled
+        print(f"{name:<32} {scorer.strategy:<8} {'✅' if ok else '❌':>5} "
+              f"{_throughput(baseline, batch[:100_000], 1):>15,.0f} {_throughput(scorer.scores, batch):>16,.0f}")
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Gaussian Copula Record Model
+Fits a per-class generative model to a training CSV and samples synthetic
+rows that keep the cross-signal correlations of the data.
+
+Every column gets its own empirical marginal: discrete columns (bools,
+counts, strings, floats with few distinct values) keep their category
+frequencies, continuous columns their quantile function, and NULLs are a
+category / a probability mass at the bottom of the distribution. Rows are
+mapped to normal scores through those marginals, the correlation of the
+normal scores is the copula, and sampling runs the other way: correlated
+normals -> per-column inverse CDF. The inverse CDFs are precomputed in
+normal-score space (category thresholds, and for continuous columns a
+quantile table on an even z grid), so sampling costs a float32 matrix
+product plus one threshold search or table lookup per column, with no
+normal CDF evaluations. String columns come back as Categoricals.
+
+On one core the float32 normal draws alone take about a third of the time;
+wide tables (70 columns) sample at roughly half a million rows/s, narrow
+ones proportionally faster.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+from scipy.stats import rankdata
+
+# Float columns with at most this many distinct values are modelled as discrete
+MAX_DISCRETE_LEVELS = 20
+
+# Rows sampled per block, bounds the size of the normal-score matrix
+SAMPLE_BLOCK_ROWS = 250_000
+
+# Continuous inverse CDFs are tabulated at this many points on [-TABLE_Z, TABLE_Z]
+TABLE_POINTS = 4096
+TABLE_Z = 6.0
+
+_EPS = 1e-9
+
+class DiscreteMarginal:
+    """Empirical category frequencies (NaN counts as a category).
+
+    Categories are kept in sorted order so that counts and flags stay
+    ordinal in the latent normal space.
+    """
+
+    def __init__(self, series: pd.Series):
+        codes, self.values = pd.factorize(series, sort=True, use_na_sentinel=False)
+        self.probs = np.bincount(codes, minlength=len(self.values)) / len(codes)
+        self.cdf = np.cumsum(self.probs)
+        self.cdf[-1] = 1.0
+        # Normal scores where the category changes
+        self.thresholds = ndtri(np.clip(self.cdf[:-1], _EPS, 1 - _EPS)).astype(np.float32)
+        present = self.values.notna()
+        self.categories = None
+        if not pd.api.types.is_numeric_dtype(pd.Series(self.values[present]).infer_objects()):
+            # Strings: decoded as a Categorical, NaN as code -1
+            self.categories = self.values[present]
+            self.category_codes = np.where(present, np.cumsum(present) - 1, -1)
+
+    def to_uniform(self, series: pd.Series, rng: np.random.Generator) -> np.ndarray:
+        """Randomized probability integral transform of the column."""
+        codes = self.values.get_indexer(series)
+        low = self.cdf[codes] - self.probs[codes]
+        return low + rng.random(len(codes)) * self.probs[codes]
+
+    def from_normal(self, z: np.ndarray) -> np.ndarray:
+        """Category indices (into self.values) for normal scores z."""
+        if len(self.thresholds) == 1:
+            # Two categories (flags): one comparison instead of a search
+            return (z >= self.thresholds[0]).view(np.uint8)
+        return np.searchsorted(self.thresholds, z, side="right")
+
+class ContinuousMarginal:
+    """Empirical quantile function plus a NULL rate."""
+
+    def __init__(self, series: pd.Series):
+        present = series.dropna().to_numpy(dtype=float)
+        self.null_rate = 1 - len(present) / len(series)
+        self.quantiles = np.sort(present)
+        grid = np.linspace(-TABLE_Z, TABLE_Z, TABLE_POINTS)
+        self.table = self._quantile(np.maximum(ndtr(grid), self.null_rate))
+        self.slopes = np.append(np.diff(self.table), 0.0)
+        self.null_z = np.float32(ndtri(self.null_rate)) if self.null_rate > 0 else None
+
+    def to_uniform(self, series: pd.Series, rng: np.random.Generator) -> np.ndarray:
+        values = series.to_numpy(dtype=float)
+        nulls = np.isnan(values)
+        u = np.empty(len(values))
+        u[nulls] = rng.random(int(nulls.sum())) * self.null_rate
+        ranks = rankdata(values[~nulls])
+        u[~nulls] = self.null_rate + (1 - self.null_rate) * (ranks - 0.5) / len(ranks)
+        return u
+
+    def _quantile(self, u: np.ndarray) -> np.ndarray:
+        # Linear interpolation between the order statistics, which sit at
+        # (i + 0.5) / m on an even grid, so no search is needed
+        m = len(self.quantiles)
+        if m == 0:
+            return np.full(len(u), np.nan)
+        position = np.clip((u - self.null_rate) / max(1 - self.null_rate, _EPS) * m - 0.5, 0, m - 1)
+        index = np.minimum(position.astype(np.intp), m - 2) if m > 1 else np.zeros(len(u), dtype=np.intp)
+        upper = np.minimum(index + 1, m - 1)
+        return self.quantiles[index] + (position - index) * (self.quantiles[upper] - self.quantiles[index])
+
+    def from_normal(self, z: np.ndarray) -> np.ndarray:
+        """Column values for normal scores z: linear interpolation in the z-grid table."""
+        position = (z + np.float32(TABLE_Z)) * np.float32((TABLE_POINTS - 1) / (2 * TABLE_Z))
+        np.clip(position, 0, TABLE_POINTS - 1, out=position)
+        index = position.astype(np.intp)
+        values = self.table[index] + (position - index) * self.slopes[index]
+        if self.null_z is not None:
+            values[z < self.null_z] = np.nan
+        return values
+
+def make_marginal(series: pd.Series):
+    if pd.api.types.is_float_dtype(series) and series.nunique() > MAX_DISCRETE_LEVELS:
+        return ContinuousMarginal(series)
+    return DiscreteMarginal(series)
+
+def nearest_correlation(corr: np.ndarray, floor: float = 1e-6) -> np.ndarray:
+    """Clip eigenvalues so the matrix is positive definite, keeping a unit diagonal."""
+    eigenvalues, eigenvectors = np.linalg.eigh(corr)
+    fixed = eigenvectors @ np.diag(np.maximum(eigenvalues, floor)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(fixed))
+    return fixed / np.outer(scale, scale)
+
+class GaussianCopula:
+    """Gaussian copula with empirical marginals for one table."""
+
+    def fit(self, df: pd.DataFrame, seed: int = 0) -> "GaussianCopula":
+        rng = np.random.default_rng(seed)
+        self.columns: List[str] = list(df.columns)
+        self.marginals = [make_marginal(df[col]) for col in self.columns]
+        u = np.column_stack([m.to_uniform(df[col], rng) for col, m in zip(self.columns, self.marginals)])
+        z = ndtri(np.clip(u, _EPS, 1 - _EPS))
+        corr = np.corrcoef(z, rowvar=False) if len(df) > 1 else np.eye(len(self.columns))
+        self.correlation = nearest_correlation(np.nan_to_num(corr))
+        # Columns with a single value need no normal scores; the scores of the
+        # others are normal with the sub-matrix of the correlation
+        self.varying = [j for j, m in enumerate(self.marginals)
+                        if not (isinstance(m, DiscreteMarginal) and len(m.values) == 1)]
+        self.cholesky = np.linalg.cholesky(self.correlation[np.ix_(self.varying, self.varying)]).astype(np.float32)
+        return self
+
+    def sample_into(self, outputs: List["ColumnOutput"], k: int, n: int,
+                    rows: Optional[np.ndarray], rng: np.random.Generator):
+        """Sample n rows into the output columns (as model k), at rows or, if None, at 0..n-1."""
+        for start in range(0, n, SAMPLE_BLOCK_ROWS):
+            size = min(SAMPLE_BLOCK_ROWS, n - start)
+            block = slice(start, start + size) if rows is None else rows[start:start + size]
+            # (columns, rows): each column's normal scores are contiguous
+            z = self.cholesky @ rng.standard_normal((len(self.varying), size), dtype=np.float32)
+            scores = dict(zip(self.varying, z))
+            for j, (output, marginal) in enumerate(zip(outputs, self.marginals)):
+                raw = marginal.from_normal(scores[j]) if j in scores else np.zeros(size, dtype=np.uint8)
+                output.write(k, block, raw)
+
+    def sample(self, n: int, rng: np.random.Generator) -> pd.DataFrame:
+        """n synthetic rows with the fitted marginals and correlations."""
+        outputs = [ColumnOutput([marginal], n) for marginal in self.marginals]
+        self.sample_into(outputs, 0, n, None, rng)
+        return pd.DataFrame({col: output.result() for col, output in zip(self.columns, outputs)},
+                            columns=self.columns)
+
+class ColumnOutput:
+    """One preallocated output column that each model's samples are written into.
+
+    Discrete draws are category indices and go through a per-model lookup
+    to the output value, or for string columns to a code into the sorted
+    union of every model's categories (the column comes back Categorical).
+    """
+
+    def __init__(self, marginals: List, n: int):
+        discrete = [m for m in marginals if isinstance(m, DiscreteMarginal)]
+        strings = [m.categories for m in discrete if m.categories is not None]
+        self.categories = None
+        if strings and len(discrete) == len(marginals) and all(
+                m.categories is not None or m.values.isna().all() for m in discrete):
+            self.categories = pd.Index(sorted(set().union(*strings)))
+            dtype = np.int16 if len(self.categories) < 2**15 else np.int32
+            self.lookups = []
+            for m in discrete:
+                lookup = np.full(len(m.values), -1, dtype=dtype)
+                if m.categories is not None:
+                    present = m.category_codes >= 0
+                    lookup[present] = self.categories.get_indexer(m.categories)[m.category_codes[present]]
+                self.lookups.append(lookup)
+        else:
+            kinds = {m.values.to_numpy().dtype if isinstance(m, DiscreteMarginal) else np.dtype(float)
+                     for m in marginals}
+            dtype = kinds.pop() if len(kinds) == 1 else np.dtype(object)
+            self.lookups = [m.values.to_numpy().astype(dtype) if isinstance(m, DiscreteMarginal) else None
+                            for m in marginals]
+        # [False, True] flags: the 0/1 indices already are the values
+        self.identity = [lookup is not None and lookup.dtype == bool and lookup.tolist() == [False, True]
+                         for lookup in self.lookups]
+        self.data = np.empty(n, dtype=dtype)
+
+    def write(self, k: int, rows, raw: np.ndarray):
+        """Write model k's raw draws (category indices or values) at rows."""
+        if self.identity[k] and raw.dtype == np.uint8:
+            raw = raw.view(bool)
+        elif self.lookups[k] is not None:
+            raw = self.lookups[k][raw]
+        self.data[rows] = raw
+
+    def result(self):
+        if self.categories is not None:
+            return pd.Categorical.from_codes(self.data, categories=self.categories)
+        return self.data
+
+class ClassConditionalCopula:
+    """One GaussianCopula per value of the label column."""
+
+    def __init__(self, label_column: str = "Binary_Label"):
+        self.label_column = label_column
+
+    def fit(self, df: pd.DataFrame, seed: int = 0) -> "ClassConditionalCopula":
+        labels = df[self.label_column]
+        self.class_rates = labels.value_counts(normalize=True).to_dict()
+        features = df.drop(columns=[self.label_column])
+        self.columns = list(df.columns)
+        self.models: Dict[str, GaussianCopula] = {
+            label: GaussianCopula().fit(features[labels == label], seed)
+            for label in self.class_rates
+        }
+        return self
+
+    def sample(self, n: int, rng: np.random.Generator, label: Optional[str] = None) -> pd.DataFrame:
+        """n rows of one class, or of all classes at their training rates (shuffled)."""
+        labels = list(self.class_rates) if label is None else [label]
+        # The class of every row, already in random order: each class's rows
+        # are sampled together and placed at its positions
+        drawn = (rng.choice(len(labels), size=n, p=[self.class_rates[l] for l in labels])
+                 if label is None else np.zeros(n, dtype=np.intp))
+        features = [col for col in self.columns if col != self.label_column]
+        models = [self.models[class_label] for class_label in labels]
+        outputs = [ColumnOutput([model.marginals[j] for model in models], n) for j in range(len(features))]
+        for k, model in enumerate(models):
+            rows = np.flatnonzero(drawn == k) if len(models) > 1 else None
+            model.sample_into(outputs, k, n if rows is None else len(rows), rows, rng)
+        data = dict(zip(features, (output.result() for output in outputs)))
+        data[self.label_column] = pd.Categorical.from_codes(drawn, categories=labels)
+        return pd.DataFrame(data, columns=self.columns)
@@ -7,6 +7,8 @@ This script aligns training and test data formats to solve 0% test accuracy.
 import pandas as pd
 import numpy as np
 
+from shared_store import read_signals
+
 print("="*80)
 print("DATA ALIGNMENT FIX")
 print("="*80)
@@ -76,7 +78,7 @@ def standardize_request_type(df):
 # LOAD TRAINING DATA
 # =============================================================================
 print("\n📂 Loading training data...")
-train_df = pd.read_csv('warning_detector_training_data.csv')
+train_df = read_signals('warning_detector_training_data.csv')
 print(f"   Shape: {train_df.shape}")
 print(f"   Labels: {train_df['Binary_Label'].value_counts().to_dict()}")
 
@@ -84,7 +86,7 @@ print(f"   Labels: {train_df['Binary_Label'].value_counts().to_dict()}")
 # LOAD SAFE RECORDS (FIX LABEL!)
 # =============================================================================
 print("\n📂 Loading safe records...")
-safe_df = pd.read_csv('safe_records_500.csv')
+safe_df = read_signals('safe_records_500.csv')
 print(f"   Shape: {safe_df.shape}")
 print(f"   Labels BEFORE fix: {safe_df['Binary_Label'].value_counts().to_dict()}")
 
@@ -96,7 +98,7 @@ print(f"   Labels AFTER fix: {safe_df['Binary_Label'].value_counts().to_dict()}"
 # LOAD TEST DATA
 # =============================================================================
 print("\n📂 Loading test data...")
-test_df = pd.read_csv('malicious-200.csv')
+test_df = read_signals('malicious-200.csv')
 print(f"   Shape: {test_df.shape}")
 
 # =============================================================================
@@ -1,18 +1,25 @@
 #!/usr/bin/env python3
 """
-Generate 1000 Unique Not-Warning Records
+Generate Unique Not-Warning Records (default 1000, size from the command line)
 Based on patterns from warning_detector_training_data.csv
 """
 
-import csv
-import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from unique_rows import generate_unique, random_uniform, weighted_choice
+
+# Number of records (command line, default 1000)
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
 
 print("="*80)
-print("GENERATING 1000 UNIQUE NOT-WARNING RECORDS")
+print(f"GENERATING {N} UNIQUE NOT-WARNING RECORDS")
 print("="*80)
 
 # Set seed for reproducibility
-random.seed(123)
+rng = np.random.default_rng(123)
 
 # Column names from training data (71 columns)
 COLUMNS = [
@@ -40,204 +47,168 @@ COLUMNS = [
     'warning_risk', 'Binary_Label'
 ]
 
-def weighted_choice(options, weights):
-    """Choose from options based on weights"""
-    total = sum(weights)
-    r = random.uniform(0, total)
-    cumulative = 0
-    for option, weight in zip(options, weights):
-        cumulative += weight
-        if r <= cumulative:
-            return option
-    return options[-1]
-
-def generate_not_warning_record():
-    """Generate a single Not-Warning record matching training patterns"""
+def generate_not_warning_batch(n):
+    """Generate n Not-Warning records matching training patterns, one column per field"""
     record = {}
 
     # === SENDER FEATURES (LOW RISK for Not-Warning) ===
     # Not-Warning: sender_known_malicious is mostly False (~5%)
-    record['sender_known_malicious'] = weighted_choice([True, False], [0.05, 0.95])
+    record['sender_known_malicious'] = weighted_choice(rng, [True, False], [0.05, 0.95], n)
 
     # High reputation score for Not-Warning (0.7-1.0)
-    record['sender_domain_reputation_score'] = round(random.uniform(0.7, 1.0), 10)
+    record['sender_domain_reputation_score'] = random_uniform(rng, 0.7, 1.0, n)
 
     # sender_spoof_detected: mostly False for Not-Warning (~10%)
-    record['sender_spoof_detected'] = weighted_choice([True, False], [0.10, 0.90])
+    record['sender_spoof_detected'] = weighted_choice(rng, [True, False], [0.10, 0.90], n)
 
     # Low temp email likelihood (0.0-0.2)
-    record['sender_temp_email_likelihood'] = round(random.uniform(0.0, 0.2), 10)
+    record['sender_temp_email_likelihood'] = random_uniform(rng, 0.0, 0.2, n)
 
     # dmarc_enforced: mostly True for Not-Warning (~75%)
-    record['dmarc_enforced'] = weighted_choice([True, False], [0.75, 0.25])
+    record['dmarc_enforced'] = weighted_choice(rng, [True, False], [0.75, 0.25], n)
 
     # Low VIP similarity for Not-Warning (0.0-0.2)
-    record['sender_name_similarity_to_vip'] = round(random.uniform(0.0, 0.2), 10)
+    record['sender_name_similarity_to_vip'] = random_uniform(rng, 0.0, 0.2, n)
 
     # === SPF/DKIM/DMARC RESULTS (mostly pass for Not-Warning) ===
     record['spf_result'] = weighted_choice(
-        ['pass', 'fail', 'softfail', 'neutral', 'none', 'temperror', 'permerror'],
-        [0.70, 0.05, 0.05, 0.08, 0.05, 0.05, 0.02]
+        rng, ['pass', 'fail', 'softfail', 'neutral', 'none', 'temperror', 'permerror'],
+        [0.70, 0.05, 0.05, 0.08, 0.05, 0.05, 0.02], n
     )
     record['dkim_result'] = weighted_choice(
-        ['pass', 'fail', 'neutral', 'none', 'temperror', 'permerror'],
-        [0.70, 0.05, 0.10, 0.08, 0.05, 0.02]
+        rng, ['pass', 'fail', 'neutral', 'none', 'temperror', 'permerror'],
+        [0.70, 0.05, 0.10, 0.08, 0.05, 0.02], n
     )
     record['dmarc_result'] = weighted_choice(
-        ['pass', 'fail', 'none', 'neutral', 'temperror', 'permerror'],
-        [0.65, 0.05, 0.10, 0.10, 0.07, 0.03]
+        rng, ['pass', 'fail', 'none', 'neutral', 'temperror', 'permerror'],
+        [0.65, 0.05, 0.10, 0.10, 0.07, 0.03], n
     )
 
     # reverse_dns_valid: mostly True for Not-Warning (~85%)
-    record['reverse_dns_valid'] = weighted_choice([True, False], [0.85, 0.15])
+    record['reverse_dns_valid'] = weighted_choice(rng, [True, False], [0.85, 0.15], n)
 
     # === ATTACHMENT/FILE FEATURES (mostly clean for Not-Warning) ===
-    record['packer_detected'] = weighted_choice([True, False], [0.02, 0.98])
-    record['any_file_hash_malicious'] = weighted_choice([True, False], [0.01, 0.99])
-    record['max_metadata_suspicious_score'] = round(random.uniform(0.0, 0.15), 10)
-    record['malicious_attachment_count'] = weighted_choice([0, 1], [0.98, 0.02])
-    record['has_executable_attachment'] = weighted_choice([True, False], [0.02, 0.98])
-    record['unscannable_attachment_present'] = weighted_choice([True, False], [0.01, 0.99])
-    record['total_components_detected_malicious'] = weighted_choice([0, 1], [0.98, 0.02])
-    record['total_yara_match_count'] = weighted_choice([0, 1, 2], [0.95, 0.04, 0.01])
-    record['total_ioc_count'] = weighted_choice([0, 1, 2, 3], [0.90, 0.06, 0.03, 0.01])
+    record['packer_detected'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['any_file_hash_malicious'] = weighted_choice(rng, [True, False], [0.01, 0.99], n)
+    record['max_metadata_suspicious_score'] = random_uniform(rng, 0.0, 0.15, n)
+    record['malicious_attachment_count'] = weighted_choice(rng, [0, 1], [0.98, 0.02], n)
+    record['has_executable_attachment'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['unscannable_attachment_present'] = weighted_choice(rng, [True, False], [0.01, 0.99], n)
+    record['total_components_detected_malicious'] = weighted_choice(rng, [0, 1], [0.98, 0.02], n)
+    record['total_yara_match_count'] = weighted_choice(rng, [0, 1, 2], [0.95, 0.04, 0.01], n)
+    record['total_ioc_count'] = weighted_choice(rng, [0, 1, 2, 3], [0.90, 0.06, 0.03, 0.01], n)
 
     # === BEHAVIORAL FEATURES (low/zero for Not-Warning) ===
-    record['max_behavioral_sandbox_score'] = round(random.uniform(0.0, 0.1), 10)
-    record['max_amsi_suspicion_score'] = round(random.uniform(0.0, 0.05), 10)
-    record['any_macro_enabled_document'] = weighted_choice([True, False], [0.03, 0.97])
-    record['any_vbscript_javascript_detected'] = weighted_choice([True, False], [0.02, 0.98])
-    record['any_active_x_objects_detected'] = weighted_choice([True, False], [0.01, 0.99])
-    record['any_network_call_on_open'] = weighted_choice([True, False], [0.03, 0.97])
-    record['max_exfiltration_behavior_score'] = round(random.uniform(0.0, 0.05), 10)
-    record['any_exploit_pattern_detected'] = weighted_choice([True, False], [0.01, 0.99])
-    record['total_embedded_file_count'] = weighted_choice([0, 1, 2], [0.85, 0.12, 0.03])
-    record['max_suspicious_string_entropy_score'] = round(random.uniform(0.0, 0.15), 10)
-    record['max_sandbox_execution_time'] = round(random.uniform(0.0, 0.05), 10)
+    record['max_behavioral_sandbox_score'] = random_uniform(rng, 0.0, 0.1, n)
+    record['max_amsi_suspicion_score'] = random_uniform(rng, 0.0, 0.05, n)
+    record['any_macro_enabled_document'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['any_vbscript_javascript_detected'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['any_active_x_objects_detected'] = weighted_choice(rng, [True, False], [0.01, 0.99], n)
+    record['any_network_call_on_open'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['max_exfiltration_behavior_score'] = random_uniform(rng, 0.0, 0.05, n)
+    record['any_exploit_pattern_detected'] = weighted_choice(rng, [True, False], [0.01, 0.99], n)
+    record['total_embedded_file_count'] = weighted_choice(rng, [0, 1, 2], [0.85, 0.12, 0.03], n)
+    record['max_suspicious_string_entropy_score'] = random_uniform(rng, 0.0, 0.15, n)
+    record['max_sandbox_execution_time'] = random_uniform(rng, 0.0, 0.05, n)
     record['unique_parent_process_names'] = ''
 
     # === RETURN PATH FEATURES (clean for Not-Warning) ===
-    record['return_path_mismatch_with_from'] = weighted_choice([True, False], [0.15, 0.85])
-    record['return_path_known_malicious'] = weighted_choice([True, False], [0.02, 0.98])
-    record['return_path_reputation_score'] = round(random.uniform(0.7, 1.0), 10)
+    record['return_path_mismatch_with_from'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
+    record['return_path_known_malicious'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['return_path_reputation_score'] = random_uniform(rng, 0.7, 1.0, n)
 
     # === REPLY PATH FEATURES (clean for Not-Warning) ===
-    record['reply_path_known_malicious'] = weighted_choice([True, False], [0.02, 0.98])
-    record['reply_path_diff_from_sender'] = weighted_choice([True, False], [0.20, 0.80])
-    record['reply_path_reputation_score'] = round(random.uniform(0.7, 1.0), 10)
+    record['reply_path_known_malicious'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['reply_path_diff_from_sender'] = weighted_choice(rng, [True, False], [0.20, 0.80], n)
+    record['reply_path_reputation_score'] = random_uniform(rng, 0.7, 1.0, n)
 
     # === SMTP FEATURES (clean for Not-Warning) ===
-    record['smtp_ip_known_malicious'] = weighted_choice([True, False], [0.02, 0.98])
-    record['smtp_ip_geo'] = round(random.uniform(0.0, 0.2), 10)
-    record['smtp_ip_asn'] = round(random.uniform(0.0, 0.15), 10)
-    record['smtp_ip_reputation_score'] = round(random.uniform(0.7, 1.0), 10)
+    record['smtp_ip_known_malicious'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
+    record['smtp_ip_geo'] = random_uniform(rng, 0.0, 0.2, n)
+    record['smtp_ip_asn'] = random_uniform(rng, 0.0, 0.15, n)
+    record['smtp_ip_reputation_score'] = random_uniform(rng, 0.7, 1.0, n)
 
     # === DOMAIN/URL FEATURES (clean for Not-Warning) ===
-    record['domain_known_malicious'] = weighted_choice([True, False], [0.03, 0.97])
-    record['url_count'] = weighted_choice(list(range(0, 15)), [0.05, 0.15, 0.20, 0.18, 0.12, 0.10, 0.07, 0.05, 0.03, 0.02, 0.01, 0.01, 0.005, 0.003, 0.002])
-    record['dns_morphing_detected'] = weighted_choice([True, False], [0.03, 0.97])
-    record['domain_tech_stack_match_score'] = round(random.uniform(0.7, 1.0), 10)
-    record['url_decoded_spoof_detected'] = weighted_choice([True, False], [0.05, 0.95])
-    record['url_reputation_score'] = round(random.uniform(0.7, 1.0), 10)
+    record['domain_known_malicious'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['url_count'] = weighted_choice(rng, list(range(0, 15)), [0.05, 0.15, 0.20, 0.18, 0.12, 0.10, 0.07, 0.05, 0.03, 0.02, 0.01, 0.01, 0.005, 0.003, 0.002], n)
+    record['dns_morphing_detected'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['domain_tech_stack_match_score'] = random_uniform(rng, 0.7, 1.0, n)
+    record['url_decoded_spoof_detected'] = weighted_choice(rng, [True, False], [0.05, 0.95], n)
+    record['url_reputation_score'] = random_uniform(rng, 0.7, 1.0, n)
     record['ssl_validity_status'] = weighted_choice(
-        ['valid', 'invalid', 'expired', 'self_signed', 'no_ssl'],
-        [0.80, 0.03, 0.02, 0.05, 0.10]
+        rng, ['valid', 'invalid', 'expired', 'self_signed', 'no_ssl'],
+        [0.80, 0.03, 0.02, 0.05, 0.10], n
     )
 
     # KEY NOT-WARNING INDICATORS (low values)
-    record['site_visual_similarity_to_known_brand'] = round(random.uniform(0.0, 0.2), 10)
-    record['url_rendering_behavior_score'] = round(random.uniform(0.0, 0.2), 10)
-    record['link_rewritten_through_redirector'] = weighted_choice([True, False], [0.40, 0.60])
-    record['token_validation_success'] = weighted_choice([True, False], [0.85, 0.15])
+    record['site_visual_similarity_to_known_brand'] = random_uniform(rng, 0.0, 0.2, n)
+    record['url_rendering_behavior_score'] = random_uniform(rng, 0.0, 0.2, n)
+    record['link_rewritten_through_redirector'] = weighted_choice(rng, [True, False], [0.40, 0.60], n)
+    record['token_validation_success'] = weighted_choice(rng, [True, False], [0.85, 0.15], n)
 
     # === LOW RISK INDICATORS (KEY FOR NOT-WARNING) ===
     # is_high_risk_role_targeted: mostly False for Not-Warning (~10%)
-    record['is_high_risk_role_targeted'] = weighted_choice([True, False], [0.10, 0.90])
+    record['is_high_risk_role_targeted'] = weighted_choice(rng, [True, False], [0.10, 0.90], n)
 
     # urgency_keywords_present: mostly False for Not-Warning (~15%)
-    record['urgency_keywords_present'] = weighted_choice([True, False], [0.15, 0.85])
+    record['urgency_keywords_present'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
 
     # request_type - mostly benign types for Not-Warning
     record['request_type'] = weighted_choice(
-        ['link_click', 'none', 'document_download', 'meeting_request',
+        rng, ['link_click', 'none', 'document_download', 'meeting_request',
          'credential_request', 'sensitive_data_request', 'invoice_payment',
          'invoice_verification', 'wire_transfer', 'bank_detail_update'],
-        [0.35, 0.25, 0.12, 0.10, 0.05, 0.04, 0.04, 0.02, 0.02, 0.01]
+        [0.35, 0.25, 0.12, 0.10, 0.05, 0.04, 0.04, 0.02, 0.02, 0.01], n
     )
 
     # === CONTENT FEATURES (clean for Not-Warning) ===
-    record['content_spam_score'] = round(random.uniform(0.0, 0.25), 10)
-    record['user_marked_as_spam_before'] = weighted_choice([True, False], [0.03, 0.97])
-    record['bulk_message_indicator'] = weighted_choice([True, False], [0.15, 0.85])
-    record['unsubscribe_link_present'] = weighted_choice([True, False], [0.20, 0.80])
-    record['marketing_keywords_detected'] = round(random.uniform(0.0, 0.2), 10)
-    record['html_text_ratio'] = round(random.uniform(0.3, 0.8), 10)
-    record['image_only_email'] = weighted_choice([True, False], [0.02, 0.98])
+    record['content_spam_score'] = random_uniform(rng, 0.0, 0.25, n)
+    record['user_marked_as_spam_before'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['bulk_message_indicator'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
+    record['unsubscribe_link_present'] = weighted_choice(rng, [True, False], [0.20, 0.80], n)
+    record['marketing_keywords_detected'] = random_uniform(rng, 0.0, 0.2, n)
+    record['html_text_ratio'] = random_uniform(rng, 0.3, 0.8, n)
+    record['image_only_email'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
     record['total_links_detected'] = weighted_choice(
-        list(range(0, 20)),
-        [0.03, 0.08, 0.12, 0.15, 0.14, 0.12, 0.10, 0.08, 0.06, 0.04, 0.03, 0.02, 0.01, 0.008, 0.006, 0.004, 0.003, 0.002, 0.001, 0.001]
+        rng, list(range(0, 20)),
+        [0.03, 0.08, 0.12, 0.15, 0.14, 0.12, 0.10, 0.08, 0.06, 0.04, 0.03, 0.02, 0.01, 0.008, 0.006, 0.004, 0.003, 0.002, 0.001, 0.001], n
     )
 
     # === URL SHORTENER FEATURES (mostly clean) ===
-    record['url_shortener_detected'] = weighted_choice([True, False], [0.08, 0.92])
-    record['url_redirect_chain_length'] = weighted_choice([0, 1, 2], [0.85, 0.12, 0.03])
-    record['final_url_known_malicious'] = weighted_choice([True, False], [0.02, 0.98])
+    record['url_shortener_detected'] = weighted_choice(rng, [True, False], [0.08, 0.92], n)
+    record['url_redirect_chain_length'] = weighted_choice(rng, [0, 1, 2], [0.85, 0.12, 0.03], n)
+    record['final_url_known_malicious'] = weighted_choice(rng, [True, False], [0.02, 0.98], n)
 
     # === TLS/ENCRYPTION (modern for Not-Warning) ===
     record['tls_version'] = weighted_choice(
-        ['TLS 1.0', 'TLS 1.1', 'TLS 1.2', 'TLS 1.3', ''],
-        [0.02, 0.05, 0.40, 0.50, 0.03]
+        rng, ['TLS 1.0', 'TLS 1.1', 'TLS 1.2', 'TLS 1.3', ''],
+        [0.02, 0.05, 0.40, 0.50, 0.03], n
     )
 
     # === QR CODE ===
-    record['Analysis_of_the_qrcode_if_present'] = weighted_choice([0, 1], [0.98, 0.02])
+    record['Analysis_of_the_qrcode_if_present'] = weighted_choice(rng, [0, 1], [0.98, 0.02], n)
 
     # === CLASSIFICATION (Not-Warning) ===
     record['Final Classification'] = 'No Action'
-    record['warning_risk'] = round(random.uniform(0.0, 0.3), 10)
+    record['warning_risk'] = random_uniform(rng, 0.0, 0.3, n)
     record['Binary_Label'] = 'Not-Warning'
 
-    return record
-
-def record_to_tuple(record):
-    """Convert record dict to tuple for uniqueness check"""
-    return tuple(str(record[col]) for col in COLUMNS)
+    return pd.DataFrame(record, index=range(n), columns=COLUMNS)
 
 # Generate records
-print("\n🔧 Generating 1000 unique Not-Warning records...")
-
-N = 1000
-generated_records = []
-seen_records = set()
-
-attempts = 0
-max_attempts = 50000
-
-while len(generated_records) < N and attempts < max_attempts:
-    record = generate_not_warning_record()
-    record_tuple = record_to_tuple(record)
-
-    if record_tuple not in seen_records:
-        seen_records.add(record_tuple)
-        generated_records.append(record)
-
-    attempts += 1
+print(f"\n🔧 Generating {N} unique Not-Warning records...")
 
-    if len(generated_records) % 100 == 0 and len(generated_records) > 0:
-        print(f"   Generated {len(generated_records)} unique records...")
+generated, attempts = generate_unique(generate_not_warning_batch, N)
 
-print(f"\n   ✓ Generated {len(generated_records)} unique records in {attempts} attempts")
+print(f"\n   ✓ Generated {len(generated)} unique records in {attempts} attempts")
 
 # Write to CSV
-output_file = 'generated_not_warning_1000.csv'
+output_file = f'generated_not_warning_{N}.csv'
 print(f"\n💾 Saving to {output_file}...")
 
-with open(output_file, 'w', newline='') as f:
-    writer = csv.DictWriter(f, fieldnames=COLUMNS)
-    writer.writeheader()
-    writer.writerows(generated_records)
+generated.to_csv(output_file, index=False)
 
-print(f"   ✓ Saved {len(generated_records)} records")
+print(f"   ✓ Saved {len(generated)} records")
 
 # Summary
 print("\n" + "="*80)
@@ -245,11 +216,11 @@ print("SUMMARY")
 print("="*80)
 
 # Count key features
-high_risk_true = sum(1 for r in generated_records if r['is_high_risk_role_targeted'] == True)
-urgency_true = sum(1 for r in generated_records if r['urgency_keywords_present'] == True)
-spoof_true = sum(1 for r in generated_records if r['sender_spoof_detected'] == True)
-domain_mal_true = sum(1 for r in generated_records if r['domain_known_malicious'] == True)
-sender_mal_true = sum(1 for r in generated_records if r['sender_known_malicious'] == True)
+high_risk_true = int(generated['is_high_risk_role_targeted'].sum())
+urgency_true = int(generated['urgency_keywords_present'].sum())
+spoof_true = int(generated['sender_spoof_detected'].sum())
+domain_mal_true = int(generated['domain_known_malicious'].sum())
+sender_mal_true = int(generated['sender_known_malicious'].sum())
 
 print(f"\n📊 Key Feature Distribution (should be LOW for Not-Warning):")
 print(f"   is_high_risk_role_targeted = True: {high_risk_true} ({high_risk_true/N*100:.1f}%) [expected ~10%]")
@@ -259,9 +230,9 @@ print(f"   domain_known_malicious = True:     {domain_mal_true} ({domain_mal_tru
 print(f"   sender_known_malicious = True:     {sender_mal_true} ({sender_mal_true/N*100:.1f}%) [expected ~5%]")
 
 # SPF/DKIM/DMARC pass rates
-spf_pass = sum(1 for r in generated_records if r['spf_result'] == 'pass')
-dkim_pass = sum(1 for r in generated_records if r['dkim_result'] == 'pass')
-dmarc_pass = sum(1 for r in generated_records if r['dmarc_result'] == 'pass')
+spf_pass = int((generated['spf_result'] == 'pass').sum())
+dkim_pass = int((generated['dkim_result'] == 'pass').sum())
+dmarc_pass = int((generated['dmarc_result'] == 'pass').sum())
 
 print(f"\n📊 Authentication Pass Rates (should be HIGH for Not-Warning):")
 print(f"   SPF pass:   {spf_pass} ({spf_pass/N*100:.1f}%) [expected ~70%]")
@@ -269,19 +240,16 @@ print(f"   DKIM pass:  {dkim_pass} ({dkim_pass/N*100:.1f}%) [expected ~70%]")
 print(f"   DMARC pass: {dmarc_pass} ({dmarc_pass/N*100:.1f}%) [expected ~65%]")
 
 # Request type distribution
-request_types = {}
-for r in generated_records:
-    rt = r['request_type']
-    request_types[rt] = request_types.get(rt, 0) + 1
+request_types = generated['request_type'].value_counts()
 
 print(f"\n📊 Top 5 Request Types (should be benign for Not-Warning):")
-sorted_rt = sorted(request_types.items(), key=lambda x: x[1], reverse=True)[:5]
+sorted_rt = request_types.head(5).items()
 for rt, count in sorted_rt:
     print(f"   {rt}: {count} ({count/N*100:.1f}%)")
 
 print(f"\n📊 All Binary_Label = 'Not-Warning': ✓")
 
 print("\n" + "="*80)
-print(f"✅ Successfully generated {len(generated_records)} unique Not-Warning records!")
+print(f"✅ Successfully generated {len(generated)} unique Not-Warning records!")
 print(f"   Output file: {output_file}")
 print("="*80)
@@ -1,18 +1,25 @@
 #!/usr/bin/env python3
 """
-Generate 1000 Unique Warning Records (No Pandas Required)
+Generate Unique Warning Records (default 1000, size from the command line)
 Based on patterns from warning_detector_training_data.csv
 """
 
-import csv
-import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from unique_rows import generate_unique, random_uniform, weighted_choice
+
+# Number of records (command line, default 1000)
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
 
 print("="*80)
-print("GENERATING 1000 UNIQUE WARNING RECORDS")
+print(f"GENERATING {N} UNIQUE WARNING RECORDS")
 print("="*80)
 
 # Set seed for reproducibility
-random.seed(42)
+rng = np.random.default_rng(42)
 
 # Column names from training data (71 columns)
 COLUMNS = [
@@ -40,190 +47,154 @@ COLUMNS = [
     'warning_risk', 'Binary_Label'
 ]
 
-def weighted_choice(options, weights):
-    """Choose from options based on weights"""
-    total = sum(weights)
-    r = random.uniform(0, total)
-    cumulative = 0
-    for option, weight in zip(options, weights):
-        cumulative += weight
-        if r <= cumulative:
-            return option
-    return options[-1]
-
-def generate_warning_record():
-    """Generate a single Warning record matching training patterns"""
+def generate_warning_batch(n):
+    """Generate n Warning records matching training patterns, one column per field"""
     record = {}
 
     # === SENDER FEATURES ===
-    record['sender_known_malicious'] = weighted_choice([True, False], [0.45, 0.55])
-    record['sender_domain_reputation_score'] = round(random.uniform(0.1, 0.6), 10)
-    record['sender_spoof_detected'] = weighted_choice([True, False], [0.55, 0.45])
-    record['sender_temp_email_likelihood'] = round(random.uniform(0.3, 0.8), 10)
-    record['dmarc_enforced'] = weighted_choice([True, False], [0.30, 0.70])
-    record['sender_name_similarity_to_vip'] = round(random.uniform(0.2, 0.9), 10)
+    record['sender_known_malicious'] = weighted_choice(rng, [True, False], [0.45, 0.55], n)
+    record['sender_domain_reputation_score'] = random_uniform(rng, 0.1, 0.6, n)
+    record['sender_spoof_detected'] = weighted_choice(rng, [True, False], [0.55, 0.45], n)
+    record['sender_temp_email_likelihood'] = random_uniform(rng, 0.3, 0.8, n)
+    record['dmarc_enforced'] = weighted_choice(rng, [True, False], [0.30, 0.70], n)
+    record['sender_name_similarity_to_vip'] = random_uniform(rng, 0.2, 0.9, n)
 
     # === SPF/DKIM/DMARC RESULTS ===
     record['spf_result'] = weighted_choice(
-        ['pass', 'fail', 'softfail', 'neutral', 'none', 'temperror', 'permerror'],
-        [0.15, 0.25, 0.15, 0.20, 0.10, 0.10, 0.05]
+        rng, ['pass', 'fail', 'softfail', 'neutral', 'none', 'temperror', 'permerror'],
+        [0.15, 0.25, 0.15, 0.20, 0.10, 0.10, 0.05], n
     )
     record['dkim_result'] = weighted_choice(
-        ['pass', 'fail', 'neutral', 'none', 'temperror', 'permerror'],
-        [0.20, 0.25, 0.25, 0.15, 0.10, 0.05]
+        rng, ['pass', 'fail', 'neutral', 'none', 'temperror', 'permerror'],
+        [0.20, 0.25, 0.25, 0.15, 0.10, 0.05], n
     )
     record['dmarc_result'] = weighted_choice(
-        ['pass', 'fail', 'none', 'neutral', 'temperror', 'permerror'],
-        [0.15, 0.30, 0.20, 0.20, 0.10, 0.05]
+        rng, ['pass', 'fail', 'none', 'neutral', 'temperror', 'permerror'],
+        [0.15, 0.30, 0.20, 0.20, 0.10, 0.05], n
     )
-    record['reverse_dns_valid'] = weighted_choice([True, False], [0.50, 0.50])
+    record['reverse_dns_valid'] = weighted_choice(rng, [True, False], [0.50, 0.50], n)
 
     # === ATTACHMENT/FILE FEATURES ===
-    record['packer_detected'] = weighted_choice([True, False], [0.10, 0.90])
-    record['any_file_hash_malicious'] = weighted_choice([True, False], [0.08, 0.92])
-    record['max_metadata_suspicious_score'] = round(random.uniform(0.0, 0.4), 10)
-    record['malicious_attachment_count'] = weighted_choice([0, 1, 2], [0.85, 0.12, 0.03])
-    record['has_executable_attachment'] = weighted_choice([True, False], [0.05, 0.95])
-    record['unscannable_attachment_present'] = weighted_choice([True, False], [0.03, 0.97])
-    record['total_components_detected_malicious'] = weighted_choice([0, 1, 2, 3], [0.80, 0.12, 0.05, 0.03])
-    record['total_yara_match_count'] = weighted_choice([0, 1, 2, 3, 4, 5], [0.75, 0.12, 0.07, 0.03, 0.02, 0.01])
-    record['total_ioc_count'] = weighted_choice([0, 1, 2, 3, 4, 5, 6, 7], [0.60, 0.15, 0.10, 0.07, 0.04, 0.02, 0.01, 0.01])
+    record['packer_detected'] = weighted_choice(rng, [True, False], [0.10, 0.90], n)
+    record['any_file_hash_malicious'] = weighted_choice(rng, [True, False], [0.08, 0.92], n)
+    record['max_metadata_suspicious_score'] = random_uniform(rng, 0.0, 0.4, n)
+    record['malicious_attachment_count'] = weighted_choice(rng, [0, 1, 2], [0.85, 0.12, 0.03], n)
+    record['has_executable_attachment'] = weighted_choice(rng, [True, False], [0.05, 0.95], n)
+    record['unscannable_attachment_present'] = weighted_choice(rng, [True, False], [0.03, 0.97], n)
+    record['total_components_detected_malicious'] = weighted_choice(rng, [0, 1, 2, 3], [0.80, 0.12, 0.05, 0.03], n)
+    record['total_yara_match_count'] = weighted_choice(rng, [0, 1, 2, 3, 4, 5], [0.75, 0.12, 0.07, 0.03, 0.02, 0.01], n)
+    record['total_ioc_count'] = weighted_choice(rng, [0, 1, 2, 3, 4, 5, 6, 7], [0.60, 0.15, 0.10, 0.07, 0.04, 0.02, 0.01, 0.01], n)
 
     # === BEHAVIORAL FEATURES ===
-    record['max_behavioral_sandbox_score'] = round(random.uniform(0.0, 0.3), 10)
-    record['max_amsi_suspicion_score'] = round(random.uniform(0.0, 0.2), 10)
-    record['any_macro_enabled_document'] = weighted_choice([True, False], [0.15, 0.85])
-    record['any_vbscript_javascript_detected'] = weighted_choice([True, False], [0.10, 0.90])
-    record['any_active_x_objects_detected'] = weighted_choice([True, False], [0.08, 0.92])
-    record['any_network_call_on_open'] = weighted_choice([True, False], [0.12, 0.88])
-    record['max_exfiltration_behavior_score'] = round(random.uniform(0.0, 0.15), 10)
-    record['any_exploit_pattern_detected'] = weighted_choice([True, False], [0.05, 0.95])
-    record['total_embedded_file_count'] = weighted_choice([0, 1, 2, 3], [0.70, 0.20, 0.07, 0.03])
-    record['max_suspicious_string_entropy_score'] = round(random.uniform(0.0, 0.3), 10)
-    record['max_sandbox_execution_time'] = round(random.uniform(0.0, 0.1), 10)
+    record['max_behavioral_sandbox_score'] = random_uniform(rng, 0.0, 0.3, n)
+    record['max_amsi_suspicion_score'] = random_uniform(rng, 0.0, 0.2, n)
+    record['any_macro_enabled_document'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
+    record['any_vbscript_javascript_detected'] = weighted_choice(rng, [True, False], [0.10, 0.90], n)
+    record['any_active_x_objects_detected'] = weighted_choice(rng, [True, False], [0.08, 0.92], n)
+    record['any_network_call_on_open'] = weighted_choice(rng, [True, False], [0.12, 0.88], n)
+    record['max_exfiltration_behavior_score'] = random_uniform(rng, 0.0, 0.15, n)
+    record['any_exploit_pattern_detected'] = weighted_choice(rng, [True, False], [0.05, 0.95], n)
+    record['total_embedded_file_count'] = weighted_choice(rng, [0, 1, 2, 3], [0.70, 0.20, 0.07, 0.03], n)
+    record['max_suspicious_string_entropy_score'] = random_uniform(rng, 0.0, 0.3, n)
+    record['max_sandbox_execution_time'] = random_uniform(rng, 0.0, 0.1, n)
     record['unique_parent_process_names'] = ''
 
     # === RETURN PATH FEATURES ===
-    record['return_path_mismatch_with_from'] = weighted_choice([True, False], [0.60, 0.40])
-    record['return_path_known_malicious'] = weighted_choice([True, False], [0.15, 0.85])
-    record['return_path_reputation_score'] = round(random.uniform(0.2, 0.5), 10)
+    record['return_path_mismatch_with_from'] = weighted_choice(rng, [True, False], [0.60, 0.40], n)
+    record['return_path_known_malicious'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
+    record['return_path_reputation_score'] = random_uniform(rng, 0.2, 0.5, n)
 
     # === REPLY PATH FEATURES ===
-    record['reply_path_known_malicious'] = weighted_choice([True, False], [0.12, 0.88])
-    record['reply_path_diff_from_sender'] = weighted_choice([True, False], [0.55, 0.45])
-    record['reply_path_reputation_score'] = round(random.uniform(0.2, 0.5), 10)
+    record['reply_path_known_malicious'] = weighted_choice(rng, [True, False], [0.12, 0.88], n)
+    record['reply_path_diff_from_sender'] = weighted_choice(rng, [True, False], [0.55, 0.45], n)
+    record['reply_path_reputation_score'] = random_uniform(rng, 0.2, 0.5, n)
 
     # === SMTP FEATURES ===
-    record['smtp_ip_known_malicious'] = weighted_choice([True, False], [0.10, 0.90])
-    record['smtp_ip_geo'] = round(random.uniform(0.3, 0.8), 10)
-    record['smtp_ip_asn'] = round(random.uniform(0.3, 0.7), 10)
-    record['smtp_ip_reputation_score'] = round(random.uniform(0.2, 0.6), 10)
+    record['smtp_ip_known_malicious'] = weighted_choice(rng, [True, False], [0.10, 0.90], n)
+    record['smtp_ip_geo'] = random_uniform(rng, 0.3, 0.8, n)
+    record['smtp_ip_asn'] = random_uniform(rng, 0.3, 0.7, n)
+    record['smtp_ip_reputation_score'] = random_uniform(rng, 0.2, 0.6, n)
 
     # === DOMAIN/URL FEATURES ===
-    record['domain_known_malicious'] = weighted_choice([True, False], [0.35, 0.65])
-    record['url_count'] = weighted_choice(list(range(0, 10)), [0.10, 0.20, 0.20, 0.15, 0.12, 0.10, 0.05, 0.04, 0.02, 0.02])
-    record['dns_morphing_detected'] = weighted_choice([True, False], [0.25, 0.75])
-    record['domain_tech_stack_match_score'] = round(random.uniform(0.2, 0.6), 10)
-    record['url_decoded_spoof_detected'] = weighted_choice([True, False], [0.30, 0.70])
-    record['url_reputation_score'] = round(random.uniform(0.2, 0.6), 10)
+    record['domain_known_malicious'] = weighted_choice(rng, [True, False], [0.35, 0.65], n)
+    record['url_count'] = weighted_choice(rng, list(range(0, 10)), [0.10, 0.20, 0.20, 0.15, 0.12, 0.10, 0.05, 0.04, 0.02, 0.02], n)
+    record['dns_morphing_detected'] = weighted_choice(rng, [True, False], [0.25, 0.75], n)
+    record['domain_tech_stack_match_score'] = random_uniform(rng, 0.2, 0.6, n)
+    record['url_decoded_spoof_detected'] = weighted_choice(rng, [True, False], [0.30, 0.70], n)
+    record['url_reputation_score'] = random_uniform(rng, 0.2, 0.6, n)
     record['ssl_validity_status'] = weighted_choice(
-        ['valid', 'invalid', 'expired', 'self_signed', 'no_ssl'],
-        [0.30, 0.15, 0.10, 0.25, 0.20]
+        rng, ['valid', 'invalid', 'expired', 'self_signed', 'no_ssl'],
+        [0.30, 0.15, 0.10, 0.25, 0.20], n
     )
 
     # KEY WARNING INDICATORS
-    record['site_visual_similarity_to_known_brand'] = round(random.uniform(0.2, 0.8), 10)
-    record['url_rendering_behavior_score'] = round(random.uniform(0.2, 0.7), 10)
-    record['link_rewritten_through_redirector'] = weighted_choice([True, False], [0.20, 0.80])
-    record['token_validation_success'] = weighted_choice([True, False], [0.40, 0.60])
+    record['site_visual_similarity_to_known_brand'] = random_uniform(rng, 0.2, 0.8, n)
+    record['url_rendering_behavior_score'] = random_uniform(rng, 0.2, 0.7, n)
+    record['link_rewritten_through_redirector'] = weighted_choice(rng, [True, False], [0.20, 0.80], n)
+    record['token_validation_success'] = weighted_choice(rng, [True, False], [0.40, 0.60], n)
 
     # === HIGH RISK INDICATORS (KEY FOR WARNINGS) ===
-    record['is_high_risk_role_targeted'] = weighted_choice([True, False], [0.73, 0.27])
+    record['is_high_risk_role_targeted'] = weighted_choice(rng, [True, False], [0.73, 0.27], n)
     # urgency_keywords_present as FLOAT (0.4 to 0.95) for Warning records
-    record['urgency_keywords_present'] = round(random.uniform(0.4, 0.95), 10)
+    record['urgency_keywords_present'] = random_uniform(rng, 0.4, 0.95, n)
 
     # request_type - KEY FEATURE
     record['request_type'] = weighted_choice(
-        ['credential_request', 'sensitive_data_request', 'wire_transfer',
+        rng, ['credential_request', 'sensitive_data_request', 'wire_transfer',
          'invoice_payment', 'bank_detail_update', 'gift_card_request',
          'legal_threat', 'urgent_callback', 'invoice_verification',
          'link_click', 'document_download', 'meeting_request', 'none'],
-        [0.18, 0.15, 0.08, 0.10, 0.06, 0.04, 0.03, 0.05, 0.06, 0.12, 0.05, 0.03, 0.05]
+        [0.18, 0.15, 0.08, 0.10, 0.06, 0.04, 0.03, 0.05, 0.06, 0.12, 0.05, 0.03, 0.05], n
     )
 
     # === CONTENT FEATURES ===
-    record['content_spam_score'] = round(random.uniform(0.2, 0.6), 10)
-    record['user_marked_as_spam_before'] = weighted_choice([True, False], [0.15, 0.85])
-    record['bulk_message_indicator'] = weighted_choice([True, False], [0.08, 0.92])
-    record['unsubscribe_link_present'] = weighted_choice([True, False], [0.12, 0.88])
-    record['marketing_keywords_detected'] = round(random.uniform(0.0, 0.4), 10)
-    record['html_text_ratio'] = round(random.uniform(0.3, 0.7), 10)
-    record['image_only_email'] = weighted_choice([True, False], [0.05, 0.95])
+    record['content_spam_score'] = random_uniform(rng, 0.2, 0.6, n)
+    record['user_marked_as_spam_before'] = weighted_choice(rng, [True, False], [0.15, 0.85], n)
+    record['bulk_message_indicator'] = weighted_choice(rng, [True, False], [0.08, 0.92], n)
+    record['unsubscribe_link_present'] = weighted_choice(rng, [True, False], [0.12, 0.88], n)
+    record['marketing_keywords_detected'] = random_uniform(rng, 0.0, 0.4, n)
+    record['html_text_ratio'] = random_uniform(rng, 0.3, 0.7, n)
+    record['image_only_email'] = weighted_choice(rng, [True, False], [0.05, 0.95], n)
     record['total_links_detected'] = weighted_choice(
-        list(range(0, 15)),
-        [0.05, 0.10, 0.15, 0.15, 0.12, 0.10, 0.08, 0.07, 0.05, 0.04, 0.03, 0.02, 0.02, 0.01, 0.01]
+        rng, list(range(0, 15)),
+        [0.05, 0.10, 0.15, 0.15, 0.12, 0.10, 0.08, 0.07, 0.05, 0.04, 0.03, 0.02, 0.02, 0.01, 0.01], n
     )
 
     # === URL SHORTENER FEATURES ===
-    record['url_shortener_detected'] = weighted_choice([True, False], [0.25, 0.75])
-    record['url_redirect_chain_length'] = weighted_choice([0, 1, 2, 3, 4], [0.50, 0.25, 0.15, 0.07, 0.03])
-    record['final_url_known_malicious'] = weighted_choice([True, False], [0.20, 0.80])
+    record['url_shortener_detected'] = weighted_choice(rng, [True, False], [0.25, 0.75], n)
+    record['url_redirect_chain_length'] = weighted_choice(rng, [0, 1, 2, 3, 4], [0.50, 0.25, 0.15, 0.07, 0.03], n)
+    record['final_url_known_malicious'] = weighted_choice(rng, [True, False], [0.20, 0.80], n)
 
     # === TLS/ENCRYPTION ===
     record['tls_version'] = weighted_choice(
-        ['TLS 1.0', 'TLS 1.1', 'TLS 1.2', 'TLS 1.3', ''],
-        [0.10, 0.15, 0.35, 0.30, 0.10]
+        rng, ['TLS 1.0', 'TLS 1.1', 'TLS 1.2', 'TLS 1.3', ''],
+        [0.10, 0.15, 0.35, 0.30, 0.10], n
     )
 
     # === QR CODE ===
-    record['Analysis_of_the_qrcode_if_present'] = weighted_choice([0, 1], [0.95, 0.05])
+    record['Analysis_of_the_qrcode_if_present'] = weighted_choice(rng, [0, 1], [0.95, 0.05], n)
 
     # === CLASSIFICATION ===
     record['Final Classification'] = 'Warning'
-    record['warning_risk'] = round(random.uniform(0.4, 0.9), 10)
+    record['warning_risk'] = random_uniform(rng, 0.4, 0.9, n)
     record['Binary_Label'] = 'Warning'
 
-    return record
-
-def record_to_tuple(record):
-    """Convert record dict to tuple for uniqueness check"""
-    return tuple(str(record[col]) for col in COLUMNS)
+    return pd.DataFrame(record, index=range(n), columns=COLUMNS)
 
 # Generate records
-print("\n🔧 Generating 1000 unique Warning records...")
-
-N = 1000
-generated_records = []
-seen_records = set()
-
-attempts = 0
-max_attempts = 50000
-
-while len(generated_records) < N and attempts < max_attempts:
-    record = generate_warning_record()
-    record_tuple = record_to_tuple(record)
-
-    if record_tuple not in seen_records:
-        seen_records.add(record_tuple)
-        generated_records.append(record)
-
-    attempts += 1
+print(f"\n🔧 Generating {N} unique Warning records...")
 
-    if len(generated_records) % 100 == 0 and len(generated_records) > 0:
-        print(f"   Generated {len(generated_records)} unique records...")
+generated, attempts = generate_unique(generate_warning_batch, N)
 
-print(f"\n   ✓ Generated {len(generated_records)} unique records in {attempts} attempts")
+print(f"\n   ✓ Generated {len(generated)} unique records in {attempts} attempts")
 
 # Write to CSV
-output_file = 'generated_warning_1000.csv'
+output_file = f'generated_warning_{N}.csv'
 print(f"\n💾 Saving to {output_file}...")
 
-with open(output_file, 'w', newline='') as f:
-    writer = csv.DictWriter(f, fieldnames=COLUMNS)
-    writer.writeheader()
-    writer.writerows(generated_records)
+generated.to_csv(output_file, index=False)
 
-print(f"   ✓ Saved {len(generated_records)} records")
+print(f"   ✓ Saved {len(generated)} records")
 
 # Summary
 print("\n" + "="*80)
@@ -231,15 +202,15 @@ print("SUMMARY")
 print("="*80)
 
 # Count key features
-high_risk_true = sum(1 for r in generated_records if r['is_high_risk_role_targeted'] == True)
-spoof_true = sum(1 for r in generated_records if r['sender_spoof_detected'] == True)
-domain_mal_true = sum(1 for r in generated_records if r['domain_known_malicious'] == True)
+high_risk_true = int(generated['is_high_risk_role_targeted'].sum())
+spoof_true = int(generated['sender_spoof_detected'].sum())
+domain_mal_true = int(generated['domain_known_malicious'].sum())
 
 # Calculate urgency_keywords_present statistics (now a float 0.4-0.95)
-urgency_values = [r['urgency_keywords_present'] for r in generated_records]
-urgency_min = min(urgency_values)
-urgency_max = max(urgency_values)
-urgency_avg = sum(urgency_values) / len(urgency_values)
+urgency_values = generated['urgency_keywords_present']
+urgency_min = urgency_values.min()
+urgency_max = urgency_values.max()
+urgency_avg = urgency_values.mean()
 
 print(f"\n📊 Key Feature Distribution:")
 print(f"   is_high_risk_role_targeted = True: {high_risk_true} ({high_risk_true/N*100:.1f}%)")
@@ -248,19 +219,16 @@ print(f"   sender_spoof_detected = True:      {spoof_true} ({spoof_true/N*100:.1
 print(f"   domain_known_malicious = True:     {domain_mal_true} ({domain_mal_true/N*100:.1f}%)")
 
 # Request type distribution
-request_types = {}
-for r in generated_records:
-    rt = r['request_type']
-    request_types[rt] = request_types.get(rt, 0) + 1
+request_types = generated['request_type'].value_counts()
 
 print(f"\n📊 Top 5 Request Types:")
-sorted_rt = sorted(request_types.items(), key=lambda x: x[1], reverse=True)[:5]
+sorted_rt = request_types.head(5).items()
 for rt, count in sorted_rt:
     print(f"   {rt}: {count} ({count/N*100:.1f}%)")
 
 print(f"\n📊 All Binary_Label = 'Warning': ✓")
 
 print("\n" + "="*80)
-print(f"✅ Successfully generated {len(generated_records)} unique Warning records!")
+print(f"✅ Successfully generated {len(generated)} unique Warning records!")
 print(f"   Output file: {output_file}")
 print("="*80)
@@ -9,6 +9,8 @@ import numpy as np
 import random
 from datetime import datetime
 
+from shared_store import read_signals
+
 print("="*80)
 print("GENERATING 1000 UNIQUE WARNING RECORDS")
 print("="*80)
@@ -19,7 +21,7 @@ random.seed(42)
 
 # Load training data to understand patterns
 print("\n📂 Loading training data to analyze Warning patterns...")
-train_df = pd.read_csv('warning_detector_training_data.csv')
+train_df = read_signals('warning_detector_training_data.csv')
 warning_df = train_df[train_df['Binary_Label'] == 'Warning']
 print(f"   Found {len(warning_df)} Warning samples to learn from")
 
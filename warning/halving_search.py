@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Time-Budgeted Successive Halving Search
+Tunes the regularization settings of the detector models instead of using
+fixed guesses. Every model family (each entry of the models dict in
+train_robust_model.py) gets a bracket of sampled configurations, including
+its current setting. Each rung trains the surviving candidates on a
+stratified subset of the training rows, ranks them by search_score
+(validation F1, penalized by the train - validation accuracy gap), and
+keeps the best 1/eta of them for the next rung, which has eta times more
+rows. The final rung uses the whole training split.
+
+The test split is never passed in: tuning on it would make the final test
+evaluation in train_robust_model.py optimistic.
+
+All candidates of a rung, across families, run on one process pool
+(model_zoo.run_pool, matrices in shared memory). Before each rung the
+search estimates its cost from the previous one; if it would overrun the
+wall-clock budget, the search stops and ranks the last completed rung (the
+first rung always runs).
+
+    python halving_search.py [data.csv] [budget_seconds]
+    python train_robust_model.py --search 120
+"""
+
+import math
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import loguniform
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, RidgeClassifier
+from sklearn.model_selection import ParameterSampler
+from sklearn.svm import SVC
+
+from model_zoo import run_pool, split_metrics
+
+def search_space(estimator) -> Dict:
+    """Parameter distributions for one of the detector model types."""
+    if isinstance(estimator, LogisticRegression):
+        return {"C": loguniform(1e-3, 10)}
+    if isinstance(estimator, RidgeClassifier):
+        return {"alpha": loguniform(0.1, 1000)}
+    if isinstance(estimator, RandomForestClassifier):
+        return {"n_estimators": [50, 100, 200], "max_depth": [3, 5, 8, 12],
+                "min_samples_split": [2, 20, 50], "min_samples_leaf": [1, 5, 20]}
+    if isinstance(estimator, GradientBoostingClassifier):
+        return {"n_estimators": [25, 50, 100], "learning_rate": [0.01, 0.05, 0.1],
+                "max_depth": [2, 3, 4], "min_samples_leaf": [5, 20, 50], "subsample": [0.6, 0.8, 1.0]}
+    if isinstance(estimator, SVC):
+        return {"C": loguniform(1e-2, 10), "gamma": ["scale", 0.01, 0.1]}
+    raise TypeError(f"no search space for {type(estimator).__name__}")
+
+def nested_subsets(y: np.ndarray, sizes: List[int], random_state: int = 42) -> List[np.ndarray]:
+    """Stratified row subsets of the given sizes, each containing the previous ones."""
+    rng = np.random.default_rng(random_state)
+    classes = np.unique(y)
+    shuffled = {c: rng.permutation(np.flatnonzero(y == c)) for c in classes}
+    subsets = []
+    for size in sizes:
+        take = [shuffled[c][:max(1, round(size * len(shuffled[c]) / len(y)))] for c in classes]
+        subsets.append(np.sort(np.concatenate(take)))
+    return subsets
+
+def _fit_candidate(arrays: Dict[str, np.ndarray], task):
+    """Fit one candidate on a subset of the training rows; train metrics on that subset."""
+    key, estimator, rows = task
+    start = time.time()
+    model = clone(estimator).fit(arrays["X_train"][rows], arrays["y_train"][rows])
+    subset = {"X_train": arrays["X_train"][rows], "y_train": arrays["y_train"][rows],
+              "X_val": arrays["X_val"], "y_val": arrays["y_val"]}
+    result = split_metrics(model, subset, {"model": model}, splits=("train", "val"))
+    return key, result, time.time() - start
+
+def search_score(results: pd.DataFrame) -> pd.Series:
+    """Ranking used by the search: selection_score without its test-set terms."""
+    return results["Val_F1"] * 0.6 - results["Overfitting_Gap"] * 2
+
+def _ranking(rows: List[Dict]) -> pd.DataFrame:
+    table = pd.DataFrame(rows)
+    table["Overfitting_Gap"] = table["Train_Acc"] - table["Val_Acc"]
+    table["Search_Score"] = search_score(table)
+    return table
+
+def describe(name: str, params: Dict) -> str:
+    """Model label with its key=value settings replaced by (or extended with) params.
+
+    "Ridge Classifier (alpha=10)" with {"alpha": 291.2} -> "Ridge Classifier (alpha=291)".
+    """
+    if not params:
+        return name
+    base, _, inner = name.partition(" (")
+    shown = {key: f"{value:.3g}" if isinstance(value, float) else str(value) for key, value in params.items()}
+    parts = []
+    for part in (p.strip() for p in inner.rstrip(")").split(",") if p.strip()):
+        key = part.split("=", 1)[0]
+        parts.append(f"{key}={shown.pop(key)}" if "=" in part and key in shown else part)
+    parts += [f"{key}={value}" for key, value in shown.items()]
+    return f"{base} ({', '.join(parts)})"
+
+def successive_halving(models: Dict[str, object], X_train, y_train, X_val, y_val,
+                       budget: float = 120.0, n_candidates: int = 9, eta: int = 3,
+                       min_rows: Optional[int] = None, random_state: int = 42,
+                       n_jobs: Optional[int] = None, verbose: bool = True):
+    """Search every family's hyperparameters within budget seconds.
+
+    Only the training and validation splits are used. Returns (best,
+    history): best has one row per family (the winner of its bracket at the
+    last completed rung) with the Model, Params, Rows, Train/Val accuracy
+    and F1, Overfitting_Gap and Search_Score, plus model_object (the fitted
+    winner) and Estimator (unfitted, with the winning params), sorted by
+    Search_Score; history has every candidate evaluated at every rung.
+    """
+    arrays = {"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val}
+    arrays = {name: np.asarray(values) for name, values in arrays.items()}
+    n_train = len(arrays["y_train"])
+
+    # Rungs: enough that n_candidates halves down to one, capped by the smallest useful subset
+    n_rungs = max(1, math.ceil(math.log(n_candidates, eta)) + 1)
+    min_rows = min_rows or max(50, n_train // eta ** (n_rungs - 1))
+    sizes = [min(n_train, min_rows * eta ** rung) for rung in range(n_rungs)]
+    sizes[-1] = n_train
+    subsets = nested_subsets(arrays["y_train"], sizes, random_state)
+
+    candidates = {}
+    for family, base in models.items():
+        sampled = ParameterSampler(search_space(base), n_iter=n_candidates - 1, random_state=random_state)
+        configs = [{}] + [dict(params) for params in sampled]   # {} = the current setting
+        for i, params in enumerate(configs):
+            params = {name: getattr(value, "item", lambda: value)() for name, value in params.items()}
+            candidates[(family, i)] = (clone(base).set_params(**params), params)
+    alive = list(candidates)
+
+    start = time.time()
+    history, last_rung, last_cost = [], None, None
+    for rung, (size, rows) in enumerate(zip(sizes, subsets)):
+        if last_cost is not None:
+            elapsed = time.time() - start
+            # Next rung: eta x more rows for 1/eta of the candidates, fit time ~ linear in rows
+            estimate = last_cost * (size / sizes[rung - 1]) * (len(alive) / previous_count)
+            if elapsed + estimate > budget:
+                if verbose:
+                    print(f"  ⏱️ Stopping before rung {rung} ({len(alive)} x {size} rows): "
+                          f"~{estimate:.1f}s more would exceed the {budget:.0f}s budget")
+                break
+        rung_start = time.time()
+        outputs = run_pool(_fit_candidate, [(key, candidates[key][0], rows) for key in alive], arrays, n_jobs)
+        last_cost = time.time() - rung_start
+        previous_count = len(alive)
+
+        rung_rows = []
+        for key, result, seconds in outputs:
+            family, _ = key
+            rung_rows.append({
+                "Model": family, "Key": key, "Rung": rung, "Rows": size,
+                "Params": candidates[key][1], "Estimator": candidates[key][0],
+                "Train_Acc": result["train_acc"], "Val_Acc": result["val_acc"],
+                "Train_F1": result["train_f1"], "Val_F1": result["val_f1"],
+                "Fit_Time": seconds, "model_object": result["model"],
+            })
+        last_rung = _ranking(rung_rows)
+        history.append(last_rung)
+        if verbose:
+            print(f"  Rung {rung}: {len(alive)} candidates x {size} rows in {last_cost:.1f}s")
+
+        # Keep the best 1/eta of every family's bracket
+        alive = []
+        for family, group in last_rung.groupby("Model", sort=False):
+            keep = max(1, math.ceil(len(group) / eta))
+            alive += list(group.sort_values("Search_Score", ascending=False)["Key"].head(keep))
+
+    best = (last_rung.sort_values("Search_Score", ascending=False)
+            .groupby("Model", sort=False).head(1)
+            .drop(columns="Key").reset_index(drop=True))
+    history = pd.concat(history, ignore_index=True).drop(columns=["Key", "model_object"])
+    return best, history
+
+
+if __name__ == "__main__":
+    import sys
+    import warnings
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+
+    warnings.filterwarnings('ignore')
+
+    from shared_store import read_signals
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "data.csv"
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+
+    df = read_signals(path).drop_duplicates()
+    X = df.drop(["Binary_Label"], axis=1)
+    y = df["Binary_Label"].map({"Malicious": 1, "Not-Malicious": 0}).to_numpy()
+    X_temp, _, y_temp, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_train, X_val, y_train, y_val = train_test_split(X_temp, y_temp, test_size=0.25, random_state=42, stratify=y_temp)
+    scaler = StandardScaler().fit(X_train)
+
+    models = {
+        "Logistic Regression (L2)": LogisticRegression(penalty="l2", C=0.1, max_iter=1000, random_state=42),
+        "Ridge Classifier": RidgeClassifier(alpha=10.0, random_state=42),
+        "Random Forest": RandomForestClassifier(n_estimators=100, max_depth=5, min_samples_split=50,
+                                                min_samples_leaf=20, max_features="sqrt", random_state=42),
+    }
+    print(f"Successive halving on {path}: {len(X_train)} training rows, budget {budget:.0f}s")
+    best, history = successive_halving(models, scaler.transform(X_train), y_train, scaler.transform(X_val), y_val,
+                                       budget=budget)
+    print("\nModel Ranking:")
+    print(best[["Model", "Rows", "Train_F1", "Val_F1", "Overfitting_Gap",
+                "Search_Score"]].to_string(index=False))
+    for _, row in best.iterrows():
+        print(f"  {describe(row['Model'], row['Params'])}")
+    print(f"\n{len(history)} candidate fits")
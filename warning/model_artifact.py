@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Memory-Mappable Model Artifact
+Replaces the pickled best_model.pkl with the fitted parameters only: a raw
+binary file of arrays plus a JSON manifest that says what each array is.
+
+  <stem>.bin    every array at a 64-byte aligned offset, native byte order
+  <stem>.json   format version, model type, class labels, feature order,
+                scaler, scalar parameters, metadata (model name, test
+                metrics) and {dtype, shape, offset} for every array
+
+Loading maps the .bin file and wraps views around it; nothing is unpickled
+and sklearn is not imported, so a scorer starts in milliseconds. Only the
+exporter needs sklearn (imported inside export_model). The scoring here is a
+plain reference implementation; compiled_scorer.py compiles an artifact for
+fast batch scoring.
+
+Supported models (the ones train_robust_model.py trains):
+
+  linear          LogisticRegression, RidgeClassifier: coef, intercept
+  forest          RandomForestClassifier: flattened trees, leaf value =
+                  probability of the positive class, averaged over trees
+  boosting        GradientBoostingClassifier (binary log-loss): flattened
+                  trees, raw = init + learning_rate * sum of leaf values
+  svm             SVC with an rbf or linear kernel: support vectors,
+                  dual_coef, intercept, gamma, Platt probA/probB
+
+Trees of an ensemble are concatenated into one set of node arrays (feature,
+threshold, left, right, value) with absolute child indices; leaves have
+feature -1 and point to themselves, and roots[i] is the first node of tree
+i. As in sklearn, tree inputs are compared as float32.
+
+    python model_artifact.py best_model.pkl [stem] [data.csv]
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+FORMAT = "warning-model-artifact"
+VERSION = 1
+ALIGN = 64
+
+# ==============================================================================
+# EXPORT
+# ==============================================================================
+
+def _flatten_trees(trees, leaf_value) -> Dict[str, np.ndarray]:
+    """Node arrays of several sklearn trees, concatenated with absolute child indices."""
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    start = 0
+    depth = 0
+    for tree in trees:
+        t = tree.tree_
+        leaf = t.children_left < 0
+        index = np.arange(t.node_count)
+        roots.append(start)
+        feature.append(np.where(leaf, -1, t.feature).astype(np.int32))
+        threshold.append(np.where(leaf, 0.0, t.threshold).astype(np.float64))
+        left.append((np.where(leaf, index, t.children_left) + start).astype(np.int32))
+        right.append((np.where(leaf, index, t.children_right) + start).astype(np.int32))
+        value.append(leaf_value(t).astype(np.float64))
+        depth = max(depth, t.max_depth)
+        start += t.node_count
+    return {
+        "feature": np.concatenate(feature), "threshold": np.concatenate(threshold),
+        "left": np.concatenate(left), "right": np.concatenate(right),
+        "value": np.concatenate(value), "roots": np.array(roots, dtype=np.int32),
+    }, depth
+
+def model_parameters(model):
+    """(model_type, arrays, params) for a fitted binary classifier."""
+    from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, RidgeClassifier
+    from sklearn.svm import SVC
+
+    if len(model.classes_) != 2:
+        raise ValueError(f"only binary classifiers can be exported, got {len(model.classes_)} classes")
+
+    if isinstance(model, (LogisticRegression, RidgeClassifier)):
+        arrays = {"coef": np.asarray(model.coef_, dtype=np.float64).reshape(-1),
+                  "intercept": np.asarray(model.intercept_, dtype=np.float64).reshape(1)}
+        return "linear", arrays, {"probability": isinstance(model, LogisticRegression)}
+
+    if isinstance(model, RandomForestClassifier):
+        def positive_share(t):
+            counts = t.value[:, 0, :]
+            return counts[:, 1] / counts.sum(axis=1)
+        arrays, depth = _flatten_trees(model.estimators_, positive_share)
+        return "forest", arrays, {"n_trees": len(model.estimators_), "max_depth": int(depth)}
+
+    if isinstance(model, GradientBoostingClassifier):
+        prior = getattr(model.init_, "class_prior_", None)
+        if model.init_ == "zero":
+            init = 0.0
+        elif prior is not None:
+            init = float(np.log(prior[1] / prior[0]))
+        else:
+            raise ValueError("GradientBoostingClassifier with a custom init estimator cannot be exported")
+        arrays, depth = _flatten_trees(model.estimators_[:, 0], lambda t: t.value[:, 0, 0])
+        return "boosting", arrays, {"n_trees": len(model.estimators_), "max_depth": int(depth),
+                                    "learning_rate": float(model.learning_rate), "init": init}
+
+    if isinstance(model, SVC):
+        if model.kernel not in ("rbf", "linear"):
+            raise ValueError(f"SVC kernel {model.kernel!r} cannot be exported (rbf or linear only)")
+        arrays = {"support_vectors": np.ascontiguousarray(model.support_vectors_, dtype=np.float64),
+                  "dual_coef": np.asarray(model.dual_coef_, dtype=np.float64).reshape(-1),
+                  "intercept": np.asarray(model.intercept_, dtype=np.float64).reshape(1)}
+        probability = np.size(model.probA_) > 0     # fitted with probability=True
+        if probability:
+            arrays["prob_a"] = np.asarray(model.probA_, dtype=np.float64).reshape(1)
+            arrays["prob_b"] = np.asarray(model.probB_, dtype=np.float64).reshape(1)
+        return "svm", arrays, {"kernel": model.kernel, "gamma": float(model._gamma),
+                               "probability": probability}
+
+    raise TypeError(f"cannot export {type(model).__name__}")
+
+def artifact_parts(model, scaler, feature_names: Sequence[str], metadata: Optional[dict] = None):
+    """(manifest, arrays) for model and the StandardScaler fitted before it (or None)."""
+    model_type, arrays, params = model_parameters(model)
+    if scaler is not None:
+        n = len(feature_names)
+        arrays["scaler_mean"] = np.zeros(n) if scaler.mean_ is None else np.asarray(scaler.mean_, dtype=np.float64)
+        arrays["scaler_scale"] = np.ones(n) if scaler.scale_ is None else np.asarray(scaler.scale_, dtype=np.float64)
+
+    manifest = {
+        "format": FORMAT, "version": VERSION, "model_type": model_type,
+        "estimator": type(model).__name__,
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "feature_names": [str(name) for name in feature_names],
+        "scaler": scaler is not None, "params": params,
+        "metadata": metadata or {}, "arrays": {},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    return manifest, arrays
+
+def export_model(model, scaler, feature_names: Sequence[str], stem: str,
+                 metadata: Optional[dict] = None) -> dict:
+    """Write model (and the StandardScaler fitted before it, or None) to stem.bin + stem.json."""
+    manifest, arrays = artifact_parts(model, scaler, feature_names, metadata)
+    temp_bin, temp_json = stem + ".bin.tmp", stem + ".json.tmp"
+    offset = 0
+    with open(temp_bin, "wb") as f:
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            padding = -offset % ALIGN
+            f.write(b"\0" * padding)
+            offset += padding
+            manifest["arrays"][name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+            f.write(values.tobytes())
+            offset += values.nbytes
+    manifest["bytes"] = offset
+    with open(temp_json, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_bin, stem + ".bin")
+    os.replace(temp_json, stem + ".json")
+    return manifest
+
+# ==============================================================================
+# LOAD
+# ==============================================================================
+
+def _expit(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+def _libsvm_proba(decision: np.ndarray, prob_a: float, prob_b: float) -> np.ndarray:
+    """P(classes[1]) as libsvm computes it for a binary SVC.
+
+    Platt's sigmoid on libsvm's decision value (the negated sklearn one),
+    clipped to [1e-7, 1 - 1e-7], then libsvm's iterative pairwise coupling,
+    which for two classes stops at a tolerance instead of returning the
+    sigmoid itself; reproduced here row by row, vectorized.
+    """
+    f = prob_a * -decision + prob_b
+    r = np.clip(_expit(-f), 1e-7, 1 - 1e-7)              # P(classes[0])
+    Q = [[(1 - r) ** 2, -r * (1 - r)], [-r * (1 - r), r ** 2]]
+    p = [np.full(len(r), 0.5), np.full(len(r), 0.5)]
+    active = np.ones(len(r), dtype=bool)
+    for _ in range(100):
+        Qp = [Q[t][0] * p[0] + Q[t][1] * p[1] for t in (0, 1)]
+        pQp = p[0] * Qp[0] + p[1] * Qp[1]
+        active &= np.maximum(np.abs(Qp[0] - pQp), np.abs(Qp[1] - pQp)) >= 0.005 / 2
+        if not active.any():
+            break
+        for t in (0, 1):
+            diff = np.where(active, (pQp - Qp[t]) / Q[t][t], 0.0)
+            p[t] = p[t] + diff
+            pQp = (pQp + diff * (diff * Q[t][t] + 2 * Qp[t])) / (1 + diff) ** 2
+            Qp = [(Qp[j] + diff * Q[t][j]) / (1 + diff) for j in (0, 1)]
+            p = [p[j] / (1 + diff) for j in (0, 1)]
+    return p[1]
+
+class ModelArtifact:
+    """Model arrays (memory-mapped when loaded from disk) plus numpy scoring, without sklearn."""
+
+    def __init__(self, manifest: dict, arrays: Dict[str, np.ndarray], stem: Optional[str] = None):
+        self.manifest = manifest
+        self.arrays = arrays
+        self.stem = stem
+        self.model_type = manifest["model_type"]
+        self.params = manifest["params"]
+        self.classes = np.array(manifest["classes"])
+        self.feature_names = manifest["feature_names"]
+        self.metadata = manifest["metadata"]
+
+    @classmethod
+    def from_model(cls, model, scaler, feature_names: Sequence[str], metadata: Optional[dict] = None):
+        """The artifact export_model would write, kept in memory (needs sklearn)."""
+        return cls(*artifact_parts(model, scaler, feature_names, metadata))
+
+    @property
+    def has_proba(self) -> bool:
+        return self.model_type in ("forest", "boosting") or bool(self.params.get("probability"))
+
+    def prepare(self, X) -> np.ndarray:
+        """X as a float64 matrix in the artifact's feature order, scaled like in training."""
+        if hasattr(X, "columns"):
+            missing = [c for c in self.feature_names if c not in X.columns]
+            if missing:
+                raise KeyError(f"missing features {missing}")
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"expected {len(self.feature_names)} features, got shape {X.shape}")
+        if self.manifest["scaler"]:
+            X = (X - self.arrays["scaler_mean"]) / self.arrays["scaler_scale"]
+        return X
+
+    def _tree_sum(self, X: np.ndarray) -> np.ndarray:
+        """Sum over trees of each row's leaf value (one tree at a time)."""
+        a = self.arrays
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))
+        total = np.zeros(len(X))
+        for root in a["roots"]:
+            node = np.full(len(X), root, dtype=np.int64)
+            for _ in range(self.params["max_depth"]):
+                feature = a["feature"][node]
+                go_left = X[rows, np.maximum(feature, 0)] <= a["threshold"][node]
+                node = np.where(go_left, a["left"][node], a["right"][node])
+            total += a["value"][node]
+        return total
+
+    def _raw(self, X: np.ndarray) -> np.ndarray:
+        a = self.arrays
+        if self.model_type == "linear":
+            return X @ a["coef"] + a["intercept"][0]
+        if self.model_type == "forest":
+            return self._tree_sum(X) / self.params["n_trees"]
+        if self.model_type == "boosting":
+            return self.params["init"] + self.params["learning_rate"] * self._tree_sum(X)
+        if self.model_type == "svm":
+            sv = a["support_vectors"]
+            if self.params["kernel"] == "linear":
+                kernel = X @ sv.T
+            else:
+                distance = (X ** 2).sum(axis=1)[:, None] - 2 * X @ sv.T + (sv ** 2).sum(axis=1)[None, :]
+                kernel = np.exp(-self.params["gamma"] * np.maximum(distance, 0))
+            return kernel @ a["dual_coef"] + a["intercept"][0]
+        raise ValueError(f"unknown model type {self.model_type!r}")
+
+    def decision_function(self, X) -> np.ndarray:
+        """Signed score (positive = classes[1]); forests: positive-class probability - 0.5."""
+        raw = self._raw(self.prepare(X))
+        return raw - 0.5 if self.model_type == "forest" else raw
+
+    def predict_proba(self, X) -> np.ndarray:
+        """(n, 2) class probabilities, for the models that have them."""
+        if not self.has_proba:
+            raise AttributeError(f"{self.manifest['estimator']} has no predict_proba")
+        raw = self._raw(self.prepare(X))
+        if self.model_type == "forest":
+            p = raw
+        elif self.model_type == "svm":
+            p = _libsvm_proba(raw, self.arrays["prob_a"][0], self.arrays["prob_b"][0])
+        else:
+            p = _expit(raw)
+        return np.column_stack([1 - p, p])
+
+    def scores(self, X) -> np.ndarray:
+        """Positive-class probability if the model has one, else the decision value (model_zoo.scores)."""
+        return self.predict_proba(X)[:, 1] if self.has_proba else self.decision_function(X)
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes[(self.decision_function(X) > 0).astype(int)]
+
+def load_artifact(stem: str) -> ModelArtifact:
+    """Map stem.bin and read stem.json (stem may also end in .bin or .json)."""
+    stem = stem[:-5] if stem.endswith(".json") else stem[:-4] if stem.endswith(".bin") else stem
+    with open(stem + ".json") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+        raise ValueError(f"{stem}.json is not a version {VERSION} {FORMAT} manifest")
+    size = os.path.getsize(stem + ".bin")
+    if size != manifest["bytes"]:
+        raise ValueError(f"{stem}.bin has {size} bytes, manifest expects {manifest['bytes']}")
+
+    buffer = np.memmap(stem + ".bin", dtype=np.uint8, mode="r") if size else np.empty(0, np.uint8)
+    arrays = {name: np.ndarray(tuple(spec["shape"]), dtype=np.dtype(spec["dtype"]),
+                               buffer=buffer, offset=spec["offset"])
+              for name, spec in manifest["arrays"].items()}
+    return ModelArtifact(manifest, arrays, stem)
+
+
+if __name__ == "__main__":
+    import pickle
+    import sys
+    import warnings
+
+    warnings.filterwarnings('ignore')
+
+    pkl_path = sys.argv[1] if len(sys.argv) > 1 else "best_model.pkl"
+    stem = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(pkl_path)[0]
+    data_path = sys.argv[3] if len(sys.argv) > 3 else "data.csv"
+
+    with open(pkl_path, "rb") as f:
+        package = pickle.load(f)
+    manifest = export_model(package["model"], package["scaler"], package["feature_names"], stem,
+                            {"model_name": package.get("model_name"), "test_metrics": package.get("test_metrics")})
+    print(f"✓ {pkl_path} -> {stem}.bin ({manifest['bytes']:,} bytes) + {stem}.json "
+          f"[{manifest['model_type']}]")
+
+    start = time.perf_counter()
+    artifact = load_artifact(stem)
+    print(f"  Loaded in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    from shared_store import read_signals
+    import pandas as pd
+
+    X = read_signals(data_path)[artifact.feature_names]
+    model, scaler = package["model"], package["scaler"]
+    X_scaled = pd.DataFrame(scaler.transform(X), columns=X.columns) if scaler is not None else X
+    checks = [("predict", np.array_equal(artifact.predict(X), model.predict(X_scaled)))]
+    if hasattr(model, "decision_function"):
+        expected = model.decision_function(X_scaled)
+        checks.append(("decision_function", np.allclose(artifact.decision_function(X), expected, atol=1e-9)))
+    if artifact.has_proba:
+        expected = model.predict_proba(X_scaled)
+        checks.append(("predict_proba", np.allclose(artifact.predict_proba(X), expected, atol=1e-9)))
+    for name, ok in checks:
+        print(f"  {'✅' if ok else '❌'} {name} matches sklearn on {len(X):,} rows")
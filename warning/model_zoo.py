@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Parallel Model Zoo
+Trains a set of candidate models and their cross-validation folds together
+on one process pool. Every (model, full fit) and (model, CV fold) pair is a
+task, so the pool stays busy until the last task finishes and the total
+wall-clock approaches the time of the slowest model instead of the sum of
+all of them.
+
+The scaled train/validation/test matrices are copied once into shared
+memory; workers map them by name, and a task only pickles its estimator and
+fold indices. The pool uses the fork start method where available, so the
+training scripts (flat scripts without a __main__ guard) are not re-run in
+the workers.
+
+Each fold is fitted once and its out-of-fold scores (probabilities, or the
+decision function for models without predict_proba) are kept, so CV F1,
+AUC and the train-vs-held-out gap all come from the same fits; the full fit
+keeps its validation and test predictions the same way. Fold assignments
+are cached by FoldCache next to the dataset, keyed by a hash of the
+training rows, so every model and every script sees the same splits.
+
+    folds = FoldCache("data.csv").folds(X_train, y_train)
+    results, timings, wall = train_zoo(models, X_train, y_train, X_val, y_val, X_test, y_test, folds=folds)
+"""
+
+import hashlib
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+class SharedArrays:
+    """numpy arrays copied once into shared memory blocks (a context manager)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.spec: Dict[str, Tuple[str, tuple, str]] = {}
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+            self.blocks[name] = block
+            self.spec[name] = (block.name, values.shape, values.dtype.str)
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class FoldCache:
+    """Stratified CV fold assignments persisted next to a dataset.
+
+    Folds live in <dataset>.folds/ as one int8 fold-id vector per training
+    set, named by a hash of the training rows, labels and split parameters,
+    so every model and every script using the same training rows gets the
+    same splits without recomputing them.
+    """
+
+    def __init__(self, path: str):
+        self.directory = os.path.splitext(path)[0] + ".folds"
+        self.loaded = self.computed = 0
+
+    @staticmethod
+    def key(X, y, n_splits: int, random_state: int) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for values in (np.ascontiguousarray(X), np.ascontiguousarray(y)):
+            digest.update(f"{values.dtype.str}{values.shape}".encode())
+            digest.update(values.tobytes())
+        digest.update(f"{n_splits}/{random_state}".encode())
+        return digest.hexdigest()
+
+    def fold_ids(self, X, y, n_splits: int = 5, random_state: int = 42) -> np.ndarray:
+        """Fold number of every training row."""
+        X, y = np.asarray(X), np.asarray(y)
+        file_path = os.path.join(self.directory, self.key(X, y, n_splits, random_state) + ".npy")
+        if os.path.exists(file_path):
+            self.loaded += 1
+            return np.load(file_path)
+        fold_ids = np.empty(len(y), dtype=np.int8)
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        for fold, (_, test_idx) in enumerate(splitter.split(X, y)):
+            fold_ids[test_idx] = fold
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = file_path + ".tmp.npy"
+        np.save(temp_path, fold_ids)
+        os.replace(temp_path, file_path)
+        self.computed += 1
+        return fold_ids
+
+    def folds(self, X, y, n_splits: int = 5, random_state: int = 42) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """(train_idx, test_idx) per fold, as StratifiedKFold.split gives them."""
+        return folds_from_ids(self.fold_ids(X, y, n_splits, random_state))
+
+def folds_from_ids(fold_ids: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    return [(np.flatnonzero(fold_ids != fold), np.flatnonzero(fold_ids == fold))
+            for fold in range(int(fold_ids.max()) + 1)]
+
+# Arrays of the current worker, mapped from shared memory once per process
+_ARRAYS: Dict[str, np.ndarray] = {}
+_BLOCKS: List[shared_memory.SharedMemory] = []
+
+def _attach(spec: Dict[str, Tuple[str, tuple, str]]):
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _BLOCKS.append(block)
+        _ARRAYS[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+
+def scores(model, X) -> np.ndarray:
+    """Positive-class probability, or the decision function if there is none."""
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba(X)[:, 1]
+    return model.decision_function(X)
+
+def split_metrics(model, arrays: Dict[str, np.ndarray], result: Dict, splits=("train", "val", "test")) -> Dict:
+    """<split>_acc and <split>_f1 of a fitted model on the shared splits."""
+    for split in splits:
+        y_pred = model.predict(arrays[f"X_{split}"])
+        result[f"{split}_acc"] = accuracy_score(arrays[f"y_{split}"], y_pred)
+        result[f"{split}_f1"] = f1_score(arrays[f"y_{split}"], y_pred)
+    return result
+
+def selection_score(results: pd.DataFrame) -> pd.Series:
+    """train_robust_model's ranking: validation performance, penalized overfitting.
+
+    Needs Val_F1, Test_F1, Overfitting_Gap (train - val accuracy) and
+    Generalization_Gap (|val - test| accuracy).
+    """
+    return (
+        results['Val_F1'] * 0.6 +  # Validation performance
+        results['Test_F1'] * 0.3 +  # Test performance
+        -results['Overfitting_Gap'] * 2 +  # Penalize overfitting
+        -results['Generalization_Gap'] * 1  # Penalize instability
+    )
+
+def _run_task(arrays: Dict[str, np.ndarray], task):
+    """One full fit (fold None) or one CV fold; returns (name, fold, result, start, end)."""
+    name, estimator, fold, train_idx, test_idx = task
+    start = time.time()
+    X, y = arrays["X_train"], arrays["y_train"]
+    if fold is None:
+        model = estimator.fit(X, y)
+        result = {"model": model}
+        split_metrics(model, arrays, result)
+        for split in ("val", "test"):
+            result[f"{split}_pred"] = model.predict(arrays[f"X_{split}"])
+            result[f"{split}_scores"] = scores(model, arrays[f"X_{split}"])
+    else:
+        # Same fit as cross_val_score for this fold; the held-out predictions are kept
+        model = clone(estimator).fit(X[train_idx], y[train_idx])
+        result = {"pred": model.predict(X[test_idx]), "scores": scores(model, X[test_idx]),
+                  "train_f1": f1_score(y[train_idx], model.predict(X[train_idx]))}
+    return name, fold, result, start, time.time()
+
+def _pool_context():
+    methods = mp.get_all_start_methods()
+    return mp.get_context("fork" if "fork" in methods else None)
+
+def _call(job):
+    function, task = job
+    return function(_ARRAYS, task)
+
+def run_pool(function: Callable, tasks: Sequence, arrays: Dict[str, np.ndarray],
+             n_jobs: Optional[int] = None) -> List:
+    """[function(arrays, task) for task in tasks], on a process pool.
+
+    arrays go to the workers through shared memory; function must be a
+    module-level function. n_jobs=1 (or one CPU) runs in-process.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(tasks) <= 1:
+        return [function(arrays, task) for task in tasks]
+    with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(tasks)), mp_context=_pool_context(),
+            initializer=_attach, initargs=(shared.spec,)) as pool:
+        return list(pool.map(_call, [(function, task) for task in tasks]))
+
+def train_zoo(models: Dict[str, object], X_train, y_train, X_val, y_val, X_test, y_test,
+              cv: int = 5, random_state: int = 42, n_jobs: Optional[int] = None,
+              folds: Optional[List[Tuple[np.ndarray, np.ndarray]]] = None):
+    """Fit every model and its CV folds on one pool.
+
+    Returns (results, timings, wall_seconds): results holds one dict per model
+    (in models order) with the fitted model, train/val/test accuracy and F1,
+    val/test predictions and scores, the per-fold CV F1 scores, the
+    out-of-fold predictions and scores (oof_pred, oof_scores) with the F1 and
+    AUC computed from them, and cv_gap (mean in-fold train F1 minus OOF F1);
+    timings has the per-model fit, CV and busy seconds and the wall-clock
+    span from its first task start to its last task end. folds defaults to
+    StratifiedKFold(cv, shuffle=True, random_state).
+    """
+    arrays = {"X_train": X_train, "y_train": y_train, "X_val": X_val, "y_val": y_val,
+              "X_test": X_test, "y_test": y_test}
+    arrays = {name: np.asarray(values) for name, values in arrays.items()}
+    if folds is None:
+        folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+                     .split(arrays["X_train"], arrays["y_train"]))
+    cv = len(folds)
+
+    # Full fits first (the largest tasks), then the folds of every model
+    tasks = [(name, model, None, None, None) for name, model in models.items()]
+    tasks += [(name, model, fold, train_idx, test_idx)
+              for fold, (train_idx, test_idx) in enumerate(folds)
+              for name, model in models.items()]
+
+    wall_start = time.time()
+    outputs = run_pool(_run_task, tasks, arrays, n_jobs)
+    wall = time.time() - wall_start
+
+    y_train = arrays["y_train"]
+    n_train = len(y_train)
+    results = {name: {"name": name, "cv_scores": np.zeros(cv), "cv_train_f1": np.zeros(cv),
+                      "oof_pred": np.zeros(n_train, dtype=y_train.dtype), "oof_scores": np.zeros(n_train)}
+               for name in models}
+    spans = {name: {"fit_s": 0.0, "cv_s": 0.0, "first": np.inf, "last": -np.inf} for name in models}
+    for name, fold, result, start, end in outputs:
+        if fold is None:
+            results[name].update(result)
+            spans[name]["fit_s"] = end - start
+        else:
+            test_idx = folds[fold][1]
+            results[name]["cv_scores"][fold] = f1_score(y_train[test_idx], result["pred"])
+            results[name]["cv_train_f1"][fold] = result["train_f1"]
+            results[name]["oof_pred"][test_idx] = result["pred"]
+            results[name]["oof_scores"][test_idx] = result["scores"]
+            spans[name]["cv_s"] += end - start
+        spans[name]["first"] = min(spans[name]["first"], start)
+        spans[name]["last"] = max(spans[name]["last"], end)
+
+    for result in results.values():
+        result["oof_f1"] = f1_score(y_train, result["oof_pred"])
+        result["oof_auc"] = roc_auc_score(y_train, result["oof_scores"])
+        result["cv_gap"] = result["cv_train_f1"].mean() - result["oof_f1"]
+
+    timings = pd.DataFrame([{
+        "Model": name,
+        "Fit_s": span["fit_s"],
+        "CV_s": span["cv_s"],
+        "Busy_s": span["fit_s"] + span["cv_s"],
+        "Span_s": span["last"] - span["first"],
+    } for name, span in spans.items()]).set_index("Model")
+    return [results[name] for name in models], timings, wall
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, RidgeClassifier
+    from sklearn.model_selection import cross_val_predict, cross_val_score
+
+    # Parallel zoo against the sequential fit + cross_val_score it replaces
+    X, y = make_classification(n_samples=3000, n_features=20, random_state=0)
+    X_train, X_val, X_test = X[:1800], X[1800:2400], X[2400:]
+    y_train, y_val, y_test = y[:1800], y[1800:2400], y[2400:]
+    models = {"lr": LogisticRegression(C=0.1, max_iter=1000),
+              "ridge": RidgeClassifier(alpha=10.0),
+              "rf": RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)}
+    splitter = StratifiedKFold(n_splits=5, shuffle=True, random_state=42)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = FoldCache(os.path.join(directory, "data.csv"))
+        folds = cache.folds(X_train, y_train)
+        same_folds = all(np.array_equal(a[1], b[1]) for a, b in zip(folds, splitter.split(X_train, y_train)))
+        cache.folds(X_train, y_train)
+        print(f"{'✅' if same_folds else '❌'} FoldCache: StratifiedKFold splits, "
+              f"{cache.computed} computed / {cache.loaded} loaded")
+
+    results, timings, wall = train_zoo(models, X_train, y_train, X_val, y_val, X_test, y_test,
+                                       n_jobs=int(sys.argv[1]) if len(sys.argv) > 1 else None, folds=folds)
+    ok = same_folds
+    for result in results:
+        model = models[result["name"]]
+        reference = cross_val_score(clone(model), X_train, y_train, scoring="f1", cv=splitter)
+        oof = cross_val_predict(clone(model), X_train, y_train, cv=splitter)
+        same = np.allclose(reference, result["cv_scores"]) and np.array_equal(oof, result["oof_pred"])
+        ok &= same
+        print(f"{'✅' if same else '❌'} {result['name']}: CV F1 {result['cv_scores'].mean():.4f}, "
+              f"OOF F1 {result['oof_f1']:.4f}, OOF AUC {result['oof_auc']:.4f}, gap {result['cv_gap']:+.4f}, "
+              f"val F1 {result['val_f1']:.4f}")
+    print(timings.round(3).to_string())
+    print(f"Wall-clock: {wall:.2f}s for {timings['Busy_s'].sum():.2f}s of work")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1 @@
+../spam/shared_store.py
\ No newline at end of file
@@ -10,9 +10,10 @@ This script addresses common overfitting issues in malware detection:
 5. Multiple model comparison
 """
 
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression, RidgeClassifier
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
@@ -20,10 +21,21 @@ from sklearn.svm import SVC
 from sklearn.metrics import (classification_report, confusion_matrix,
                             roc_auc_score, accuracy_score, f1_score,
                             precision_score, recall_score)
-import pickle
 import warnings
+
+from shared_store import read_signals
+from model_zoo import FoldCache, selection_score, train_zoo
+from halving_search import describe, successive_halving
+from model_artifact import export_model
+
 warnings.filterwarnings('ignore')
 
+parser = argparse.ArgumentParser(description="Robust ML Model for Malware Detection")
+parser.add_argument("--search", type=float, metavar="SECONDS",
+                    help="tune each model's regularization by successive halving within this "
+                         "wall-clock budget before the final training")
+args = parser.parse_args()
+
 def print_header(text, char='='):
     """Print formatted header"""
     print(f"\n{char * 80}")
@@ -46,7 +58,7 @@ def analyze_overfitting(train_score, val_score, test_score, threshold=0.05):
 
 print_header("🔍 LOADING AND INSPECTING DATA")
 
-df = pd.read_csv('data.csv')
+df = read_signals('data.csv')
 print(f"Dataset shape: {df.shape}")
 print(f"Total samples: {len(df)}")
 print(f"\nClass distribution:")
@@ -156,36 +168,51 @@ models = {
     )
 }
 
+searched_params = {}
+if args.search:
+    print_header("🔎 SUCCESSIVE HALVING SEARCH", '-')
+    # Train and validation splits only: the test split stays untouched for the final evaluation
+    searched, search_history = successive_halving(
+        models, X_train_scaled, y_train.to_numpy(), X_val_scaled, y_val.to_numpy(),
+        budget=args.search, random_state=42
+    )
+    print("\nSearch Ranking:")
+    print(searched[['Model', 'Rows', 'Train_F1', 'Val_F1',
+                    'Overfitting_Gap', 'Search_Score']].to_string(index=False))
+    print(f"\n{len(search_history)} candidate fits. Settings used below:")
+    winners = {row['Model']: (row['Estimator'], row['Params']) for _, row in searched.iterrows()}
+    # Relabel from the winning params, so names match the settings actually trained
+    for name in list(models):
+        estimator, params = winners.pop(name)
+        del models[name]
+        label = describe(name, params)
+        print(f"  {label}" + ("" if params else " (unchanged)"))
+        models[label] = estimator
+        searched_params[label] = params
+
+# Fit every model and all of its CV folds together on one process pool
+# (matrices shared through shared memory, see model_zoo.py). The 5 folds are
+# cached next to data.csv by a hash of the training rows, so every model and
+# every run uses the same splits; each fold is fitted once and its
+# out-of-fold predictions give the CV F1, AUC and gap.
+folds = FoldCache('data.csv').folds(X_train.to_numpy(), y_train.to_numpy(), n_splits=5, random_state=42)
+zoo_results, timings, zoo_wall = train_zoo(
+    models, X_train_scaled, y_train.to_numpy(), X_val_scaled, y_val.to_numpy(),
+    X_test_scaled, y_test.to_numpy(), folds=folds
+)
+zoo_by_name = {zoo['name']: zoo for zoo in zoo_results}
+
 results = []
 
-for name, model in models.items():
+for zoo in zoo_results:
+    name, model = zoo['name'], zoo['model']
     print(f"\n{'─' * 80}")
     print(f"Training: {name}")
     print(f"{'─' * 80}")
 
-    # Train model
-    model.fit(X_train_scaled, y_train)
-
-    # Predictions
-    y_train_pred = model.predict(X_train_scaled)
-    y_val_pred = model.predict(X_val_scaled)
-    y_test_pred = model.predict(X_test_scaled)
-
-    # Calculate metrics
-    train_acc = accuracy_score(y_train, y_train_pred)
-    val_acc = accuracy_score(y_val, y_val_pred)
-    test_acc = accuracy_score(y_test, y_test_pred)
-
-    train_f1 = f1_score(y_train, y_train_pred)
-    val_f1 = f1_score(y_val, y_val_pred)
-    test_f1 = f1_score(y_test, y_test_pred)
-
-    # Cross-validation
-    cv_scores = cross_val_score(
-        model, X_train_scaled, y_train,
-        cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
-        scoring='f1', n_jobs=-1
-    )
+    train_acc, val_acc, test_acc = zoo['train_acc'], zoo['val_acc'], zoo['test_acc']
+    train_f1, val_f1, test_f1 = zoo['train_f1'], zoo['val_f1'], zoo['test_f1']
+    cv_scores = zoo['cv_scores']
 
     # Analyze overfitting
     gap, generalization, status, gen_status = analyze_overfitting(
@@ -202,11 +229,16 @@ for name, model in models.items():
     print(f"  Validation: {val_f1:.4f}")
     print(f"  Test:       {test_f1:.4f}")
     print(f"  CV (5-fold): {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+    print(f"  CV out-of-fold: F1 {zoo['oof_f1']:.4f}, AUC {zoo['oof_auc']:.4f}, "
+          f"train-vs-OOF gap {zoo['cv_gap']:.4f}")
 
     print(f"\nDiagnostics:")
     print(f"  Overfitting gap:  {gap:.4f} {status}")
     print(f"  Generalization:   {generalization:.4f} {gen_status}")
 
+    print(f"\nTiming:")
+    print(f"  Fit: {timings.loc[name, 'Fit_s']:.2f}s, CV folds: {timings.loc[name, 'CV_s']:.2f}s")
+
     results.append({
         'Model': name,
         'Train_Acc': train_acc,
@@ -217,11 +249,21 @@ for name, model in models.items():
         'Test_F1': test_f1,
         'CV_F1_Mean': cv_scores.mean(),
         'CV_F1_Std': cv_scores.std(),
+        'CV_OOF_F1': zoo['oof_f1'],
+        'CV_OOF_AUC': zoo['oof_auc'],
+        'CV_Gap': zoo['cv_gap'],
         'Overfitting_Gap': gap,
         'Generalization_Gap': generalization,
+        'Fit_Time': timings.loc[name, 'Fit_s'],
+        'CV_Time': timings.loc[name, 'CV_s'],
         'model_object': model
     })
 
+print_header("⏱️ TRAINING TIME BREAKDOWN", '-')
+print(timings.round(2).to_string())
+print(f"\nWall-clock: {zoo_wall:.2f}s for {timings['Busy_s'].sum():.2f}s of model fitting "
+      f"(slowest model: {timings['Busy_s'].max():.2f}s)")
+
 # ==============================================================================
 # MODEL SELECTION
 # ==============================================================================
@@ -230,12 +272,7 @@ print_header("🏆 MODEL SELECTION")
 
 results_df = pd.DataFrame(results)
 # Selection score: prioritize validation performance and penalize overfitting
-results_df['Selection_Score'] = (
-    results_df['Val_F1'] * 0.6 +  # Validation performance
-    results_df['Test_F1'] * 0.3 +  # Test performance
-    -results_df['Overfitting_Gap'] * 2 +  # Penalize overfitting
-    -results_df['Generalization_Gap'] * 1  # Penalize instability
-)
+results_df['Selection_Score'] = selection_score(results_df)
 
 results_df_display = results_df.drop('model_object', axis=1).sort_values(
     'Selection_Score', ascending=False
@@ -258,8 +295,9 @@ print(f"   Selection Score: {results_df.loc[best_idx, 'Selection_Score']:.4f}")
 
 print_header("📊 FINAL TEST SET EVALUATION")
 
-y_test_pred = best_model.predict(X_test_scaled)
-y_test_proba = best_model.predict_proba(X_test_scaled)[:, 1]
+# Test predictions were kept from the full fit in the model zoo
+y_test_pred = zoo_by_name[best_model_name]['test_pred']
+y_test_proba = zoo_by_name[best_model_name]['test_scores']
 
 print("Classification Report:")
 print(classification_report(y_test, y_test_pred,
@@ -319,22 +357,18 @@ elif hasattr(best_model, 'coef_'):
 
 print_header("💾 SAVING MODEL")
 
-model_package = {
-    'model': best_model,
-    'scaler': scaler,
-    'feature_names': X.columns.tolist(),
+manifest = export_model(best_model, scaler, X.columns.tolist(), 'best_model', {
     'model_name': best_model_name,
+    'searched_params': searched_params.get(best_model_name),
     'test_metrics': {
-        'accuracy': accuracy_score(y_test, y_test_pred),
-        'f1_score': f1_score(y_test, y_test_pred),
-        'roc_auc': auc_score
+        'accuracy': float(accuracy_score(y_test, y_test_pred)),
+        'f1_score': float(f1_score(y_test, y_test_pred)),
+        'roc_auc': float(auc_score)
     }
-}
-
-with open('best_model.pkl', 'wb') as f:
-    pickle.dump(model_package, f)
+})
 
-print("✓ Model saved to: best_model.pkl")
+print(f"✓ Model saved to: best_model.bin + best_model.json ({manifest['bytes']:,} bytes, "
+      f"load with model_artifact.load_artifact('best_model'))")
 print(f"  Model type: {best_model_name}")
 print(f"  Features: {len(X.columns)}")
 print(f"  Test F1: {f1_score(y_test, y_test_pred):.4f}")
@@ -384,5 +418,5 @@ print("  - Test on unseen data to verify generalization")
 print("  - Generalization matters more than raw performance")
 
 print("\n" + "="*80)
-print("Analysis complete! Check best_model.pkl")
+print("Analysis complete! Check best_model.json")
 print("="*80)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Bulk Unique Row Generation
+Shared helpers for the Warning / Not-Warning record generators. Records are
+drawn a batch at a time as columns, every row is reduced to a 64-bit hash in
+one vectorized pass (pd.util.hash_pandas_object), and duplicates are dropped
+against the hashes already accepted. Follow-up rounds only generate the
+shortfall, so asking for 1M unique rows costs roughly 1M draws instead of a
+Python set of 1M string tuples.
+"""
+
+import math
+from typing import Callable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Extra rows drawn per round to absorb duplicates without another round
+OVERSAMPLE = 0.02
+
+# Give up after this many rounds (the old per-record loops stopped at 50000 attempts)
+MAX_ROUNDS = 50
+
+def weighted_choice(rng: np.random.Generator, options: Sequence, weights: Sequence[float],
+                    size: int) -> np.ndarray:
+    """size draws from options based on weights"""
+    p = np.asarray(weights, dtype=float)
+    return np.asarray(options)[rng.choice(len(options), size=size, p=p / p.sum())]
+
+def random_uniform(rng: np.random.Generator, low: float, high: float, size: int) -> np.ndarray:
+    """size draws of round(random.uniform(low, high), 10)"""
+    return np.round(rng.uniform(low, high, size), 10)
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """One uint64 hash per row over all columns."""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+def generate_unique(make_batch: Callable[[int], pd.DataFrame], n: int,
+                    oversample: float = OVERSAMPLE, max_rounds: int = MAX_ROUNDS,
+                    verbose: bool = True) -> Tuple[pd.DataFrame, int]:
+    """Draw batches from make_batch(size) until n unique rows are collected.
+
+    Returns the unique rows (in draw order) and the number of rows drawn.
+    Stops early with fewer rows if max_rounds is exhausted. Two distinct rows
+    with colliding 64-bit hashes count as duplicates; one is dropped and
+    replaced by the next round.
+    """
+    parts = []
+    seen = np.empty(0, dtype=np.uint64)
+    attempts = 0
+    rounds = 0
+
+    while len(seen) < n and rounds < max_rounds:
+        shortfall = n - len(seen)
+        batch = make_batch(shortfall + math.ceil(shortfall * oversample))
+        attempts += len(batch)
+        rounds += 1
+
+        hashes = row_hashes(batch)
+        _, first = np.unique(hashes, return_index=True)
+        first.sort()
+        fresh = first[~np.isin(hashes[first], seen, assume_unique=True)][:shortfall]
+
+        parts.append(batch.iloc[fresh])
+        seen = np.concatenate([seen, hashes[fresh]])
+        if verbose:
+            print(f"   Round {rounds}: {len(fresh)} new unique rows ({len(seen)}/{n})")
+
+    if not parts:
+        return pd.DataFrame(), attempts
+    return pd.concat(parts, ignore_index=True), attempts